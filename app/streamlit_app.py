@@ -1,3 +1,4 @@
+import json
 import os
 from datetime import timedelta
 from io import BytesIO
@@ -457,23 +458,60 @@ if submitted:
             "date": date,
             "use_demo": use_demo,
         }
-        with st.spinner(
-            "Fetching ERA5/OpenAQ data…" if not use_demo else "Generating deterministic plan…"
-        ):
-            try:
-                risk_resp = requests.post(f"{API}/risk", json=payload, timeout=RISK_TIMEOUT)
+        total = len(schools_df)
+        progress = st.progress(
+            0.0,
+            text="Fetching ERA5/OpenAQ data…" if not use_demo else "Generating deterministic plan…",
+        )
+        by_index: dict[int, dict] = {}
+        failures: list[str] = []
+        stalled_message = (
+            "Live data pull stalled past the timeout. Results so far are shown below; "
+            "try fewer schools or stay in Demo."
+        )
+        streaming = False
+        try:
+            # Schools stream back as each finishes, so the timeout bounds the gap between
+            # schools rather than the whole district, and finished schools survive a failure.
+            with requests.post(
+                f"{API}/risk/stream", json=payload, stream=True, timeout=(10, RISK_TIMEOUT)
+            ) as risk_resp:
                 risk_resp.raise_for_status()
-                response_json = risk_resp.json()
-                units = response_json.get("units", {})
-                results = response_json.get("results", [])
-            except requests.exceptions.ReadTimeout:
-                error_message = (
-                    "Live data pull exceeded the timeout. Try fewer schools or stay in Demo."
-                )
-            except requests.exceptions.RequestException as exc:
-                error_message = f"Risk request failed: {exc}"
-            finally:
-                st.session_state["is_running"] = False
+                streaming = True
+                for line in risk_resp.iter_lines():
+                    if not line:
+                        continue
+                    record = json.loads(line)
+                    if record.get("done"):
+                        units = record.get("units", {})
+                        continue
+                    if "error" in record:
+                        failures.append(f"{record['school']['name']}: {record['error']}")
+                    else:
+                        by_index[record["index"]] = record
+                    done = len(by_index) + len(failures)
+                    progress.progress(
+                        done / max(total, 1), text=f"Scored {done} of {total} schools"
+                    )
+        except requests.exceptions.ReadTimeout:
+            error_message = stalled_message
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.ChunkedEncodingError,
+        ) as exc:
+            # A read timeout after the headers arrive surfaces from iter_lines() as one of
+            # these, not as ReadTimeout.
+            error_message = stalled_message if streaming else f"Risk request failed: {exc}"
+        except requests.exceptions.RequestException as exc:
+            error_message = f"Risk request failed: {exc}"
+        finally:
+            st.session_state["is_running"] = False
+            progress.empty()
+        results = [by_index[i] for i in sorted(by_index)]
+        if failures:
+            st.warning(
+                f"{len(failures)} school(s) could not be scored:\n\n- " + "\n- ".join(failures)
+            )
 
 if error_message:
     st.error(error_message)
@@ -944,46 +982,53 @@ st.markdown("</section>", unsafe_allow_html=True)
 _step_heading("step-5", "Multi-day outlook", "Step 5 - Policy simulator & outlook")
 with st.container():
     st.subheader("3-day outlook")
-    st.caption("Run a short horizon using demo data to stress-test policies.")
+    st.caption("Run a short horizon for every school to stress-test policies.")
     with st.form("outlook-form"):
         outlook_start = st.date_input("Outlook start date", selected_date)
         horizon = st.slider("Days to simulate", min_value=2, max_value=5, value=3)
         force_demo = st.checkbox(
             "Force demo mode for outlook",
             value=not use_demo,
-            help="Live mode is slow for multi-day runs; demo keeps it snappy for judges.",
+            help="Live mode reads every day's ERA5/OpenAQ data; demo keeps it snappy for judges.",
         )
         outlook_submit = st.form_submit_button("Generate outlook")
     if outlook_submit:
         outlook_records = []
-        base_school = schools_df.iloc[0].to_dict()
-        for offset in range(horizon):
-            day = outlook_start + timedelta(days=offset)
-            payload = {
-                "schools": [base_school],
-                "date": day.strftime("%Y-%m-%d"),
-                "use_demo": force_demo or use_demo,
-            }
-            try:
-                resp = requests.post(f"{API}/risk", json=payload, timeout=RISK_TIMEOUT)
-                resp.raise_for_status()
-                data = resp.json()
-                summary = data["results"][0]["summary"]
-                outlook_records.append(
-                    {
-                        "date": payload["date"],
-                        "peak_wbgt_c": summary.get("peak_wbgt_c"),
-                        "orange_red_hours": summary.get("orange_red_hours", 0),
-                        "pm_alert": "Yes" if summary.get("pm_alert") else "No",
-                    }
-                )
-            except requests.exceptions.RequestException as exc:
-                st.error(f"Outlook failed for {payload['date']}: {exc}")
-                break
+        last_day = outlook_start + timedelta(days=horizon - 1)
+        payload = {
+            "schools": schools_df.to_dict(orient="records"),
+            "start": outlook_start.strftime("%Y-%m-%d"),
+            "end": last_day.strftime("%Y-%m-%d"),
+            "use_demo": force_demo or use_demo,
+        }
+        try:
+            # One pipeline run for every school and day of the horizon. The read timeout
+            # covers the whole run, so it gets the budget the per-day calls had in total.
+            resp = requests.post(
+                f"{API}/risk/range", json=payload, timeout=(10, RISK_TIMEOUT * horizon)
+            )
+            resp.raise_for_status()
+            for item in resp.json().get("results", []):
+                for entry in item["days"]:
+                    summary = entry["summary"]
+                    outlook_records.append(
+                        {
+                            "school": item["school"]["name"],
+                            "date": entry["date"],
+                            "peak_wbgt_c": summary.get("peak_wbgt_c"),
+                            "orange_red_hours": summary.get("orange_red_hours", 0),
+                            "pm_alert": "Yes" if summary.get("pm_alert") else "No",
+                        }
+                    )
+        except requests.exceptions.RequestException as exc:
+            st.error(f"Outlook failed for {payload['start']} to {payload['end']}: {exc}")
         if outlook_records:
             outlook_df = pd.DataFrame(outlook_records)
             st.dataframe(outlook_df, use_container_width=True)
-            chart_df = outlook_df.set_index("date")[["peak_wbgt_c", "orange_red_hours"]]
+            # District view: the hottest school's peak and the total orange/red hours per day.
+            chart_df = outlook_df.groupby("date").agg(
+                peak_wbgt_c=("peak_wbgt_c", "max"), orange_red_hours=("orange_red_hours", "sum")
+            )
             st.line_chart(chart_df)
         else:
             st.info("No outlook data generated yet.")
@@ -0,0 +1,58 @@
+"""Micro-benchmark: mean-flux forecast-time expansion, nested loop vs. broadcasting.
+
+Run: python benchmarks/bench_flux_expand.py [--inits 62] [--points 200]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from src.data.era5 import _expand_flux
+
+
+def expand_flux_loop(init_times, forecast_hours, values):
+    """The pre-vectorization expansion: one Timedelta and one row per (init, hour)."""
+    init_times = pd.to_datetime(init_times)
+    forecast_hours = np.asarray(forecast_hours).astype(int)
+    rows, times = [], []
+    for idx, t0 in enumerate(init_times):
+        for hour, row in zip(forecast_hours, values[idx]):
+            times.append(t0 + pd.Timedelta(hours=int(hour)))
+            rows.append(np.asarray(row, dtype=float))
+    return pd.DataFrame(np.vstack(rows), index=pd.DatetimeIndex(times, name="time"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inits", type=int, default=62, help="Forecast inits (2/day x 31 days)")
+    parser.add_argument("--points", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    inits = pd.date_range("2024-07-01T06", periods=args.inits, freq="12h").values
+    hours = np.arange(1, 19)
+    values = np.random.default_rng(0).random((args.inits, hours.size, args.points))
+
+    pd.testing.assert_frame_equal(
+        expand_flux_loop(inits, hours, values), _expand_flux(inits, hours, values)
+    )
+    loop = min(
+        timeit.repeat(lambda: expand_flux_loop(inits, hours, values), number=1, repeat=args.repeat)
+    )
+    vec = min(
+        timeit.repeat(lambda: _expand_flux(inits, hours, values), number=1, repeat=args.repeat)
+    )
+    print(f"inits={args.inits} hours={hours.size} points={args.points}")
+    print(f"loop        {loop * 1e3:9.3f} ms")
+    print(f"broadcast   {vec * 1e3:9.3f} ms")
+    print(f"speedup     {loop / vec:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
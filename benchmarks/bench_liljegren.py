@@ -0,0 +1,82 @@
+"""Micro-benchmark: physical Liljegren WBGT solver vs. the Stull/proxy approximation.
+
+Reports throughput on one core and how far the approximation sits from the physical model.
+
+Run: python benchmarks/bench_liljegren.py [--sites 500] [--hours 744]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from src.ml.liljegren import cos_zenith, wbgt_liljegren_physical, wbgt_liljegren_point
+from src.ml.wbgt import wbgt_liljegren_from_met
+from src.ml.wbgt_batch import wbgt_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sites", type=int, default=500)
+    parser.add_argument("--hours", type=int, default=744, help="Hours per site (31 days)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--points", type=int, default=2000, help="Scalar reference samples")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    shape = (args.sites, args.hours)
+    lat = rng.uniform(25, 48, (args.sites, 1))
+    lon = rng.uniform(-123, -70, (args.sites, 1))
+    times = pd.date_range("2024-07-01", periods=args.hours, freq="h").to_numpy()[None, :]
+    cza = np.broadcast_to(cos_zenith(lat, lon, times), shape)
+    day = np.clip(cza, 0.0, None)
+    temp = 24 + 8 * day + rng.normal(0, 3, shape)
+    rh = np.clip(0.75 - 0.35 * day + rng.normal(0, 0.1, shape), 0.05, 1.0)
+    sw = np.clip(950 * day * rng.uniform(0.4, 1.0, shape), 0, None)
+    wind = rng.gamma(2.0, 1.5, shape)
+    p = np.broadcast_to(rng.uniform(850, 1020, (args.sites, 1)), shape)
+    met = (temp, rh, sw, wind)
+    met32 = tuple(x.astype(np.float32) for x in met)
+    n = temp.size
+
+    physical = wbgt_liljegren_physical(*met, p, cza=cza)
+    cases = [
+        ("approximation, one call", lambda: wbgt_liljegren_from_met(*met)),
+        ("approximation, batch", lambda: wbgt_batch(*met, workers=1)),
+        ("physical f64", lambda: wbgt_liljegren_physical(*met, p, cza=cza)),
+        ("physical f32 (fast mode)", lambda: wbgt_liljegren_physical(*met32, p, cza=cza)),
+    ]
+    print(f"sites={args.sites} hours={args.hours} ({n / 1e6:.2f} M site-hours, 1 thread)")
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f"{name:24s} {seconds * 1e3:8.1f} ms {n / seconds / 1e6:7.2f} M/s")
+
+    idx = rng.choice(n, size=min(args.points, n), replace=False)
+    flat = [np.ravel(x)[idx] for x in (temp, rh, sw, wind, p, cza)]
+    seconds = timeit.timeit(lambda: [wbgt_liljegren_point(*v) for v in zip(*flat)], number=1)
+    ref = np.array([wbgt_liljegren_point(*v) for v in zip(*flat)])
+    print(f"{'scalar reference loop':24s} {len(idx) / seconds / 1e6:20.3f} M/s")
+    f32 = wbgt_liljegren_physical(*met32, p, cza=cza)
+    print(
+        f"physical vs scalar reference: max|diff| "
+        f"{np.abs(np.ravel(physical)[idx] - ref).max():.3f} C; "
+        f"f32 vs f64 max|diff| {np.abs(f32 - physical).max():.3f} C"
+    )
+
+    diff = wbgt_liljegren_from_met(*met) - physical
+    print(
+        "approximation - physical (C): "
+        f"mean {diff.mean():+.2f}, p5 {np.percentile(diff, 5):+.2f}, "
+        f"p95 {np.percentile(diff, 95):+.2f}, max|diff| {np.abs(diff).max():.2f}"
+    )
+    for label, mask in (("day", cza > 0.1), ("night", cza <= 0.1)):
+        print(f"  {label:5s} mean {diff[mask].mean():+.2f}")
+
+
+if __name__ == "__main__":
+    main()
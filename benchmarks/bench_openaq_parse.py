@@ -0,0 +1,96 @@
+"""Micro-benchmark: OpenAQ archive CSV.GZ parsing, full-frame read_csv vs. streaming pruned parse.
+
+Run: python benchmarks/bench_openaq_parse.py [--sensors 12] [--parameters 6]
+
+Peak memory comes from tracemalloc, which sees Python/NumPy allocations but not Arrow's own
+memory pool, so the Arrow figure is a lower bound.
+"""
+
+import argparse
+import gzip
+import io
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from src.data import openaq
+
+
+def parse_full_frame(fh):
+    """The pre-streaming parse: every column and parameter, then filter and resample."""
+    df = pd.read_csv(fh, compression="gzip")
+    df = df[df["parameter"] == "pm25"][["datetime", "value"]].copy()
+    df["time"] = pd.to_datetime(df["datetime"], utc=True).dt.tz_convert(None)
+    return df.set_index("time")["value"].astype(float).resample("h").mean().interpolate()
+
+
+def make_archive(sensors: int, parameters: int, minutes: int) -> bytes:
+    """A location-day file in the archive's column layout with sub-hourly readings."""
+    names = ["pm25", "pm10", "o3", "no2", "co", "so2", "temperature", "humidity"][:parameters]
+    stamps = pd.date_range("2024-07-01", periods=24 * 60 // minutes, freq=f"{minutes}min")
+    rng = np.random.default_rng(0)
+    lines = ["location_id,sensors_id,location,datetime,lat,lon,parameter,units,value"]
+    for stamp in stamps.strftime("%Y-%m-%dT%H:%M:%S-04:00"):
+        for sensor in range(sensors):
+            name = names[sensor % len(names)]
+            lines.append(
+                f'2178,{1000 + sensor},"Brooklyn, NY",{stamp},40.69,-73.98,{name},µg/m³,'
+                f"{rng.random() * 40:.2f}"
+            )
+    return gzip.compress("\n".join(lines).encode())
+
+
+def _measure(func, raw, repeat):
+    seconds = min(timeit.repeat(lambda: func(io.BytesIO(raw)), number=1, repeat=repeat))
+    tracemalloc.start()
+    func(io.BytesIO(raw))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sensors", type=int, default=12)
+    parser.add_argument("--parameters", type=int, default=6)
+    parser.add_argument("--minutes", type=int, default=1, help="Reading interval")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    raw = make_archive(args.sensors, args.parameters, args.minutes)
+    pd.testing.assert_series_equal(
+        openaq.parse_pm25_archive(io.BytesIO(raw)),
+        parse_full_frame(io.BytesIO(raw)),
+        check_names=False,
+        check_freq=False,
+    )
+    engines = [("full frame", parse_full_frame)]
+    if openaq.pa_csv is not None:
+        engines.append(("arrow stream", openaq.parse_pm25_archive))
+    engines.append(
+        (
+            "pandas chunks",
+            lambda fh: openaq._merge_hourly(
+                openaq._parse_pm25_pandas(fh, openaq.OPENAQ_PARSE_CHUNK_ROWS)
+            ),
+        )
+    )
+    print(f"{len(raw) / 1e6:.2f} MB gzip, sensors={args.sensors} parameters={args.parameters}")
+    base = None
+    for name, func in engines:
+        seconds, peak = _measure(func, raw, args.repeat)
+        base = base or (seconds, peak)
+        print(
+            f"{name:14s} {seconds * 1e3:9.1f} ms ({base[0] / seconds:4.1f}x)  "
+            f"peak {peak / 1e6:7.1f} MB ({base[1] / peak:4.1f}x less)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Micro-benchmark: risk tiering, pd.cut + dict maps vs. the int8 searchsorted kernel.
+
+Run: python benchmarks/bench_risk_kernel.py [--hours 2000000]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from src.ml.risk import compute_risk, summarize_day
+from src.ml.wbgt import risk_codes, risk_tiers, wbgt_liljegren_from_met
+
+
+def risk_tiers_cut(wbgt_c, pm25, t1=27.0, t2=30.0, t3=32.0):
+    """The pre-kernel tiering: two pd.cut calls, label -> int -> label round trips."""
+    wb = pd.cut(
+        wbgt_c,
+        bins=[-100, t1, t2, t3, 100],
+        labels=["green", "yellow", "orange", "red"],
+        right=False,
+    )
+    pm = pd.cut(
+        pm25,
+        bins=[-1, 12, 35, 55, 1e6],
+        labels=["good", "moderate", "unhealthy-sens", "unhealthy"],
+        right=False,
+    )
+    tier_order = {"green": 0, "yellow": 1, "orange": 2, "red": 3}
+    pm_map = {"good": 0, "moderate": 1, "unhealthy-sens": 2, "unhealthy": 3}
+    wb_codes = pd.Series(wb).map(tier_order).astype(int).values
+    pm_codes = pd.Series(pm).map(pm_map).astype(int).values
+    worst = np.maximum(wb_codes, pm_codes)
+    inv = {v: k for k, v in tier_order.items()}
+    return pd.Series(worst).map(inv)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=int, default=2_000_000, help="Site-hours to tier")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.hours
+    met = pd.DataFrame(
+        {
+            "temp_c": rng.uniform(20, 40, n),
+            "rh": rng.uniform(0.1, 0.9, n),
+            "swdown": rng.uniform(0, 900, n),
+            "wind_ms": rng.uniform(0, 5, n),
+            "pm25": rng.uniform(0, 80, n),
+        }
+    )
+    wbgt = wbgt_liljegren_from_met(met["temp_c"], met["rh"], met["swdown"], met["wind_ms"])
+    pm = met["pm25"].to_numpy()
+    assert list(risk_tiers_cut(wbgt, pm)) == list(risk_tiers(wbgt, pm))
+
+    def best(func):
+        return min(timeit.repeat(func, number=1, repeat=args.repeat))
+
+    rows = [
+        ("pd.cut tiers", best(lambda: risk_tiers_cut(wbgt, pm))),
+        ("int8 codes", best(lambda: risk_codes(wbgt, pm))),
+        ("compute_risk", best(lambda: compute_risk(met))),
+        ("summarize_day", best(lambda: summarize_day(compute_risk(met)))),
+    ]
+    print(f"hours={n} ({wbgt.nbytes / 1e6:.0f} MB per float column)")
+    for name, seconds in rows:
+        print(f"{name:14s} {seconds * 1e3:9.1f} ms  {n / seconds / 1e6:7.1f} M hours/s")
+    print(f"tiering speedup {rows[0][1] / rows[1][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Micro-benchmark: per-group summarize_day loop vs. one summarize_many pass.
+
+Run: python benchmarks/bench_summarize_many.py [--schools 2000] [--days 30]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from src.ml.risk import compute_risk, summarize_day, summarize_many
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schools", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--loop-groups", type=int, default=500, help="Groups timed in the loop")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2024-07-01", periods=24 * args.days, freq="h")
+    n = args.schools * len(times)
+    df = pd.DataFrame(
+        {
+            "school_id": np.repeat(np.arange(args.schools), len(times)),
+            "time": np.tile(times, args.schools),
+            "temp_c": rng.uniform(20, 38, n),
+            "rh": rng.uniform(0.2, 0.9, n),
+            "swdown": rng.uniform(0, 900, n),
+            "wind_ms": rng.uniform(0, 6, n),
+            "pm25": rng.uniform(0, 70, n),
+        }
+    )
+    df["date"] = df["time"].dt.strftime("%Y-%m-%d")
+    df = compute_risk(df)
+
+    start = time.perf_counter()
+    many = summarize_many(df, by=["school_id", "date"])
+    batch_s = time.perf_counter() - start
+
+    groups = df.groupby(["school_id", "date"])
+    sample = [rows for _, (_, rows) in zip(range(args.loop_groups), groups)]
+    start = time.perf_counter()
+    for rows in sample:
+        summarize_day(rows)
+    per_group_s = (time.perf_counter() - start) / len(sample)
+
+    print(f"{n / 1e6:.1f} M rows, {len(many)} school-days")
+    print(f"summarize_many      {batch_s:8.2f} s  {batch_s / len(many) * 1e6:8.1f} us/group")
+    print(
+        f"summarize_day loop  {per_group_s * len(many):8.2f} s  {per_group_s * 1e6:8.1f} us/group"
+        f"  (extrapolated from {len(sample)} groups)"
+    )
+
+
+if __name__ == "__main__":
+    main()
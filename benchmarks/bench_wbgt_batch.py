@@ -0,0 +1,71 @@
+"""Micro-benchmark: WBGT over a (sites x hours) batch, per-call formula vs. the blocked engine.
+
+Run: python benchmarks/bench_wbgt_batch.py [--sites 2000] [--hours 744]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from src.ml import wbgt_batch as batch
+from src.ml.wbgt import wbgt_liljegren_from_met
+
+
+def _peak_mb(func) -> float:
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sites", type=int, default=2000)
+    parser.add_argument("--hours", type=int, default=744, help="Hours per site (31 days)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    shape = (args.sites, args.hours)
+    met64 = [
+        rng.uniform(15, 42, shape),
+        rng.uniform(0.1, 0.95, shape),
+        rng.uniform(0, 950, shape),
+        rng.uniform(0, 8, shape),
+    ]
+    met32 = [x.astype(np.float32) for x in met64]
+    ref = wbgt_liljegren_from_met(*met64)
+    n = ref.size
+    cpus = os.cpu_count() or 1
+
+    cases = [("formula f64 (one call)", lambda: wbgt_liljegren_from_met(*met64))]
+    cases += [
+        ("numpy chain f64, 1 thread", lambda: batch.wbgt_batch(*met64, engine="numpy", workers=1)),
+        (f"numpy chain f64, {cpus} thr", lambda: batch.wbgt_batch(*met64, engine="numpy")),
+        (f"numpy chain f32, {cpus} thr", lambda: batch.wbgt_batch(*met32, engine="numpy")),
+    ]
+    if batch.ne is not None:
+        cases += [
+            ("numexpr f64", lambda: batch.wbgt_batch(*met64, engine="numexpr")),
+            ("numexpr f32", lambda: batch.wbgt_batch(*met32, engine="numexpr")),
+        ]
+    print(f"sites={args.sites} hours={args.hours} ({n / 1e6:.1f} M site-hours, {cpus} CPUs)")
+    for name, func in cases:
+        err = float(np.abs(func() - ref).max())
+        seconds = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(
+            f"{name:26s} {seconds * 1e3:8.1f} ms {n / seconds / 1e6:7.1f} M/s  "
+            f"peak {_peak_mb(func):7.1f} MB  max|err| {err:.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Micro-benchmark: WBGT lookup table (build, cold load, interpolation) vs. direct evaluation.
+
+Run: python benchmarks/bench_wbgt_lut.py [--n 1000000]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from src.ml import wbgt_lut
+from src.ml.liljegren import wbgt_liljegren_physical
+from src.ml.wbgt import wbgt_liljegren_from_met
+
+
+def _physical_overhead_sun(temp_c, rh, swdown, wind_ms):
+    return wbgt_liljegren_physical(temp_c, rh, swdown, wind_ms, 1013.0, cza=0.9)
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.n
+    uniform = [
+        rng.uniform(-10, 50, n),
+        rng.uniform(0, 1, n),
+        rng.uniform(0, 1400, n),
+        rng.uniform(0, 20, n),
+    ]
+    # Site-hours: smooth within a site, so consecutive lookups hit neighbouring cells.
+    hours = np.arange(n) % 744
+    day = np.clip(np.sin((hours % 24 - 6) / 12 * np.pi), 0, None)
+    diurnal = [
+        22 + 10 * day + rng.normal(0, 1, n),
+        np.clip(0.8 - 0.4 * day + rng.normal(0, 0.03, n), 0, 1),
+        900 * day,
+        np.clip(2 + rng.normal(0, 0.5, n), 0, None),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "wbgt_lut.npy"
+        lut, build_s = _timed(lambda: wbgt_lut.build_lut(wbgt_liljegren_from_met))
+        wbgt_lut.save_lut(lut, path)
+        loaded, load_s = _timed(lambda: wbgt_lut.load_lut(path))
+        phys_lut, phys_build_s = _timed(lambda: wbgt_lut.build_lut(_physical_overhead_sun))
+        size_mb = path.stat().st_size / 1e6
+        print(f"table {lut.table.shape} float32, {size_mb:.1f} MB")
+        print(f"build (formula) {build_s * 1e3:7.1f} ms   build (physical) {phys_build_s:6.2f} s")
+        print(f"cold load (mmap) {load_s * 1e3:6.2f} ms")
+
+        for label, inputs in (("uniform", uniform), ("diurnal", diurnal)):
+            ref = wbgt_liljegren_from_met(*inputs)
+            phys = _physical_overhead_sun(*inputs)
+            # Bind this iteration's inputs; a bare closure would see the last loop's arrays.
+            cases = [
+                ("formula", lambda x=inputs: wbgt_liljegren_from_met(*x), ref),
+                ("LUT (formula)", lambda x=inputs: loaded(*x), ref),
+                ("physical", lambda x=inputs: _physical_overhead_sun(*x), phys),
+                ("LUT (physical)", lambda x=inputs: phys_lut(*x), phys),
+            ]
+            print(f"-- {label} inputs, {n / 1e6:.1f} M points, 1 thread")
+            for name, func, truth in cases:
+                seconds = min(timeit.repeat(func, number=1, repeat=args.repeat))
+                err = func() - truth
+                print(
+                    f"{name:16s} {n / seconds / 1e6:7.2f} M/s  max|err| {np.abs(err).max():.3f}"
+                    f"  rms {np.sqrt(np.mean(err ** 2)):.4f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
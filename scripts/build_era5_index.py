@@ -0,0 +1,58 @@
+"""Build or refresh local byte-range chunk indexes for the ERA5 files HeatShield reads.
+
+Example: python scripts/build_era5_index.py --start 2024-06 --end 2024-08
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd
+
+from src.data import era5_index
+from src.data.era5 import _get_filesystem, _open_era5, era5_month_objects
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index ERA5 HDF5 chunks for ranged reads.")
+    parser.add_argument("--start", required=True, help="First month, YYYY-MM")
+    parser.add_argument("--end", required=True, help="Last month (inclusive), YYYY-MM")
+    parser.add_argument("--root", default=None, help="Index directory (HEATSHIELD_ERA5_INDEX_DIR)")
+    parser.add_argument("--refresh", action="store_true", help="Rebuild existing indexes")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s :: %(message)s",
+    )
+    fs = _get_filesystem()
+    built = skipped = failed = 0
+    for month in pd.period_range(args.start, args.end, freq="M"):
+        for path, var_name in era5_month_objects(month.year, month.month):
+            target = era5_index.index_file(path, var_name, args.root)
+            if target.exists() and not args.refresh:
+                skipped += 1
+                continue
+            try:
+                payload = era5_index.build_index(
+                    fs, path, var_name, opener=lambda p: _open_era5(fs, p)
+                )
+            except FileNotFoundError:
+                logging.warning("ERA5 object missing, not indexed: %s", path)
+                failed += 1
+                continue
+            except Exception as exc:
+                logging.warning("Could not index %s: %s", path, exc)
+                failed += 1
+                continue
+            era5_index.save_index(payload, args.root)
+            built += 1
+            logging.info("Indexed %s (%s)", path, var_name)
+    print(f"built={built} skipped={skipped} failed={failed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Bulk-refresh the local OpenAQ location catalog used for nearest-sensor lookups.
+
+Example: python scripts/refresh_openaq_catalog.py --bbox -119.0,33.5,-117.5,34.5
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.data.openaq_catalog import refresh_catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the local OpenAQ location catalog.")
+    parser.add_argument(
+        "--bbox",
+        default=None,
+        help="min_lon,min_lat,max_lon,max_lat (default: every PM2.5 location worldwide)",
+    )
+    parser.add_argument("--all-parameters", action="store_true", help="Do not filter to PM2.5")
+    parser.add_argument("--path", default=None, help="Catalog file (HEATSHIELD_OPENAQ_CATALOG)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s :: %(message)s",
+    )
+    bbox = [float(v) for v in args.bbox.split(",")] if args.bbox else None
+    catalog = refresh_catalog(
+        bbox=bbox, parameter_id=None if args.all_parameters else 2, path=args.path
+    )
+    print(f"locations={len(catalog)} fetched_at={catalog.fetched_at}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Mirror the OpenAQ PM2.5 archive for a district's nearby locations into local Parquet.
+
+Example: python scripts/sync_openaq_mirror.py --schools data/schools_demo.csv --start 2024-01 --end 2024-12
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd
+
+from src.data.openaq_mirror import locations_for_points, sync_mirror
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the local OpenAQ PM2.5 Parquet mirror.")
+    parser.add_argument("--schools", default=None, help="CSV with lat/lon columns")
+    parser.add_argument("--locations", default=None, help="Comma-separated OpenAQ location ids")
+    parser.add_argument("--start", required=True, help="First month, YYYY-MM")
+    parser.add_argument("--end", required=True, help="Last month, YYYY-MM")
+    parser.add_argument("--root", default=None, help="Mirror dir (HEATSHIELD_OPENAQ_MIRROR_DIR)")
+    parser.add_argument("--refresh", action="store_true", help="Re-sync months already final")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s :: %(message)s",
+    )
+    ids = [int(v) for v in args.locations.split(",")] if args.locations else []
+    if args.schools:
+        schools = pd.read_csv(args.schools)
+        ids += locations_for_points(list(zip(schools["lat"], schools["lon"])))
+    if not ids:
+        parser.error("give --schools and/or --locations")
+    totals = sync_mirror(ids, args.start, args.end, root=args.root, refresh=args.refresh)
+    print(" ".join(f"{k}={v}" for k, v in totals.items()))
+
+
+if __name__ == "__main__":
+    main()
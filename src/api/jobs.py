@@ -0,0 +1,332 @@
+"""Persistent background jobs for district-scale risk runs.
+
+``RiskJobStore`` keeps each job and its per-school items in SQLite, so progress and finished
+results survive a restart. ``RiskJobRunner`` scores a job's pending schools in batches on its
+own thread pools, apart from the interactive ``/risk`` pool. A runner claims a job with a
+heartbeat lease when it starts running it, and renews the lease on a timer while it runs:
+jobs released by a clean shutdown, or whose runner stopped heartbeating for ``lease_s``, are
+picked up again (from their unfinished schools) by the next runner that looks, at startup or
+when the job is polled.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    use_demo INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    owner TEXT,
+    heartbeat REAL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    school TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    result TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+_JOB_FIELDS = "id, date, use_demo, status, total, done, failed, error, created, updated"
+
+# (date, use_demo, [(index, school dict)], io pool, stop event) -> (index, result, error) as
+# schools finish; it should return promptly once the stop event is set.
+ScoreBatch = Callable[
+    [str, bool, List[Tuple[int, dict]], ThreadPoolExecutor, threading.Event],
+    Iterator[Tuple[int, Optional[dict], Optional[str]]],
+]
+
+
+class RiskJobStore:
+    """SQLite-backed jobs and items; one serialized connection shared by all threads."""
+
+    def __init__(self, path: str = ""):
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path or ":memory:", check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            if path:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _txn(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, args=()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+
+    def create(self, date: str, use_demo: bool, schools: List[dict]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._txn() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, date, use_demo, status, total, created, updated)"
+                " VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, date, int(use_demo), len(schools), now, now),
+            )
+            conn.executemany(
+                "INSERT INTO job_items (job_id, idx, school) VALUES (?, ?, ?)",
+                ((job_id, i, json.dumps(school)) for i, school in enumerate(schools)),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        rows = self._query(f"SELECT {_JOB_FIELDS} FROM jobs WHERE id = ?", (job_id,))
+        if not rows:
+            return None
+        job = dict(zip(_JOB_FIELDS.split(", "), rows[0]))
+        job["use_demo"] = bool(job["use_demo"])
+        job["pending"] = job["total"] - job["done"] - job["failed"]
+        return job
+
+    def status(self, job_id: str) -> Optional[str]:
+        rows = self._query("SELECT status FROM jobs WHERE id = ?", (job_id,))
+        return rows[0][0] if rows else None
+
+    def results(self, job_id: str, after: int = -1, limit: int = 100) -> List[dict]:
+        """Finished items (scored or failed) with index > ``after``, in input order."""
+        rows = self._query(
+            "SELECT idx, school, result, error FROM job_items"
+            " WHERE job_id = ? AND idx > ? AND status IN ('done', 'failed')"
+            " ORDER BY idx LIMIT ?",
+            (job_id, after, limit),
+        )
+        out = []
+        for idx, school, result, error in rows:
+            item = {"index": idx}
+            item.update(json.loads(result) if result else {"school": json.loads(school)})
+            if error:
+                item["error"] = error
+            out.append(item)
+        return out
+
+    def pending(self, job_id: str, limit: int) -> List[Tuple[int, dict]]:
+        rows = self._query(
+            "SELECT idx, school FROM job_items WHERE job_id = ? AND status = 'pending'"
+            " ORDER BY idx LIMIT ?",
+            (job_id, limit),
+        )
+        return [(idx, json.loads(school)) for idx, school in rows]
+
+    def record(
+        self, job_id: str, idx: int, result: Optional[dict], error: Optional[str]
+    ) -> Optional[str]:
+        """Store one school's outcome (first writer wins); returns the job's current status."""
+        now = time.time()
+        with self._txn() as conn:
+            cur = conn.execute(
+                "UPDATE job_items SET status = ?, result = ?, error = ?"
+                " WHERE job_id = ? AND idx = ? AND status = 'pending'",
+                (
+                    "failed" if error else "done",
+                    None if result is None else json.dumps(result),
+                    error,
+                    job_id,
+                    idx,
+                ),
+            )
+            if cur.rowcount:
+                conn.execute(
+                    "UPDATE jobs SET done = done + ?, failed = failed + ?, updated = ?,"
+                    " heartbeat = ? WHERE id = ?",
+                    (int(not error), int(bool(error)), now, now, job_id),
+                )
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def claim(self, job_id: str, owner: str, lease_s: float) -> bool:
+        """Take an active job that is unowned, already ours, or whose owner's lease lapsed."""
+        now = time.time()
+        with self._txn() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET owner = ?, heartbeat = ? WHERE id = ?"
+                " AND status IN ('queued', 'running')"
+                " AND (owner IS NULL OR owner = ? OR heartbeat < ?)",
+                (owner, now, job_id, owner, now - lease_s),
+            )
+            return cur.rowcount == 1
+
+    def claimable(self, owner: str, lease_s: float, job_id: Optional[str] = None) -> List[str]:
+        """Active jobs ``claim`` would give ``owner`` (only ``job_id``, if given), oldest first."""
+        sql = (
+            "SELECT id FROM jobs WHERE status IN ('queued', 'running')"
+            " AND (owner IS NULL OR owner = ? OR heartbeat < ?)"
+        )
+        args: tuple = (owner, time.time() - lease_s)
+        if job_id is not None:
+            sql += " AND id = ?"
+            args += (job_id,)
+        return [row[0] for row in self._query(sql + " ORDER BY created", args)]
+
+    def heartbeat(self, owner: str) -> None:
+        """Renew the lease on every active job ``owner`` holds."""
+        with self._txn() as conn:
+            conn.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status IN ('queued', 'running')",
+                (time.time(), owner),
+            )
+
+    def set_status(
+        self, job_id: str, status: str, owner: Optional[str] = None, error: Optional[str] = None
+    ) -> bool:
+        """Move a still queued or running job to ``status`` (only ``owner``'s, if given)."""
+        sql = (
+            "UPDATE jobs SET status = ?, error = COALESCE(?, error), updated = ?"
+            " WHERE id = ? AND status IN ('queued', 'running')"
+        )
+        args: tuple = (status, error, time.time(), job_id)
+        if owner is not None:
+            sql += " AND owner = ?"
+            args += (owner,)
+        with self._txn() as conn:
+            return conn.execute(sql, args).rowcount == 1
+
+    def release(self, owner: str) -> None:
+        """Hand ``owner``'s active jobs back so another runner can resume them at once."""
+        with self._txn() as conn:
+            conn.execute(
+                "UPDATE jobs SET owner = NULL WHERE owner = ? AND status IN ('queued', 'running')",
+                (owner,),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RiskJobRunner:
+    """Runs claimed jobs ``max_jobs`` at a time, scoring each in batches of ``batch_size``."""
+
+    def __init__(
+        self,
+        store: RiskJobStore,
+        score_batch: ScoreBatch,
+        max_jobs: int = 2,
+        workers: int = 8,
+        batch_size: int = 64,
+        lease_s: float = 600.0,
+    ):
+        self.store = store
+        self.score_batch = score_batch
+        self.batch_size = max(1, int(batch_size))
+        self.lease_s = float(lease_s)
+        self.owner = uuid.uuid4().hex
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="risk-job")
+        self._drivers = ThreadPoolExecutor(
+            max_workers=max(1, max_jobs), thread_name_prefix="risk-job-driver"
+        )
+        self._active: set = set()
+        self._active_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._heartbeat = threading.Thread(
+            target=self._beat, name="risk-job-heartbeat", daemon=True
+        )
+        self._heartbeat.start()
+
+    def submit(self, date: str, use_demo: bool, schools: List[dict]) -> str:
+        job_id = self.store.create(date, use_demo, schools)
+        self.start(job_id)
+        return job_id
+
+    def start(self, job_id: str) -> bool:
+        """Queue ``job_id`` here unless it is already queued here or leased by a live runner.
+
+        The lease is taken only when a driver starts the job, so a job waiting behind others
+        neither holds a lease that lapses in the queue nor blocks another runner that is free.
+        """
+        with self._active_lock:
+            if self._stopping.is_set() or job_id in self._active:
+                return False
+            if not self.store.claimable(self.owner, self.lease_s, job_id):
+                return False
+            self._active.add(job_id)
+        self._drivers.submit(self._run, job_id)
+        return True
+
+    def resume(self) -> int:
+        """Start every claimable job (e.g. those left unfinished by a previous process)."""
+        return sum(self.start(job_id) for job_id in self.store.claimable(self.owner, self.lease_s))
+
+    def _run(self, job_id: str) -> None:
+        try:
+            job = self.store.get(job_id)
+            if job is None or job["status"] not in ACTIVE_STATUSES:
+                return
+            if not self.store.claim(job_id, self.owner, self.lease_s):
+                return  # another runner started it while it waited here
+            self.store.set_status(job_id, "running", owner=self.owner)
+            while not self._stopping.is_set():
+                batch = self.store.pending(job_id, self.batch_size)
+                if not batch:
+                    self.store.set_status(job_id, "done", owner=self.owner)
+                    return
+                outcomes = self.score_batch(
+                    job["date"], job["use_demo"], batch, self.pool, self._stopping
+                )
+                try:
+                    for idx, result, error in outcomes:
+                        status = self.store.record(job_id, idx, result, error)
+                        if status != "running" or self._stopping.is_set():
+                            return  # cancelled, or shutting down with the job left resumable
+                finally:
+                    outcomes.close()
+        except CancelledError:
+            pass  # stop() cancelled the batch's fetches; the job stays resumable
+        except Exception as exc:
+            if self._stopping.is_set():
+                return  # e.g. the pool refused a batch's fetches; the job stays resumable
+            LOGGER.exception("Risk job %s failed", job_id)
+            self.store.set_status(job_id, "failed", error=f"{type(exc).__name__}: {exc}")
+        finally:
+            with self._active_lock:
+                self._active.discard(job_id)
+
+    def _beat(self) -> None:
+        while not self._stopping.wait(max(0.1, self.lease_s / 3)):
+            try:
+                self.store.heartbeat(self.owner)
+            except Exception as exc:
+                LOGGER.warning("Risk job heartbeat failed: %s", exc)
+
+    def stop(self) -> None:
+        """Stop after the schools in flight and release unfinished jobs for the next runner."""
+        self._stopping.set()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self._drivers.shutdown(wait=True, cancel_futures=True)
+        self._heartbeat.join()
+        self.store.release(self.owner)
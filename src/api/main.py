@@ -1,12 +1,37 @@
+import asyncio
+import json
 import logging
 import os
+import time
 from collections import Counter
+import threading
+from concurrent.futures import FIRST_COMPLETED, CancelledError, ThreadPoolExecutor, wait
+from contextlib import asynccontextmanager
+from datetime import date as Date, timedelta
+import numpy as np
+import pandas as pd
 import requests
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional
-
-from ..data.era5 import fetch_era5_hourly
+from typing import Awaitable, Iterator, List, Optional, Tuple
+
+from ..config import (
+    RISK_CACHE_DIR,
+    RISK_CACHE_MAX_ENTRIES,
+    RISK_CACHE_RECENT_DAYS,
+    RISK_CACHE_TTL_S,
+    RISK_JOBS_BATCH,
+    RISK_JOBS_DB,
+    RISK_JOBS_LEASE_S,
+    RISK_JOBS_MAX_RUNNING,
+    RISK_JOBS_WORKERS,
+    RISK_MAX_CONCURRENCY,
+    RISK_MAX_WORKERS,
+    RISK_RANGE_MAX_DAYS,
+    RISK_STATE_MAX_ENTRIES,
+)
+from ..data.era5 import era5_grid_cell, fetch_era5_hourly_many, fetch_era5_hourly_range_many
 from ..data.openaq import fetch_pm25, fetch_pm25_s3
 from ..llm.planner_openai import (
     llm_plan,
@@ -15,11 +40,56 @@ from ..llm.planner_openai import (
     llm_qa_feedback,
 )
 from ..ml.planner_rule_based import plan_from_summary
-from ..ml.risk import compute_risk, summarize_day
+from ..ml.risk import compute_risk, summarize_day, summarize_many
+from ..ml.risk_state import RiskStateStore
 from ..ml.wbgt import _wbgt_thresholds_from_env
+from ..utils.clients import close_clients, get_requests_session
+from ..utils.resilience import flight_stats
+from ..utils.result_cache import ResultCache
+from ..utils.time import utc_today_str
+from .jobs import RiskJobRunner, RiskJobStore
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Pick up /risk/jobs left unfinished by a previous process. Without a jobs database on disk
+    # there is nothing to resume, and the runner waits for the first /risk/jobs request.
+    if RISK_JOBS_DB and os.path.exists(RISK_JOBS_DB):
+        try:
+            resumed = _job_runner().resume()
+            if resumed:
+                LOGGER.info("Resumed %d unfinished risk job(s).", resumed)
+        except Exception as exc:
+            LOGGER.warning("Could not resume risk jobs: %s", exc)
+    yield
+    _stop_job_runner()
+    close_clients()
 
-app = FastAPI(title="HeatShield API", version="0.1.0")
+
+app = FastAPI(title="HeatShield API", version="0.1.0", lifespan=lifespan)
 LOGGER = logging.getLogger(__name__)
+_RISK_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, RISK_MAX_WORKERS), thread_name_prefix="heatshield-risk"
+)
+# Rolling per school-day risk state behind /risk/live, keyed by (lat, lon, date, use_demo).
+_RISK_STATES = RiskStateStore(RISK_STATE_MAX_ENTRIES)
+# Per-school /risk results (summary + sources), keyed by _result_key.
+_RESULT_CACHE = ResultCache(RISK_CACHE_MAX_ENTRIES, RISK_CACHE_DIR)
+# Background /risk/jobs runner. Created by the first /risk/jobs request, or at startup when a
+# jobs database exists to resume, so the app otherwise touches no database.
+_JOB_RUNNER: Optional[RiskJobRunner] = None
+_JOB_RUNNER_LOCK = threading.Lock()
+# How often a job batch waiting on fetches checks whether its runner is stopping.
+_JOB_POLL_S = 0.5
+
+RISK_UNITS = {
+    "temp_c": "°C",
+    "wbgt_c": "°C",
+    "pm25": "µg/m³",
+    "rh": "0-1",
+    "wind_ms": "m/s",
+    "swdown": "W/m²",
+}
 
 
 class School(BaseModel):
@@ -34,6 +104,22 @@ class RiskRequest(BaseModel):
     use_demo: bool = False
 
 
+class RiskRangeRequest(BaseModel):
+    schools: List[School]
+    start: str = Field(..., description="YYYY-MM-DD, first day")
+    end: str = Field(..., description="YYYY-MM-DD, last day (inclusive)")
+    use_demo: bool = False
+
+
+class LiveRiskRequest(BaseModel):
+    school: School
+    date: str = Field(..., description="YYYY-MM-DD")
+    use_demo: bool = False
+    since: Optional[str] = Field(
+        default=None, description="Version token from a previous /risk/live response"
+    )
+
+
 class PlanRequest(BaseModel):
     risk_report: dict
     mode: str = Field("rule", description="rule|llm")
@@ -81,57 +167,429 @@ async def health():
     return {"ok": True}
 
 
-@app.post("/risk")
-async def risk(req: RiskRequest):
-    outputs = []
-    for s in req.schools:
-        met = fetch_era5_hourly(s.lat, s.lon, req.date, req.use_demo)
-        pm = fetch_pm25_s3(s.lat, s.lon, req.date)
-        aq_source = "none"
+def _fetch_school_pm(s: School, date: str) -> Tuple[pd.DataFrame, str]:
+    """Fetch hourly PM2.5 near one school, falling back from the S3 archive to REST."""
+    pm = fetch_pm25_s3(s.lat, s.lon, date)
+    aq_source = "none"
+    if not pm.empty:
+        aq_source = getattr(pm, "attrs", {}).get("aq_source", "openaq-s3")
+    else:
+        LOGGER.info(
+            "OpenAQ S3 empty near lat=%.3f lon=%.3f on %s; attempting REST fallback.",
+            s.lat,
+            s.lon,
+            date,
+        )
+        pm = fetch_pm25(s.lat, s.lon, date)
         if not pm.empty:
-            aq_source = getattr(pm, "attrs", {}).get("aq_source", "openaq-s3")
+            aq_source = "openaq-rest"
+            LOGGER.info("OpenAQ REST fallback succeeded near lat=%.3f lon=%.3f.", s.lat, s.lon)
         else:
-            LOGGER.info(
-                "OpenAQ S3 empty near lat=%.3f lon=%.3f on %s; attempting REST fallback.",
+            LOGGER.warning(
+                "OpenAQ REST fallback also empty near lat=%.3f lon=%.3f on %s.",
                 s.lat,
                 s.lon,
-                req.date,
+                date,
+            )
+    return pm, aq_source
+
+
+def _merge_pm(met: pd.DataFrame, pm: pd.DataFrame) -> pd.DataFrame:
+    """Hourly PM2.5 joined onto the (shared, read-only) cell meteorology, gaps filled."""
+    if not pm.empty:
+        met = met.merge(pm, on="time", how="left")
+        met["pm25"] = met["pm25"].interpolate().fillna(method="bfill").fillna(method="ffill")
+    return met
+
+
+def _met_source(met: pd.DataFrame, use_demo: bool) -> str:
+    return getattr(met, "attrs", {}).get("met_source", ("demo" if use_demo else "asdi-era5"))
+
+
+def _score_school(
+    s: School, met: pd.DataFrame, pm: pd.DataFrame, aq_source: str, use_demo: bool
+) -> dict:
+    """Merge PM2.5 into the cell meteorology and summarize the day."""
+    summary = summarize_day(compute_risk(_merge_pm(met, pm)))
+    return {
+        "school": s.model_dump(),
+        "summary": summary,
+        "sources": {"met_source": _met_source(met, use_demo), "aq_source": aq_source},
+    }
+
+
+async def _run_in_pool(semaphore: asyncio.Semaphore, func, *args):
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_RISK_EXECUTOR, func, *args)
+
+
+def _result_key(s: School, cell: Tuple[float, float], date: str, use_demo: bool) -> tuple:
+    # Meteorology is per ERA5 cell, but PM2.5 comes from the sensors nearest the school itself,
+    # so its position (to ~10 m) is part of the key too.
+    thresholds = tuple(_wbgt_thresholds_from_env())
+    return ("risk", cell, round(s.lat, 4), round(s.lon, 4), date, use_demo, thresholds)
+
+
+def _result_ttl(date: str, sources: dict, use_demo: bool) -> Optional[float]:
+    """None (immutable) for settled past days; a TTL while the inputs may still change."""
+    degraded = sources["aq_source"] == "none" or (not use_demo and sources["met_source"] == "demo")
+    try:
+        day = Date.fromisoformat(date)
+    except ValueError:
+        return RISK_CACHE_TTL_S
+    cutoff = Date.fromisoformat(utc_today_str()) - timedelta(days=RISK_CACHE_RECENT_DAYS)
+    return RISK_CACHE_TTL_S if degraded or day >= cutoff else None
+
+
+def _school_scores(req: RiskRequest) -> List[Awaitable[dict]]:
+    """One awaitable per school, in input order, sharing a single batched meteorology fetch."""
+    semaphore = asyncio.Semaphore(max(1, RISK_MAX_CONCURRENCY))
+    cells = [era5_grid_cell(s.lat, s.lon) for s in req.schools]
+    keys = [_result_key(s, cell, req.date, req.use_demo) for s, cell in zip(req.schools, cells)]
+    cached = [_RESULT_CACHE.get(key) for key in keys]
+    # Schools sharing an ERA5 cell get identical meteorology, so fetch each distinct cell once,
+    # and all of them in one batch so every monthly file is opened once per request.
+    distinct = list(dict.fromkeys(cell for cell, hit in zip(cells, cached) if hit is None))
+    cell_pos = {cell: pos for pos, cell in enumerate(distinct)}
+    met_task = None
+    if distinct:
+        met_task = asyncio.ensure_future(
+            _run_in_pool(semaphore, fetch_era5_hourly_many, distinct, req.date, req.use_demo)
+        )
+
+    async def hit(s: School, value: dict) -> dict:
+        return {"school": s.model_dump(), **value}
+
+    async def one(s: School, cell: Tuple[float, float], key: tuple) -> dict:
+        pm, aq_source = await _run_in_pool(semaphore, _fetch_school_pm, s, req.date)
+        met = (await met_task)[cell_pos[cell]]
+        result = _score_school(s, met, pm, aq_source, req.use_demo)
+        value = {"summary": result["summary"], "sources": result["sources"]}
+        _RESULT_CACHE.put(key, value, _result_ttl(req.date, result["sources"], req.use_demo))
+        return result
+
+    return [
+        one(s, cell, key) if value is None else hit(s, value)
+        for s, cell, key, value in zip(req.schools, cells, keys, cached)
+    ]
+
+
+@app.post("/risk")
+async def risk(req: RiskRequest):
+    # gather() keeps results in input order even though schools finish out of order.
+    outputs = await asyncio.gather(*_school_scores(req))
+    return {"date": req.date, "results": list(outputs), "units": RISK_UNITS}
+
+
+def _range_days(start: str, end: str) -> List[str]:
+    try:
+        days = pd.date_range(pd.Timestamp(start), pd.Timestamp(end), freq="D")
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {exc}")
+    if not len(days):
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if len(days) > RISK_RANGE_MAX_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {RISK_RANGE_MAX_DAYS} days per request"
+        )
+    return days.strftime("%Y-%m-%d").tolist()
+
+
+def _summarize_range(
+    slots: List[Tuple[int, str]],
+    cells: List[Tuple[float, float]],
+    met_by_cell: dict,
+    pm_by_slot: List[Tuple[pd.DataFrame, str]],
+    use_demo: bool,
+) -> List[dict]:
+    """Score many school-days in one ``compute_risk`` / ``summarize_many`` pass."""
+    columns = ("time", "temp_c", "rh", "wind_ms", "swdown")
+    arrays, spans = {}, {}
+    for cell, met in met_by_cell.items():
+        arrays[cell] = {name: met[name].to_numpy() for name in columns}
+        day_of = met["time"].dt.strftime("%Y-%m-%d").to_numpy()
+        days, first, counts = np.unique(day_of, return_index=True, return_counts=True)
+        spans[cell] = {day: (lo, lo + n) for day, lo, n in zip(days, first, counts)}
+    parts = {name: [] for name in columns + ("pm25",)}
+    sizes, sources = [], []
+    for (i, day), (pm, aq_source) in zip(slots, pm_by_slot):
+        cell = cells[i]
+        lo, hi = spans[cell][day]
+        if pm.empty:
+            for name in columns:
+                parts[name].append(arrays[cell][name][lo:hi])
+            parts["pm25"].append(np.full(hi - lo, 10.0))  # compute_risk's default
+        else:
+            # Same per-day PM merge and gap filling as /risk, so each day matches a /risk call.
+            merged = _merge_pm(met_by_cell[cell].iloc[lo:hi], pm)
+            for name in parts:
+                parts[name].append(merged[name].to_numpy())
+        sizes.append(len(parts["time"][-1]))
+        sources.append(
+            {"met_source": _met_source(met_by_cell[cell], use_demo), "aq_source": aq_source}
+        )
+    frame = pd.DataFrame({name: np.concatenate(chunks) for name, chunks in parts.items()})
+    frame["slot"] = np.repeat(np.arange(len(slots)), sizes)
+    rows = summarize_many(compute_risk(frame), by="slot").to_dict(orient="index")
+    return [{"summary": rows[slot], "sources": sources[slot]} for slot in range(len(slots))]
+
+
+@app.post("/risk/range")
+async def risk_range(req: RiskRangeRequest):
+    """Per-school, per-day summaries for ``start``..``end`` from one pipeline run.
+
+    Meteorology for every distinct ERA5 cell is read once for the whole window (each monthly
+    file opened once), PM2.5 is fetched per school-day on the shared pool, and all school-days
+    are scored in a single vectorized pass. School-days already in the result cache are reused.
+    """
+    days = _range_days(req.start, req.end)
+    semaphore = asyncio.Semaphore(max(1, RISK_MAX_CONCURRENCY))
+    cells = [era5_grid_cell(s.lat, s.lon) for s in req.schools]
+    keys = {
+        (i, day): _result_key(s, cells[i], day, req.use_demo)
+        for i, s in enumerate(req.schools)
+        for day in days
+    }
+    values = {slot: _RESULT_CACHE.get(key) for slot, key in keys.items()}
+    missing = [slot for slot, value in values.items() if value is None]
+    if missing:
+        distinct = list(dict.fromkeys(cells[i] for i, _ in missing))
+        met_task = asyncio.ensure_future(
+            _run_in_pool(
+                semaphore, fetch_era5_hourly_range_many, distinct, days[0], days[-1], req.use_demo
             )
-            pm = fetch_pm25(s.lat, s.lon, req.date)
-            if not pm.empty:
-                aq_source = "openaq-rest"
-                LOGGER.info("OpenAQ REST fallback succeeded near lat=%.3f lon=%.3f.", s.lat, s.lon)
-            else:
-                LOGGER.warning(
-                    "OpenAQ REST fallback also empty near lat=%.3f lon=%.3f on %s.",
-                    s.lat,
-                    s.lon,
-                    req.date,
-                )
-        if not pm.empty:
-            met = met.merge(pm, on="time", how="left")
-            met["pm25"] = met["pm25"].interpolate().fillna(method="bfill").fillna(method="ffill")
-        df = compute_risk(met)
-        summary = summarize_day(df)
-        met_source = getattr(met, "attrs", {}).get(
-            "met_source", ("demo" if req.use_demo else "asdi-era5")
         )
-        outputs.append(
+        pm_by_slot = await asyncio.gather(
+            *(_run_in_pool(semaphore, _fetch_school_pm, req.schools[i], day) for i, day in missing)
+        )
+        met_by_cell = dict(zip(distinct, await met_task))
+        scored = await _run_in_pool(
+            semaphore, _summarize_range, missing, cells, met_by_cell, pm_by_slot, req.use_demo
+        )
+        for (i, day), value in zip(missing, scored):
+            values[(i, day)] = value
+            ttl = _result_ttl(day, value["sources"], req.use_demo)
+            _RESULT_CACHE.put(keys[(i, day)], value, ttl)
+    results = [
+        {"school": s.model_dump(), "days": [{"date": day, **values[(i, day)]} for day in days]}
+        for i, s in enumerate(req.schools)
+    ]
+    return {"start": days[0], "end": days[-1], "results": results, "units": RISK_UNITS}
+
+
+@app.get("/risk/cache")
+async def risk_cache_stats():
+    """Hit/miss counters of the per-school /risk result cache, plus upstream fetch coalescing."""
+    return {**_RESULT_CACHE.stats(), "single_flight": flight_stats()}
+
+
+def _ndjson(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False, allow_nan=False) + "\n"
+
+
+@app.post("/risk/stream")
+async def risk_stream(req: RiskRequest):
+    """``/risk`` as NDJSON: one line per school in completion order, then a closing record.
+
+    School lines carry the school's input ``index`` and either the ``/risk`` result fields or
+    an ``error``; a failed school does not stop the others. The last line is
+    ``{"done": true, ...}`` with ``units``, counts and timings.
+    """
+    start = time.perf_counter()
+
+    async def indexed(index: int, score: Awaitable[dict]) -> Tuple[bool, str]:
+        try:
+            record = {"index": index, **(await score)}
+            return True, _ndjson({**record, "elapsed_s": round(time.perf_counter() - start, 3)})
+        except Exception as exc:
+            LOGGER.warning("risk/stream: school %d failed: %s", index, exc)
+            error = {
+                "index": index,
+                "school": req.schools[index].model_dump(),
+                "error": f"{type(exc).__name__}: {exc}",
+                "elapsed_s": round(time.perf_counter() - start, 3),
+            }
+            return False, _ndjson(error)
+
+    async def records():
+        tasks = [asyncio.ensure_future(indexed(i, c)) for i, c in enumerate(_school_scores(req))]
+        first_s, failed = None, 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                ok, line = await next_done
+                failed += not ok
+                if first_s is None:
+                    first_s = time.perf_counter() - start
+                yield line
+        finally:
+            # A client that disconnects mid-stream should not leave schools queued on the pool.
+            for task in tasks:
+                task.cancel()
+        yield _ndjson(
             {
-                "school": s.model_dump(),
-                "summary": summary,
-                "sources": {"met_source": met_source, "aq_source": aq_source},
+                "done": True,
+                "date": req.date,
+                "total": len(tasks),
+                "failed": failed,
+                "units": RISK_UNITS,
+                "timings": {
+                    "first_result_s": None if first_s is None else round(first_s, 3),
+                    "total_s": round(time.perf_counter() - start, 3),
+                },
             }
         )
-    units = {
-        "temp_c": "°C",
-        "wbgt_c": "°C",
-        "pm25": "µg/m³",
-        "rh": "0-1",
-        "wind_ms": "m/s",
-        "swdown": "W/m²",
+
+    return StreamingResponse(records(), media_type="application/x-ndjson")
+
+
+def _score_job_batch(
+    date: str,
+    use_demo: bool,
+    batch: List[Tuple[int, dict]],
+    pool: ThreadPoolExecutor,
+    stop: threading.Event,
+) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Score one batch of a /risk/jobs run, yielding ``(index, result, error)`` as schools finish.
+
+    Waits poll ``stop``: the runner's shutdown cancels queued fetches, and a future cancelled
+    that way never completes a ``wait`` on it.
+    """
+    schools = [(idx, School(**school)) for idx, school in batch]
+    cells = [era5_grid_cell(s.lat, s.lon) for _, s in schools]
+    cell_pos = {cell: pos for pos, cell in enumerate(dict.fromkeys(cells))}
+    met_future = pool.submit(fetch_era5_hourly_many, list(cell_pos), date, use_demo)
+    pm_futures = {
+        pool.submit(_fetch_school_pm, s, date): (idx, s, cell)
+        for (idx, s), cell in zip(schools, cells)
     }
-    return {"date": req.date, "results": outputs, "units": units}
+    pending = set(pm_futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=_JOB_POLL_S, return_when=FIRST_COMPLETED)
+            while done and not met_future.done():
+                wait([met_future], timeout=_JOB_POLL_S)
+                if stop.is_set():
+                    return
+            if stop.is_set():
+                return
+            for future in done:
+                idx, s, cell = pm_futures[future]
+                try:
+                    met = met_future.result()[cell_pos[cell]]
+                    yield idx, _score_school(s, met, *future.result(), use_demo), None
+                except CancelledError:
+                    raise  # the runner is stopping; leave the school pending for resume
+                except Exception as exc:
+                    LOGGER.warning("Risk job school %s failed: %s", s.name, exc)
+                    yield idx, None, f"{type(exc).__name__}: {exc}"
+    finally:
+        met_future.cancel()
+        for future in pm_futures:
+            future.cancel()
+
+
+def _job_runner() -> RiskJobRunner:
+    global _JOB_RUNNER
+    with _JOB_RUNNER_LOCK:
+        if _JOB_RUNNER is None:
+            _JOB_RUNNER = RiskJobRunner(
+                RiskJobStore(RISK_JOBS_DB),
+                _score_job_batch,
+                max_jobs=RISK_JOBS_MAX_RUNNING,
+                workers=RISK_JOBS_WORKERS,
+                batch_size=RISK_JOBS_BATCH,
+                lease_s=RISK_JOBS_LEASE_S,
+            )
+        return _JOB_RUNNER
+
+
+def _stop_job_runner() -> None:
+    """Stop the runner and forget it, so a later startup in this process gets a fresh one."""
+    global _JOB_RUNNER
+    with _JOB_RUNNER_LOCK:
+        runner, _JOB_RUNNER = _JOB_RUNNER, None
+    if runner is not None:
+        runner.stop()
+        runner.store.close()
+
+
+@app.post("/risk/jobs", status_code=202)
+async def create_risk_job(req: RiskRequest):
+    """Queue a district-scale run; poll ``GET /risk/jobs/{id}`` for progress and results."""
+    runner = _job_runner()
+    schools = [s.model_dump() for s in req.schools]
+    loop = asyncio.get_running_loop()
+    job_id = await loop.run_in_executor(None, runner.submit, req.date, req.use_demo, schools)
+    return {"job": runner.store.get(job_id)}
+
+
+@app.get("/risk/jobs/{job_id}")
+async def get_risk_job(
+    job_id: str,
+    after: int = Query(-1, description="Return finished schools with an index above this"),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Job progress plus the next page of finished schools, in input order."""
+    runner = _job_runner()
+    job = runner.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    if job["status"] in ("queued", "running"):
+        runner.start(job_id)  # no-op unless its runner went away
+    results = runner.store.results(job_id, after, limit)
+    return {
+        "job": job,
+        "results": results,
+        "next_after": results[-1]["index"] if results else after,
+        "units": RISK_UNITS,
+    }
+
+
+@app.post("/risk/jobs/{job_id}/cancel")
+async def cancel_risk_job(job_id: str):
+    """Stop a queued or running job; finished schools stay readable."""
+    store = _job_runner().store
+    if store.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    store.set_status(job_id, "cancelled")
+    return {"job": store.get(job_id)}
+
+
+def _live_update(req: LiveRiskRequest) -> dict:
+    """Refetch the school-day, fold changed hours into its state, and diff against ``since``."""
+    s = req.school
+    met = fetch_era5_hourly_many([era5_grid_cell(s.lat, s.lon)], req.date, req.use_demo)[0]
+    pm, aq_source = _fetch_school_pm(s, req.date)
+    hourly = _merge_pm(met, pm)
+    state = _RISK_STATES.get((s.lat, s.lon, req.date, req.use_demo))
+    with state.lock:
+        updated = state.update(hourly)
+        changed, full = state.changes_since(req.since)
+        token, summary = state.token, state.summary()
+    LOGGER.debug("risk/live %s %s: %d hours recomputed", s.name, req.date, len(updated))
+    return {
+        "school": s.model_dump(),
+        "date": req.date,
+        "version": token,
+        "summary": summary,
+        "changed_hours": changed,
+        "full": full,
+        "sources": {"met_source": _met_source(met, req.use_demo), "aq_source": aq_source},
+        "units": RISK_UNITS,
+    }
+
+
+@app.post("/risk/live")
+async def risk_live(req: LiveRiskRequest):
+    """One school-day, recomputed incrementally: only hours whose inputs moved are rescored.
+
+    Pass the previous response's ``version`` as ``since`` to get just the hours that changed
+    after it; an unknown or stale token (restart, eviction, threshold change) returns every
+    hour with ``full: true``.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_RISK_EXECUTOR, _live_update, req)
 
 
 @app.post("/plan")
@@ -259,7 +717,7 @@ def _analyze_schools(schools: List[School]) -> dict:
         issues.append(
             {
                 "severity": "low",
-                "message": f"Large upload ({len(schools)} schools). Consider demo/testing in smaller batches for Live mode.",
+                "message": f"Large upload ({len(schools)} schools). Consider demo/testing in smaller batches for Live mode, or submit it as a background job (POST /risk/jobs).",
             }
         )
     score = max(0, 100 - len(issues) * 8)
@@ -287,7 +745,7 @@ async def automation_send(req: AutomationRequest):
     delivered = False
     if webhook:
         try:
-            requests.post(webhook, json={"text": message}, timeout=10)
+            get_requests_session().post(webhook, json={"text": message}, timeout=10)
             delivered = True
         except requests.exceptions.RequestException:
             LOGGER.warning("Failed to deliver automation message to %s", channel)
@@ -6,3 +6,85 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAQ_API_KEY = os.getenv("OPENAQ_API_KEY", "")
 AWS_REGION = os.getenv("AWS_REGION", "us-west-2")
+
+# /risk fan-out: size of the shared worker pool and the per-request cap on in-flight schools
+RISK_MAX_WORKERS = int(os.getenv("HEATSHIELD_RISK_WORKERS", "16"))
+RISK_MAX_CONCURRENCY = int(os.getenv("HEATSHIELD_RISK_CONCURRENCY", "8"))
+# /risk/range: longest window (days) one request may cover
+RISK_RANGE_MAX_DAYS = int(os.getenv("HEATSHIELD_RISK_RANGE_MAX_DAYS", "120"))
+# /risk/live: school-days whose incremental risk state is kept in memory (least recent evicted)
+RISK_STATE_MAX_ENTRIES = int(os.getenv("HEATSHIELD_RISK_STATE_MAX", "4096"))
+
+# /risk result cache: in-memory entries, optional shared disk store (empty disables it), and the
+# TTL for results that can still change (dates within the recent window, or degraded sources)
+RISK_CACHE_MAX_ENTRIES = int(os.getenv("HEATSHIELD_RISK_CACHE_MAX", "20000"))
+RISK_CACHE_DIR = os.getenv("HEATSHIELD_RISK_CACHE_DIR", "")
+RISK_CACHE_TTL_S = float(os.getenv("HEATSHIELD_RISK_CACHE_TTL", "900"))
+RISK_CACHE_RECENT_DAYS = int(os.getenv("HEATSHIELD_RISK_CACHE_RECENT_DAYS", "7"))
+
+# /risk/jobs: SQLite job database (empty keeps jobs in memory), jobs run at once, fetch threads
+# shared by running jobs, schools per batch, and how long a silent runner keeps its claim
+RISK_JOBS_DB = os.getenv(
+    "HEATSHIELD_RISK_JOBS_DB",
+    os.path.join(os.path.expanduser("~"), ".cache", "heatshield", "risk_jobs.sqlite3"),
+)
+RISK_JOBS_MAX_RUNNING = int(os.getenv("HEATSHIELD_RISK_JOBS", "2"))
+RISK_JOBS_WORKERS = int(os.getenv("HEATSHIELD_RISK_JOB_WORKERS", "8"))
+RISK_JOBS_BATCH = int(os.getenv("HEATSHIELD_RISK_JOB_BATCH", "64"))
+RISK_JOBS_LEASE_S = float(os.getenv("HEATSHIELD_RISK_JOB_LEASE", "600"))
+
+# Concurrent OpenAQ archive reads (candidate sensors are fetched in parallel)
+OPENAQ_IO_WORKERS = int(os.getenv("HEATSHIELD_OPENAQ_IO_WORKERS", "16"))
+# Streaming archive CSV parse batch: bytes per PyArrow block / rows per pandas chunk
+OPENAQ_PARSE_BLOCK_BYTES = int(os.getenv("HEATSHIELD_OPENAQ_PARSE_BLOCK_KB", "1024")) * 1024
+OPENAQ_PARSE_CHUNK_ROWS = int(os.getenv("HEATSHIELD_OPENAQ_PARSE_CHUNK_ROWS", "50000"))
+
+# Local Parquet mirror of hourly OpenAQ PM2.5 (scripts/sync_openaq_mirror.py); empty disables it
+OPENAQ_MIRROR_DIR = os.getenv(
+    "HEATSHIELD_OPENAQ_MIRROR_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "heatshield", "openaq-pm25"),
+)
+
+# Concurrent ERA5 object reads: pool size and how long to wait for any single file (seconds)
+ERA5_IO_WORKERS = int(os.getenv("HEATSHIELD_ERA5_IO_WORKERS", "8"))
+ERA5_FILE_TIMEOUT = float(os.getenv("HEATSHIELD_ERA5_FILE_TIMEOUT", "60"))
+
+# On-disk cache of ERA5 NetCDF byte blocks shared by all API workers; set the dir empty to disable
+ERA5_CACHE_DIR = os.getenv(
+    "HEATSHIELD_ERA5_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "heatshield", "era5"),
+)
+ERA5_CACHE_MAX_BYTES = int(float(os.getenv("HEATSHIELD_ERA5_CACHE_MAX_MB", "4096")) * 1024 * 1024)
+ERA5_CACHE_BLOCK_BYTES = int(float(os.getenv("HEATSHIELD_ERA5_CACHE_BLOCK_KB", "2048")) * 1024)
+
+# Local store of ERA5 byte-range chunk indexes (built with scripts/build_era5_index.py)
+ERA5_INDEX_DIR = os.getenv(
+    "HEATSHIELD_ERA5_INDEX_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "heatshield", "era5-index"),
+)
+
+# Failing upstreams: how long a known-missing object / rejected call is skipped (seconds),
+# and how many consecutive failures open an endpoint's circuit breaker and for how long
+NEGATIVE_CACHE_TTL_S = float(os.getenv("HEATSHIELD_NEGATIVE_TTL", "900"))
+BREAKER_FAILURES = int(os.getenv("HEATSHIELD_BREAKER_FAILURES", "3"))
+BREAKER_RESET_S = float(os.getenv("HEATSHIELD_BREAKER_RESET", "300"))
+BREAKER_GONE_S = float(os.getenv("HEATSHIELD_BREAKER_GONE", "86400"))
+
+# Shared client pools (see src/utils/clients.py)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HEATSHIELD_HTTP_MAX_CONNECTIONS", "64"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HEATSHIELD_HTTP_MAX_KEEPALIVE", "32"))
+HTTP_ENABLE_HTTP2 = os.getenv("HEATSHIELD_HTTP2", "1").strip().lower() not in ("0", "false", "no")
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("HEATSHIELD_S3_MAX_CONNECTIONS", "64"))
+
+# Local OpenAQ location catalog (scripts/refresh_openaq_catalog.py) and when it counts as stale
+OPENAQ_CATALOG_PATH = os.getenv(
+    "HEATSHIELD_OPENAQ_CATALOG",
+    os.path.join(os.path.expanduser("~"), ".cache", "heatshield", "openaq_locations.json"),
+)
+OPENAQ_CATALOG_MAX_AGE_S = float(os.getenv("HEATSHIELD_OPENAQ_CATALOG_MAX_AGE_DAYS", "30")) * 86400
+
+# Precomputed WBGT table for wbgt_liljegren_from_met(use_lut=True); empty keeps it in memory only
+WBGT_LUT_PATH = os.getenv(
+    "HEATSHIELD_WBGT_LUT",
+    os.path.join(os.path.expanduser("~"), ".cache", "heatshield", "wbgt_lut.npy"),
+)
@@ -0,0 +1,203 @@
+import hashlib
+import io
+import logging
+import mmap
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+try:
+    import fcntl  # type: ignore
+except Exception:  # pragma: no cover - Windows
+    fcntl = None
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 2 * 1024 * 1024
+
+
+class BlockCache:
+    """Size-bounded on-disk cache of fixed-size byte blocks of remote (immutable) objects.
+
+    Blocks live under ``root`` as one file per ``(path, block size, block index)``, so changing
+    the block size never serves a block cut at other offsets. Writes go to a temp file
+    in the same directory and are published with ``os.replace``, so readers in other processes
+    only ever see complete blocks. Recency is tracked through file mtimes, which every process
+    sharing the directory updates on hit, and eviction removes least-recently-used blocks until
+    the directory is back under ``max_bytes``. Concurrent evictions are serialized with an
+    advisory lock where the platform has one; losing a race to delete a file is harmless.
+    """
+
+    def __init__(self, root: str, max_bytes: int, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self.block_size = int(block_size)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._written_since_evict = 0
+
+    def open(self, fs, path: str) -> "CachedFile":
+        """Return a read-only file object for ``path`` served from the cache where possible."""
+        return CachedFile(self, fs, path, self._size(fs, path))
+
+    def _key_dir(self, path: str) -> Tuple[Path, str]:
+        key = hashlib.sha1(path.encode("utf-8")).hexdigest()
+        return self.root / key[:2], key
+
+    def _size(self, fs, path: str) -> int:
+        folder, key = self._key_dir(path)
+        meta = folder / f"{key}.size"
+        try:
+            return int(meta.read_text())
+        except (FileNotFoundError, ValueError):
+            pass
+        size = int(fs.size(path))
+        self._publish(meta, str(size).encode("ascii"))
+        return size
+
+    def read_block(self, fs, path: str, index: int, size: int) -> memoryview:
+        folder, key = self._key_dir(path)
+        block_path = folder / f"{key}.b{self.block_size}.{index}.blk"
+        try:
+            with open(block_path, "rb") as fh:
+                os.utime(block_path)
+                if os.fstat(fh.fileno()).st_size == 0:
+                    return memoryview(b"")
+                return memoryview(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+        except FileNotFoundError:
+            pass
+        start = index * self.block_size
+        end = min(start + self.block_size, size)
+        data = fs.cat_file(path, start=start, end=end)
+        self._publish(block_path, data)
+        with self._lock:
+            self._written_since_evict += len(data)
+            due = self._written_since_evict >= max(self.block_size, self.max_bytes // 20)
+            if due:
+                self._written_since_evict = 0
+        if due:
+            self.evict()
+        return memoryview(data)
+
+    def _publish(self, target: Path, data: bytes) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, target)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def usage(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self):
+        for folder in self.root.iterdir():
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder):
+                if not entry.name.endswith(".blk"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield entry.path, stat.st_size, stat.st_mtime
+
+    def evict(self) -> int:
+        """Delete least-recently-used blocks until usage fits the budget; returns bytes freed."""
+        with open(self.root / ".evict.lock", "a+") as lock_fh:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return 0  # another worker is already evicting
+            entries = sorted(self._entries(), key=lambda item: item[2])
+            total = sum(size for _, size, _ in entries)
+            freed = 0
+            for block_path, size, _ in entries:
+                if total - freed <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(block_path)
+                    freed += size
+                except OSError:
+                    continue
+            if freed:
+                LOGGER.info("ERA5 cache evicted %d bytes from %s", freed, self.root)
+            return freed
+
+
+class CachedFile(io.RawIOBase):
+    """Seekable read-only view of a remote object that pulls bytes through a ``BlockCache``."""
+
+    def __init__(self, cache: BlockCache, fs, path: str, size: int):
+        super().__init__()
+        self._cache = cache
+        self._fs = fs
+        self.path = path
+        self.size = size
+        self._pos = 0
+        self._block: Optional[Tuple[int, memoryview]] = None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self.size + offset
+        else:
+            raise ValueError(f"invalid whence {whence}")
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        out = memoryview(buffer).cast("B")
+        written = 0
+        block_size = self._cache.block_size
+        while written < len(out) and self._pos < self.size:
+            index, offset = divmod(self._pos, block_size)
+            with self._get_block(index)[offset : offset + len(out) - written] as chunk:
+                count = len(chunk)
+                if not count:
+                    break
+                out[written : written + count] = chunk
+            written += count
+            self._pos += count
+        return written
+
+    def _get_block(self, index: int) -> memoryview:
+        if self._block is None or self._block[0] != index:
+            self._release_block()
+            self._block = (index, self._cache.read_block(self._fs, self.path, index, self.size))
+        return self._block[1]
+
+    def _release_block(self) -> None:
+        if self._block is None:
+            return
+        view = self._block[1]
+        self._block = None
+        base = view.obj
+        view.release()
+        if isinstance(base, mmap.mmap):
+            base.close()
+
+    def close(self) -> None:
+        self._release_block()
+        super().close()
@@ -1,11 +1,26 @@
 import logging
+import threading
+import time
 from calendar import monthrange
-from typing import Dict, List, Sequence, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 
-from ..config import AWS_REGION
+from ..config import (
+    ERA5_CACHE_BLOCK_BYTES,
+    ERA5_CACHE_DIR,
+    ERA5_CACHE_MAX_BYTES,
+    ERA5_FILE_TIMEOUT,
+    ERA5_IO_WORKERS,
+)
+from ..utils.clients import get_s3fs
+from ..utils.geo import round_latlon
+from ..utils.resilience import NEGATIVE_CACHE, get_breaker, get_flight
+from . import era5_index
+from .cache import BlockCache
 from .demo import synthetic_hourly_series
 
 try:
@@ -22,6 +37,12 @@ ANALYSIS_PREFIX = "e5.oper.an.sfc"
 MEAN_FLUX_PREFIX = "e5.oper.fc.sfc.meanflux"
 MEAN_FLUX_CODE = "235_035_msdwswrf"
 MEAN_FLUX_VAR = "MSDWSWRF"
+GRID_STEP_DEG = 0.25
+
+# Shared pool for independent ERA5 object reads (analysis fields and mean-flux files).
+_IO_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, ERA5_IO_WORKERS), thread_name_prefix="heatshield-era5"
+)
 
 ANALYSIS_FIELDS: Dict[str, Tuple[str, str]] = {
     "temp_k": ("128_167_2t", "VAR_2T"),
@@ -36,65 +57,176 @@ def fetch_era5_hourly(lat: float, lon: float, date: str, force_demo: bool = Fals
     Retrieve hourly meteorology for the given UTC date by sampling the nearest ERA5 grid cell.
     Falls back to the synthetic demo series if ASDI access is unavailable.
     """
-    start = pd.Timestamp(date).floor("D")
-    end = start + pd.Timedelta(hours=23)
+    return fetch_era5_hourly_many([(lat, lon)], date, force_demo)[0]
+
+
+def fetch_era5_hourly_many(
+    points: Sequence[Tuple[float, float]], date: str, force_demo: bool = False
+) -> List[pd.DataFrame]:
+    """
+    Batch variant of ``fetch_era5_hourly``: one frame per ``(lat, lon)`` point, in input order.
+
+    Each monthly NetCDF file is opened once per call and every point is pulled from it with a
+    single pointwise (vectorized) nearest-neighbour selection.
+    """
+    return fetch_era5_hourly_range_many(points, date, date, force_demo)
+
+
+def fetch_era5_hourly_range(
+    lat: float, lon: float, start: str, end: str, force_demo: bool = False
+) -> pd.DataFrame:
+    """Hourly meteorology for every UTC hour from ``start`` 00:00 through ``end`` 23:00."""
+    return fetch_era5_hourly_range_many([(lat, lon)], start, end, force_demo)[0]
+
+
+def fetch_era5_hourly_range_many(
+    points: Sequence[Tuple[float, float]], start: str, end: str, force_demo: bool = False
+) -> List[pd.DataFrame]:
+    """
+    Multi-day, multi-point ERA5 fetch: one frame per point covering ``start``..``end`` (inclusive).
+
+    The monthly files spanning the window are worked out once and each is read once, sliced to
+    its part of the window. The 12-hour shortwave padding is applied only at the window edges.
+    """
+    points = [(float(lat), float(lon)) for lat, lon in points]
+    if not points:
+        return []
+    first = pd.Timestamp(start).floor("D")
+    last = pd.Timestamp(end).floor("D") + pd.Timedelta(hours=23)
+    if last < first:
+        raise ValueError(f"end date {end} is before start date {start}")
+    label = str(start) if first.date() == pd.Timestamp(end).date() else f"{start}..{end}"
 
     if force_demo:
         LOGGER.info("Demo mode: using synthetic meteorology")
-        _df = synthetic_hourly_series(date)[["time", "temp_c", "rh", "wind_ms", "swdown"]]
-        try:
-            _df.attrs["met_source"] = "demo"
-        except Exception:
-            pass
-        return _df
+        return _demo_frames(len(points), first, last)
     if xr is None or s3fs is None:
         LOGGER.warning("xarray/s3fs not available; using synthetic meteorology.")
-        _df = synthetic_hourly_series(date)[["time", "temp_c", "rh", "wind_ms", "swdown"]]
-        try:
-            _df.attrs["met_source"] = "demo"
-        except Exception:
-            pass
-        return _df
+        return _demo_frames(len(points), first, last)
+
+    # Points in the same grid cell get the same series, and concurrent callers (other requests,
+    # jobs) asking for a cell and window already in flight share that fetch; the frames are
+    # shared too, so callers treat them as read-only.
+    cells = [era5_grid_cell(lat, lon) for lat, lon in points]
+    distinct = list(dict.fromkeys(cells))
+    window = (str(first.date()), str(last.date()))
+    frames = get_flight("era5-s3").do_many(
+        [("era5-s3", cell) + window for cell in distinct],
+        lambda keys: _fetch_cells([key[1] for key in keys], first, last, label),
+    )
+    by_cell = dict(zip(distinct, frames))
+    return [by_cell[cell] for cell in cells]
+
+
+def _fetch_cells(
+    points: List[Tuple[float, float]], first: pd.Timestamp, last: pd.Timestamp, label: str
+) -> List[pd.DataFrame]:
+    """Live ERA5 read of grid-cell centres (``era5_grid_cell``); demo frames on failure."""
+    breaker = get_breaker("era5-s3")
+    if not breaker.allow():
+        LOGGER.warning("ERA5 S3 circuit open; using synthetic meteorology.")
+        return _demo_frames(len(points), first, last)
 
     try:
         fs = _get_filesystem()
-        lon_mod = _to_360(lon)
-        analysis = _load_analysis_fields(fs, lat, lon_mod, start, end)
-        swdown = _load_swdown_flux(
-            fs, lat, lon_mod, start - pd.Timedelta(hours=12), end + pd.Timedelta(hours=12)
-        )
-        df = analysis.copy()
-        df["temp_c"] = df["temp_k"] - 273.15
-        df["dew_c"] = df["dew_k"] - 273.15
-        df["rh"] = _relative_humidity(df["temp_c"], df["dew_c"])
-        df["wind_ms"] = np.hypot(df["u10"], df["v10"])
-        df["swdown"] = swdown.reindex(df.index).interpolate(method="time").bfill().ffill()
-        final = df[["temp_c", "rh", "wind_ms", "swdown"]].copy()
-        final.reset_index(inplace=True)
-        final.rename(columns={"index": "time"}, inplace=True)
-        try:
-            final.attrs["met_source"] = "asdi-era5"
-        except Exception:
-            pass
-        LOGGER.info("ERA5 fetched from S3 (ASDI) for lat=%.3f lon=%.3f on %s", lat, lon, date)
-        return final
+        lats = np.array([lat for lat, _ in points])
+        lons = np.array([_to_360(lon) for _, lon in points])
+        flux_start = first - pd.Timedelta(hours=12)
+        flux_end = last + pd.Timedelta(hours=12)
+        # All analysis and flux objects are independent reads; start them together so the
+        # fetch costs roughly the slowest one rather than the sum.
+        analysis_jobs = _submit_analysis_reads(fs, lats, lons, first, last)
+        flux_jobs = _submit_flux_reads(fs, lats, lons, flux_start, flux_end)
+        analysis = _collect_analysis(analysis_jobs)
+        swdown = _collect_swdown(flux_jobs, flux_start, flux_end)
+        frames = []
+        for idx, (lat, lon) in enumerate(points):
+            df = pd.DataFrame({field: analysis[field][idx] for field in ANALYSIS_FIELDS})
+            df.index.name = "time"
+            df["temp_c"] = df["temp_k"] - 273.15
+            df["dew_c"] = df["dew_k"] - 273.15
+            df["rh"] = _relative_humidity(df["temp_c"], df["dew_c"])
+            df["wind_ms"] = np.hypot(df["u10"], df["v10"])
+            df["swdown"] = swdown[idx].reindex(df.index).interpolate(method="time").bfill().ffill()
+            final = df[["temp_c", "rh", "wind_ms", "swdown"]].copy()
+            final.reset_index(inplace=True)
+            final.rename(columns={"index": "time"}, inplace=True)
+            try:
+                final.attrs["met_source"] = "asdi-era5"
+            except Exception:
+                pass
+            LOGGER.info("ERA5 fetched from S3 (ASDI) for lat=%.3f lon=%.3f on %s", lat, lon, label)
+            frames.append(final)
+        breaker.record_success()
+        return frames
     except Exception as exc:  # pragma: no cover - network issues
+        # Missing objects (e.g. a month not yet published) are not an outage.
+        if not isinstance(exc, (FileNotFoundError, RuntimeError, ValueError)):
+            breaker.record_failure()
         LOGGER.exception("ERA5 fetch failed; falling back to synthetic series: %s", exc)
-        _df = synthetic_hourly_series(date)[["time", "temp_c", "rh", "wind_ms", "swdown"]]
-        try:
-            _df.attrs["met_source"] = "demo"
-        except Exception:
-            pass
-        return _df
+        return _demo_frames(len(points), first, last)
+
+
+def _demo_frames(count: int, first: pd.Timestamp, last: pd.Timestamp) -> List[pd.DataFrame]:
+    # The synthetic series depends only on the date, so every point shares one (read-only) frame.
+    frame = _demo_frame_range(first, last)
+    return [frame] * count
+
+
+def _demo_frame(date: str) -> pd.DataFrame:
+    _df = synthetic_hourly_series(date)[["time", "temp_c", "rh", "wind_ms", "swdown"]]
+    try:
+        _df.attrs["met_source"] = "demo"
+    except Exception:
+        pass
+    return _df
+
+
+def _demo_frame_range(first: pd.Timestamp, last: pd.Timestamp) -> pd.DataFrame:
+    days = pd.date_range(first, last.floor("D"), freq="D")
+    if len(days) == 1:
+        return _demo_frame(days[0].strftime("%Y-%m-%d"))
+    _df = pd.concat([_demo_frame(day.strftime("%Y-%m-%d")) for day in days], ignore_index=True)
+    try:
+        _df.attrs["met_source"] = "demo"
+    except Exception:
+        pass
+    return _df
 
 
 def _get_filesystem() -> "s3fs.S3FileSystem":
-    return s3fs.S3FileSystem(
-        anon=True,
-        default_fill_cache=False,
-        default_cache_type="none",
-        client_kwargs={"region_name": AWS_REGION},
-    )
+    return get_s3fs("era5")
+
+
+_BLOCK_CACHE: Optional[BlockCache] = None
+_BLOCK_CACHE_LOCK = threading.Lock()
+
+
+def _get_block_cache() -> Optional[BlockCache]:
+    global _BLOCK_CACHE
+    if not ERA5_CACHE_DIR or ERA5_CACHE_MAX_BYTES <= 0:
+        return None
+    with _BLOCK_CACHE_LOCK:
+        if _BLOCK_CACHE is None:
+            try:
+                _BLOCK_CACHE = BlockCache(
+                    ERA5_CACHE_DIR, ERA5_CACHE_MAX_BYTES, ERA5_CACHE_BLOCK_BYTES
+                )
+            except OSError as exc:
+                LOGGER.warning("ERA5 disk cache unavailable at %s: %s", ERA5_CACHE_DIR, exc)
+                return None
+        return _BLOCK_CACHE
+
+
+def _open_era5(fs: "s3fs.S3FileSystem", path: str):
+    """Open an ERA5 object for reading, through the local block cache when it is enabled.
+
+    ERA5 archive paths are immutable, so cached blocks never need invalidation.
+    """
+    cache = _get_block_cache()
+    if cache is None:
+        return fs.open(path, "rb")
+    return cache.open(fs, path)
 
 
 def _analysis_path(var_code: str, year: int, month: int) -> str:
@@ -108,98 +240,279 @@ def _analysis_path(var_code: str, year: int, month: int) -> str:
 
 
 def _load_analysis_fields(
-    fs: "s3fs.S3FileSystem", lat: float, lon: float, start: pd.Timestamp, end: pd.Timestamp
-) -> pd.DataFrame:
-    """Load the required analysis variables (T2M, D2M, U10, V10) for the target window."""
-    year = start.year
-    month = start.month
-    data_frames = []
-    for field_name, (code, var_name) in ANALYSIS_FIELDS.items():
-        path = _analysis_path(code, year, month)
-        series = _read_analysis_series(fs, path, var_name, lat, lon, start, end)
-        data_frames.append(series.rename(field_name))
-    df = pd.concat(data_frames, axis=1)
-    df.index.name = "time"
-    return df
+    fs: "s3fs.S3FileSystem",
+    lats: np.ndarray,
+    lons: np.ndarray,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+) -> Dict[str, List[pd.Series]]:
+    """Load the analysis variables (T2M, D2M, U10, V10) for every point over the target window.
+
+    Returns ``{field_name: [series_for_point_0, series_for_point_1, ...]}``.
+    """
+    return _collect_analysis(_submit_analysis_reads(fs, lats, lons, start, end))
 
 
-def _read_analysis_series(
+class _FileRead:
+    """One ERA5 file read on the shared I/O pool, timed from when the read starts.
+
+    Reads queue behind the pool's ``ERA5_IO_WORKERS`` threads, so a long range would otherwise
+    spend later files' budget waiting for earlier ones. A read that overruns is abandoned (its
+    thread finishes in the background); only reads still queued can be cancelled.
+    """
+
+    def __init__(self, reader, fs: "s3fs.S3FileSystem", path: str, *args):
+        self.path = path
+        self.started: Optional[float] = None
+        self.future: Future = _IO_EXECUTOR.submit(self._run, reader, fs, path, *args)
+
+    def _run(self, reader, fs, path, *args):
+        self.started = time.monotonic()
+        return _read_known_object(reader, fs, path, *args)
+
+    def result(self):
+        """The read's result; raises ``FutureTimeout`` once it has run ``ERA5_FILE_TIMEOUT``."""
+        while True:
+            started = self.started
+            if started is None:
+                wait_s = ERA5_FILE_TIMEOUT  # still queued: its clock has not started
+            else:
+                wait_s = started + ERA5_FILE_TIMEOUT - time.monotonic()
+                if wait_s <= 0 and not self.future.done():
+                    raise FutureTimeout(f"{self.path} exceeded {ERA5_FILE_TIMEOUT:.0f}s")
+            try:
+                return self.future.result(timeout=max(0.0, wait_s))
+            except FutureTimeout:
+                continue
+
+    def cancel(self) -> bool:
+        return self.future.cancel()
+
+
+def _submit_analysis_reads(
+    fs: "s3fs.S3FileSystem",
+    lats: np.ndarray,
+    lons: np.ndarray,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+) -> Dict[str, List[_FileRead]]:
+    """Start one concurrent read per analysis field and month on the shared ERA5 I/O pool.
+
+    Each monthly file is read once, sliced to the part of [start, end] that falls inside it.
+    """
+    jobs: Dict[str, List[_FileRead]] = {field_name: [] for field_name in ANALYSIS_FIELDS}
+    for month in pd.period_range(start, end, freq="M"):
+        m_start = max(start, month.start_time)
+        m_end = min(end, month.end_time.floor("h"))
+        for field_name, (code, var_name) in ANALYSIS_FIELDS.items():
+            jobs[field_name].append(
+                _FileRead(
+                    _read_analysis_points,
+                    fs,
+                    _analysis_path(code, month.year, month.month),
+                    var_name,
+                    lats,
+                    lons,
+                    m_start,
+                    m_end,
+                )
+            )
+    return jobs
+
+
+def _read_known_object(reader, fs: "s3fs.S3FileSystem", path: str, *args):
+    """Run ``reader`` unless ``path`` is known to be missing; remember it if it turns out to be."""
+    if ("era5", path) in NEGATIVE_CACHE:
+        raise FileNotFoundError(path)
+    try:
+        return reader(fs, path, *args)
+    except FileNotFoundError:
+        NEGATIVE_CACHE.add(("era5", path), "missing")
+        raise
+
+
+def _collect_analysis(jobs: Dict[str, List[_FileRead]]) -> Dict[str, List[pd.Series]]:
+    fields: Dict[str, List[pd.Series]] = {}
+    try:
+        for field_name, field_jobs in jobs.items():
+            parts = [job.result() for job in field_jobs]
+            frame = parts[0] if len(parts) == 1 else pd.concat(parts)
+            fields[field_name] = [frame[col].rename(field_name) for col in frame.columns]
+    except BaseException:
+        for field_jobs in jobs.values():
+            for job in field_jobs:
+                job.cancel()
+        raise
+    return fields
+
+
+def _pointwise_indexers(lats: np.ndarray, lons: np.ndarray) -> Dict[str, "xr.DataArray"]:
+    return {
+        "latitude": xr.DataArray(np.asarray(lats, dtype=float), dims="point"),
+        "longitude": xr.DataArray(np.asarray(lons, dtype=float), dims="point"),
+    }
+
+
+def _read_analysis_points(
     fs: "s3fs.S3FileSystem",
     path: str,
     var_name: str,
-    lat: float,
-    lon: float,
+    lats: np.ndarray,
+    lons: np.ndarray,
     start: pd.Timestamp,
     end: pd.Timestamp,
-) -> pd.Series:
-    with fs.open(path, "rb") as fh:
+) -> pd.DataFrame:
+    """Read ``var_name`` at every point from one file; columns are point positions 0..n-1."""
+    index = era5_index.load_index(path, var_name)
+    if index is not None:
+        try:
+            times = index.coord("time")
+            lo = int(np.searchsorted(times, start.to_datetime64(), side="left"))
+            hi = int(np.searchsorted(times, end.to_datetime64(), side="right"))
+            values = index.read_points(fs, lats, lons, {"time": slice(lo, hi)})
+            return pd.DataFrame(values, index=pd.DatetimeIndex(times[lo:hi], name="time"))
+        except Exception as exc:
+            LOGGER.warning("ERA5 chunk-index read failed for %s; opening file: %s", path, exc)
+    with _open_era5(fs, path) as fh:
         ds = xr.open_dataset(fh, engine="h5netcdf")
         try:
             arr = (
                 ds[var_name]
-                .sel(latitude=lat, longitude=lon, method="nearest")
                 .sel(time=slice(start.to_pydatetime(), end.to_pydatetime()))
+                .sel(**_pointwise_indexers(lats, lons), method="nearest")
+                .transpose("time", "point")
+            )
+            frame = pd.DataFrame(
+                arr.values, index=pd.DatetimeIndex(arr["time"].values, name="time")
             )
-            series = arr.to_series()
         finally:
             ds.close()
-    return series
+    return frame
 
 
-def _load_swdown_flux(
-    fs: "s3fs.S3FileSystem", lat: float, lon: float, start: pd.Timestamp, end: pd.Timestamp
+def _read_analysis_series(
+    fs: "s3fs.S3FileSystem",
+    path: str,
+    var_name: str,
+    lat: float,
+    lon: float,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
 ) -> pd.Series:
-    """Load mean shortwave flux and convert to an hourly series covering [start, end]."""
+    frame = _read_analysis_points(fs, path, var_name, np.array([lat]), np.array([lon]), start, end)
+    return frame[0]
+
+
+def _load_swdown_flux(
+    fs: "s3fs.S3FileSystem",
+    lats: np.ndarray,
+    lons: np.ndarray,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+) -> List[pd.Series]:
+    """Load mean shortwave flux and convert to one hourly series per point covering [start, end]."""
+    return _collect_swdown(_submit_flux_reads(fs, lats, lons, start, end), start, end)
+
+
+def _submit_flux_reads(
+    fs: "s3fs.S3FileSystem",
+    lats: np.ndarray,
+    lons: np.ndarray,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+) -> List[_FileRead]:
+    """Start one concurrent read per distinct mean-flux file overlapping [start, end]."""
     month_keys = _flux_months_for_range(start, end)
     paths = []
     for year, month in month_keys:
         paths.extend(_mean_flux_paths(year, month))
-    seen = set()
-    series_list: List[pd.Series] = []
-    for path in paths:
-        if path in seen:
-            continue
-        seen.add(path)
+    return [_FileRead(_read_flux_points, fs, path, lats, lons) for path in dict.fromkeys(paths)]
+
+
+def _collect_swdown(
+    jobs: List[_FileRead], start: pd.Timestamp, end: pd.Timestamp
+) -> List[pd.Series]:
+    frames: List[pd.DataFrame] = []
+    for job in jobs:
+        path = job.path
         try:
-            series = _read_flux_series(fs, path, lat, lon)
-            series_list.append(series)
+            frames.append(job.result())
         except FileNotFoundError:
             LOGGER.warning("ERA5 mean flux file missing: %s", path)
+        except FutureTimeout:
+            job.cancel()
+            LOGGER.warning("Timed out reading %s after %.0fs", path, ERA5_FILE_TIMEOUT)
         except Exception as exc:  # pragma: no cover
             LOGGER.warning("Failed to read %s: %s", path, exc)
-    if not series_list:
+    if not frames:
         raise RuntimeError("No mean flux series were loaded.")
-    merged = pd.concat(series_list).sort_index()
+    merged = pd.concat(frames).sort_index()
     merged = merged[~merged.index.duplicated(keep="last")]
     window = merged.loc[(merged.index >= start) & (merged.index <= end)]
     if window.empty:
         raise RuntimeError("Mean flux window is empty after filtering.")
-    return window
+    return [window[col] for col in window.columns]
 
 
-def _read_flux_series(fs: "s3fs.S3FileSystem", path: str, lat: float, lon: float) -> pd.Series:
-    with fs.open(path, "rb") as fh:
+def _read_flux_points(
+    fs: "s3fs.S3FileSystem", path: str, lats: np.ndarray, lons: np.ndarray
+) -> pd.DataFrame:
+    """Expand one mean-flux file to valid times; columns are point positions 0..n-1."""
+    index = era5_index.load_index(path, MEAN_FLUX_VAR)
+    if index is not None:
+        try:
+            values = index.read_points(fs, lats, lons)
+            return _expand_flux(
+                index.coord("forecast_initial_time"), index.coord("forecast_hour"), values
+            )
+        except Exception as exc:
+            LOGGER.warning("ERA5 chunk-index read failed for %s; opening file: %s", path, exc)
+    with _open_era5(fs, path) as fh:
         ds = xr.open_dataset(fh, engine="h5netcdf")
         try:
-            da = ds[MEAN_FLUX_VAR].sel(latitude=lat, longitude=lon, method="nearest")
-            init_times = pd.to_datetime(ds["forecast_initial_time"].values)
-            forecast_hours = ds["forecast_hour"].values.astype(int)
-            values: List[float] = []
-            times: List[pd.Timestamp] = []
-            for idx, t0 in enumerate(init_times):
-                row = da.isel(forecast_initial_time=idx).values
-                for hour, val in zip(forecast_hours, row):
-                    times.append(t0 + pd.Timedelta(hours=int(hour)))
-                    values.append(float(val))
+            da = (
+                ds[MEAN_FLUX_VAR]
+                .sel(**_pointwise_indexers(lats, lons), method="nearest")
+                .transpose("forecast_initial_time", "forecast_hour", "point")
+            )
+            init_times = ds["forecast_initial_time"].values
+            forecast_hours = ds["forecast_hour"].values
+            values = da.values
         finally:
             ds.close()
-    return pd.Series(values, index=pd.DatetimeIndex(times, name="time"))
+    return _expand_flux(init_times, forecast_hours, values)
+
+
+def _expand_flux(
+    init_times: np.ndarray, forecast_hours: np.ndarray, values: np.ndarray
+) -> pd.DataFrame:
+    """Flatten ``values[init, hour, point]`` onto valid times ``init + hour``.
+
+    Valid times come from broadcasting inits against forecast hours, and the values are a
+    row-major reshape, so rows line up with init-major / hour-minor order in one pass.
+    """
+    inits = pd.to_datetime(np.asarray(init_times).ravel()).values
+    steps = np.asarray(forecast_hours).astype(np.int64).astype("timedelta64[h]")
+    valid = (inits[:, None] + steps[None, :]).ravel()
+    values = np.asarray(values, dtype=float)
+    flat = values.reshape(valid.size, values.shape[-1])
+    return pd.DataFrame(flat, index=pd.DatetimeIndex(valid, name="time"))
+
+
+def _read_flux_series(fs: "s3fs.S3FileSystem", path: str, lat: float, lon: float) -> pd.Series:
+    return _read_flux_points(fs, path, np.array([lat]), np.array([lon]))[0]
+
+
+def era5_month_objects(year: int, month: int) -> List[Tuple[str, str]]:
+    """``(path, variable)`` for every ERA5 object the readers use in one calendar month."""
+    objects = [(_analysis_path(code, year, month), var) for code, var in ANALYSIS_FIELDS.values()]
+    objects.extend((path, MEAN_FLUX_VAR) for path in _mean_flux_paths(year, month))
+    return objects
 
 
 def _flux_months_for_range(start: pd.Timestamp, end: pd.Timestamp) -> Sequence[Tuple[int, int]]:
-    points = [start, end, start - pd.Timedelta(days=1), end + pd.Timedelta(days=1)]
-    months = {(p.year, p.month) for p in points}
-    return sorted(months)
+    months = pd.period_range(start - pd.Timedelta(days=1), end + pd.Timedelta(days=1), freq="M")
+    return [(m.year, m.month) for m in months]
 
 
 def _mean_flux_paths(year: int, month: int) -> List[str]:
@@ -224,6 +537,17 @@ def _to_360(lon: float) -> float:
     return float((lon + 360.0) % 360.0)
 
 
+def era5_grid_cell(lat: float, lon: float) -> Tuple[float, float]:
+    """Snap a point to the ERA5 0.25° cell that a nearest-neighbour lookup would sample.
+
+    Longitude is returned on the dataset's 0-360 convention, so points on either side of the
+    antimeridian that share a cell also share a key.
+    """
+    lat_idx = round(min(max(float(lat), -90.0), 90.0) / GRID_STEP_DEG)
+    lon_idx = round(_to_360(lon) / GRID_STEP_DEG) % int(360 / GRID_STEP_DEG)
+    return round_latlon(lat_idx * GRID_STEP_DEG, lon_idx * GRID_STEP_DEG, ndigits=2)
+
+
 def _relative_humidity(temp_c: pd.Series, dew_c: pd.Series) -> pd.Series:
     a, b = 17.625, 243.04
     alpha = (a * dew_c) / (b + dew_c)
@@ -0,0 +1,294 @@
+"""Byte-range chunk index for ERA5 NetCDF/HDF5 files.
+
+Building an index records, for one variable of one ERA5 object, the decoded coordinate values,
+the HDF5 chunk layout (byte offset and length of every stored chunk) and the filter pipeline.
+With the index on local disk, a point lookup only issues ranged GETs for the few chunks that
+cover the target cell and time window instead of opening the file through h5netcdf.
+"""
+
+import json
+import logging
+import threading
+import zlib
+from itertools import product
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config import ERA5_INDEX_DIR
+
+try:
+    import h5py  # type: ignore
+    import xarray as xr  # type: ignore
+except Exception:  # pragma: no cover - building indexes needs the live-data extras
+    h5py = None
+    xr = None
+
+LOGGER = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# HDF5 filter ids this reader can undo.
+H5Z_FILTER_DEFLATE = 1
+H5Z_FILTER_SHUFFLE = 2
+H5Z_FILTER_FLETCHER32 = 3
+SUPPORTED_FILTERS = {H5Z_FILTER_DEFLATE, H5Z_FILTER_SHUFFLE, H5Z_FILTER_FLETCHER32}
+
+_LOADED: Dict[str, Tuple[int, Optional["ChunkIndex"]]] = {}
+_LOADED_LOCK = threading.Lock()
+
+
+class UnsupportedIndex(RuntimeError):
+    """The file uses a layout or filter the byte-range reader cannot decode."""
+
+
+class ChunkIndex:
+    """In-memory form of one variable's chunk index."""
+
+    def __init__(self, payload: dict):
+        self.payload = payload
+        self.path: str = payload["path"]
+        self.var_name: str = payload["var_name"]
+        self.dims: List[str] = list(payload["dims"])
+        self.shape: Tuple[int, ...] = tuple(payload["shape"])
+        self.chunks: Tuple[int, ...] = tuple(payload["chunks"])
+        self.dtype = np.dtype(payload["dtype"])
+        self.filters: List[int] = list(payload["filters"])
+        self.fill_value = payload.get("fill_value")
+        self.scale_factor = payload.get("scale_factor")
+        self.add_offset = payload.get("add_offset")
+        grid = tuple(-(-n // c) for n, c in zip(self.shape, self.chunks))
+        self.byte_offsets = np.asarray(payload["byte_offsets"], dtype=np.int64).reshape(grid)
+        self.byte_sizes = np.asarray(payload["byte_sizes"], dtype=np.int64).reshape(grid)
+        self.filter_masks = np.asarray(payload["filter_masks"], dtype=np.int64).reshape(grid)
+        self._coords: Dict[str, np.ndarray] = {}
+
+    def coord(self, dim: str) -> np.ndarray:
+        if dim not in self._coords:
+            spec = self.payload["coords"][dim]
+            values = spec["values"]
+            if spec["kind"] == "time":
+                self._coords[dim] = pd.to_datetime(values).values
+            else:
+                self._coords[dim] = np.asarray(values, dtype=float)
+        return self._coords[dim]
+
+    def nearest(self, dim: str, value: float) -> int:
+        return int(np.abs(self.coord(dim) - float(value)).argmin())
+
+    def read_points(
+        self,
+        fs,
+        lats: Sequence[float],
+        lons: Sequence[float],
+        ranges: Optional[Dict[str, slice]] = None,
+    ) -> np.ndarray:
+        """Read the variable at each point's nearest cell.
+
+        Non-spatial dimensions keep their on-disk order and are limited to ``ranges`` (index
+        slices, full extent by default). Returns an array shaped ``(*non_spatial, n_points)``.
+        """
+        ranges = ranges or {}
+        lat_axis = self.dims.index("latitude")
+        lon_axis = self.dims.index("longitude")
+        other_axes = [ax for ax in range(len(self.dims)) if ax not in (lat_axis, lon_axis)]
+        spans = {}
+        for ax in other_axes:
+            start, stop, _ = ranges.get(self.dims[ax], slice(None)).indices(self.shape[ax])
+            spans[ax] = (start, max(start, stop))
+        out_shape = tuple(spans[ax][1] - spans[ax][0] for ax in other_axes) + (len(lats),)
+        out = np.full(out_shape, np.nan, dtype=float)
+        if any(n == 0 for n in out_shape):
+            return out
+
+        cells = [
+            (self.nearest("latitude", la), self.nearest("longitude", lo))
+            for la, lo in zip(lats, lons)
+        ]
+        other_chunk_ids = [
+            range(spans[ax][0] // self.chunks[ax], (spans[ax][1] - 1) // self.chunks[ax] + 1)
+            for ax in other_axes
+        ]
+        wanted: Dict[Tuple[int, ...], None] = {}
+        plan = []
+        for point, (iy, ix) in enumerate(cells):
+            for combo in product(*other_chunk_ids):
+                key = [0] * len(self.dims)
+                for ax, cid in zip(other_axes, combo):
+                    key[ax] = cid
+                key[lat_axis] = iy // self.chunks[lat_axis]
+                key[lon_axis] = ix // self.chunks[lon_axis]
+                key = tuple(key)
+                wanted[key] = None
+                plan.append((point, iy, ix, key))
+        decoded = self._fetch_chunks(fs, list(wanted))
+
+        for point, iy, ix, key in plan:
+            chunk = decoded[key]
+            src = [slice(None)] * len(self.dims)
+            dst = []
+            for ax in other_axes:
+                origin = key[ax] * self.chunks[ax]
+                lo = max(spans[ax][0], origin)
+                hi = min(spans[ax][1], origin + self.chunks[ax])
+                src[ax] = slice(lo - origin, hi - origin)
+                dst.append(slice(lo - spans[ax][0], hi - spans[ax][0]))
+            src[lat_axis] = iy - key[lat_axis] * self.chunks[lat_axis]
+            src[lon_axis] = ix - key[lon_axis] * self.chunks[lon_axis]
+            out[tuple(dst) + (point,)] = chunk[tuple(src)]
+        return out
+
+    def _fetch_chunks(self, fs, keys: List[Tuple[int, ...]]) -> Dict[Tuple[int, ...], np.ndarray]:
+        stored = [k for k in keys if self.byte_sizes[k] > 0]
+        starts = [int(self.byte_offsets[k]) for k in stored]
+        ends = [int(self.byte_offsets[k] + self.byte_sizes[k]) for k in stored]
+        if hasattr(fs, "cat_ranges"):
+            blobs = fs.cat_ranges([self.path] * len(stored), starts, ends)
+        else:  # pragma: no cover - every fsspec filesystem we use has cat_ranges
+            blobs = [fs.cat_file(self.path, start=s, end=e) for s, e in zip(starts, ends)]
+        decoded = {
+            k: self._decode(blob, int(self.filter_masks[k])) for k, blob in zip(stored, blobs)
+        }
+        for k in keys:
+            if k not in decoded:  # never written: HDF5 returns the fill value
+                decoded[k] = np.full(self.chunks, np.nan)
+        return decoded
+
+    def _decode(self, blob: bytes, filter_mask: int) -> np.ndarray:
+        data = bytes(blob)
+        for pos in reversed(range(len(self.filters))):
+            if filter_mask & (1 << pos):
+                continue
+            fid = self.filters[pos]
+            if fid == H5Z_FILTER_FLETCHER32:
+                data = data[:-4]
+            elif fid == H5Z_FILTER_DEFLATE:
+                data = zlib.decompress(data)
+            elif fid == H5Z_FILTER_SHUFFLE:
+                size = self.dtype.itemsize
+                raw = np.frombuffer(data, dtype=np.uint8)
+                data = raw.reshape(size, raw.size // size).T.tobytes()
+        values = np.frombuffer(data, dtype=self.dtype).reshape(self.chunks).astype(float)
+        if self.fill_value is not None and not np.isnan(self.fill_value):
+            values[values == self.fill_value] = np.nan
+        if self.scale_factor is not None:
+            values *= self.scale_factor
+        if self.add_offset is not None:
+            values += self.add_offset
+        return values
+
+
+def build_index(fs, path: str, var_name: str, opener=None) -> dict:
+    """Scan ``var_name`` in the ERA5 object at ``path`` and return its JSON-ready index."""
+    if h5py is None or xr is None:
+        raise RuntimeError("h5py and xarray are required to build ERA5 chunk indexes.")
+    opener = opener or (lambda p: fs.open(p, "rb"))
+    with opener(path) as fh:
+        ds = xr.open_dataset(fh, engine="h5netcdf")
+        try:
+            dims = list(ds[var_name].dims)
+            coords = {}
+            for dim in dims:
+                values = ds[dim].values
+                if np.issubdtype(values.dtype, np.datetime64):
+                    coords[dim] = {
+                        "kind": "time",
+                        "values": [
+                            str(v) for v in pd.to_datetime(values).strftime("%Y-%m-%dT%H:%M:%S")
+                        ],
+                    }
+                else:
+                    coords[dim] = {"kind": "num", "values": values.astype(float).tolist()}
+        finally:
+            ds.close()
+    with opener(path) as fh, h5py.File(fh, "r") as h5:
+        dset = h5[var_name]
+        if dset.chunks is None:
+            raise UnsupportedIndex(f"{path}:{var_name} is not chunked")
+        plist = dset.id.get_create_plist()
+        filters = [plist.get_filter(i)[0] for i in range(plist.get_nfilters())]
+        unsupported = set(filters) - SUPPORTED_FILTERS
+        if unsupported:
+            raise UnsupportedIndex(f"{path}:{var_name} uses HDF5 filters {sorted(unsupported)}")
+        grid = tuple(-(-n // c) for n, c in zip(dset.shape, dset.chunks))
+        offsets = np.full(grid, -1, dtype=np.int64)
+        sizes = np.zeros(grid, dtype=np.int64)
+        masks = np.zeros(grid, dtype=np.int64)
+        for i in range(dset.id.get_num_chunks()):
+            info = dset.id.get_chunk_info(i)
+            key = tuple(o // c for o, c in zip(info.chunk_offset, dset.chunks))
+            offsets[key] = info.byte_offset
+            sizes[key] = info.size
+            masks[key] = info.filter_mask
+        attrs = dset.attrs
+
+        def _scalar(name):
+            if name not in attrs:
+                return None
+            return float(np.asarray(attrs[name]).ravel()[0])
+
+        fill_value = _scalar("_FillValue")
+        if fill_value is None:
+            fill_value = _scalar("missing_value")
+        return {
+            "version": INDEX_VERSION,
+            "path": path,
+            "var_name": var_name,
+            "dims": dims,
+            "shape": list(dset.shape),
+            "chunks": list(dset.chunks),
+            "dtype": dset.dtype.str,
+            "filters": filters,
+            "fill_value": fill_value,
+            "scale_factor": _scalar("scale_factor"),
+            "add_offset": _scalar("add_offset"),
+            "coords": coords,
+            "byte_offsets": offsets.ravel().tolist(),
+            "byte_sizes": sizes.ravel().tolist(),
+            "filter_masks": masks.ravel().tolist(),
+        }
+
+
+def index_file(path: str, var_name: str, root: Optional[str] = None) -> Path:
+    return Path(root or ERA5_INDEX_DIR) / f"{path}.{var_name}.json"
+
+
+def save_index(payload: dict, root: Optional[str] = None) -> Path:
+    target = index_file(payload["path"], payload["var_name"], root)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(payload, separators=(",", ":")))
+    tmp.replace(target)
+    with _LOADED_LOCK:
+        _LOADED.pop(str(target), None)
+    return target
+
+
+def load_index(path: str, var_name: str, root: Optional[str] = None) -> Optional[ChunkIndex]:
+    """Return the stored index for ``path``/``var_name``, or None when it has not been built.
+
+    Parsed indexes are kept in memory and reloaded when the file on disk is rebuilt.
+    """
+    if not (root or ERA5_INDEX_DIR):
+        return None
+    target = index_file(path, var_name, root)
+    try:
+        mtime = target.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _LOADED_LOCK:
+        cached = _LOADED.get(str(target))
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    index = None
+    try:
+        payload = json.loads(target.read_text())
+        if payload.get("version") == INDEX_VERSION:
+            index = ChunkIndex(payload)
+    except Exception as exc:
+        LOGGER.warning("Ignoring unreadable ERA5 chunk index %s: %s", target, exc)
+    with _LOADED_LOCK:
+        _LOADED[str(target)] = (mtime, index)
+    return index
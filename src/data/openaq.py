@@ -1,27 +1,82 @@
+import io
 import logging
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
 import httpx
-from typing import List
+import pandas as pd
 
-from ..config import OPENAQ_API_KEY
+from ..config import (
+    BREAKER_GONE_S,
+    OPENAQ_API_KEY,
+    OPENAQ_IO_WORKERS,
+    OPENAQ_PARSE_BLOCK_BYTES,
+    OPENAQ_PARSE_CHUNK_ROWS,
+)
+from ..utils.clients import get_http_client, get_s3fs
+from . import openaq_mirror
+from .openaq_catalog import load_catalog
+from ..utils.geo import round_latlon
+from ..utils.resilience import NEGATIVE_CACHE, get_breaker, get_flight
 
 try:
     import s3fs  # type: ignore
 except Exception:
     s3fs = None
 
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.compute as pa_compute  # type: ignore
+    import pyarrow.csv as pa_csv  # type: ignore
+except Exception:
+    pa = pa_compute = pa_csv = None
+
 # Minimal OpenAQ fetch using REST (for last 24h), fallback to demo if rate-limited
 # For production, use S3 parquet via Athena/S3Select to stay fully on ASDI.
 
 BASE = "https://api.openaq.org/v2/measurements"
+LOCATIONS_URL = "https://api.openaq.org/v3/locations"
 LOGGER = logging.getLogger(__name__)
 
+# Shared pool for concurrent OpenAQ archive reads (candidate sensors for every school).
+_S3_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, OPENAQ_IO_WORKERS), thread_name_prefix="heatshield-openaq"
+)
+
+# The only archive columns fetch_pm25_s3 needs; everything else is skipped while parsing.
+_ARCHIVE_COLUMNS = ("datetime", "parameter", "value")
+
+# HTTP statuses that mean "this request shape / endpoint will keep failing", not "try later".
+_PERMANENT_STATUSES = {400, 404, 410, 422}
+
+
+def _record_http_failure(breaker_name: str, exc: Exception) -> None:
+    breaker = get_breaker(breaker_name)
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status == 410:
+        breaker.trip(BREAKER_GONE_S)
+    else:
+        breaker.record_failure()
+
 
 def _headers():
     return {"X-API-Key": OPENAQ_API_KEY} if OPENAQ_API_KEY else None
 
 
 def fetch_pm25(lat: float, lon: float, date: str) -> pd.DataFrame:
+    """Hourly PM2.5 near a point from the OpenAQ REST API (empty on any failure).
+
+    Concurrent calls for the same point and day share one request.
+    """
+    key = ("openaq-rest", round_latlon(lat, lon, 4), date)
+    return get_flight("openaq-rest").do(key, _fetch_pm25_rest, lat, lon, date)
+
+
+def _fetch_pm25_rest(lat: float, lon: float, date: str) -> pd.DataFrame:
+    breaker = get_breaker("openaq-v2-measurements")
+    if not breaker.allow():
+        LOGGER.info("OpenAQ REST skipped near lat=%.3f lon=%.3f: circuit open.", lat, lon)
+        return pd.DataFrame()
     try:
         params = {
             "parameter": "pm25",
@@ -32,8 +87,9 @@ def fetch_pm25(lat: float, lon: float, date: str) -> pd.DataFrame:
             "limit": 1000,
             "sort": "asc",
         }
-        r = httpx.get(BASE, params=params, timeout=20, headers=_headers())
+        r = get_http_client().get(BASE, params=params, timeout=20, headers=_headers())
         r.raise_for_status()
+        breaker.record_success()
         items = r.json().get("results", [])
         if not items:
             return pd.DataFrame()
@@ -47,87 +103,272 @@ def fetch_pm25(lat: float, lon: float, date: str) -> pd.DataFrame:
         LOGGER.info("OpenAQ REST returned %d rows near lat=%.3f lon=%.3f.", len(df), lat, lon)
         return df
     except Exception as exc:
+        _record_http_failure("openaq-v2-measurements", exc)
         LOGGER.warning("OpenAQ REST request failed near lat=%.3f lon=%.3f: %s", lat, lon, exc)
         return pd.DataFrame()
 
 
 def _nearest_location_ids(
-    lat: float, lon: float, radius_m: int = 25000, limit: int = 3
+    lat: float, lon: float, radius_m: int = 25000, limit: int = 3, date: Optional[str] = None
 ) -> List[int]:
-    """Resolve nearest OpenAQ location IDs using v3 API.
+    """Resolve nearest OpenAQ location IDs, from the local catalog when it is fresh.
 
-    Tries semicolon and comma coordinate separators with minimal params.
+    The catalog answer is authoritative for points inside its refreshed area; ``date``, when
+    given, limits it to locations reporting on that day. Otherwise the v3 API is queried,
+    trying semicolon and comma coordinate separators with minimal params. A separator the API
+    rejects is remembered in the negative cache, so later calls go straight to the other one
+    (or skip the endpoint entirely once both are known to fail).
     """
+    catalog = load_catalog()
+    if catalog is not None and not catalog.is_stale() and catalog.covers(lat, lon):
+        return catalog.nearest_ids(lat, lon, k=limit, radius_m=radius_m, on_date=date)
+    area_key = ("openaq-locations-empty", round_latlon(lat, lon, 2), radius_m)
+    if area_key in NEGATIVE_CACHE:
+        return []
+    breaker = get_breaker("openaq-v3-locations")
+    if not breaker.allow():
+        LOGGER.info("OpenAQ locations skipped near lat=%.3f lon=%.3f: circuit open.", lat, lon)
+        return []
     headers = _headers()
-    base_url = "https://api.openaq.org/v3/locations"
+    client = get_http_client()
     attempts = [
-        {"coordinates": f"{lat};{lon}", "radius": radius_m, "limit": limit, "order_by": "distance"},
-        {"coordinates": f"{lat},{lon}", "radius": radius_m, "limit": limit, "order_by": "distance"},
+        (
+            ";",
+            {
+                "coordinates": f"{lat};{lon}",
+                "radius": radius_m,
+                "limit": limit,
+                "order_by": "distance",
+            },
+        ),
+        (
+            ",",
+            {
+                "coordinates": f"{lat},{lon}",
+                "radius": radius_m,
+                "limit": limit,
+                "order_by": "distance",
+            },
+        ),
     ]
-    for params in attempts:
+    tried = False
+    for sep, params in attempts:
+        format_key = ("openaq-locations-format", sep)
+        if format_key in NEGATIVE_CACHE:
+            continue
+        tried = True
         try:
-            r = httpx.get(base_url, params=params, headers=headers, timeout=20)
+            r = client.get(LOCATIONS_URL, params=params, headers=headers, timeout=20)
             r.raise_for_status()
+            breaker.record_success()
             items = r.json().get("results", [])
             ids = [int(it.get("id")) for it in items if it.get("id") is not None]
             if ids:
                 return ids
+            NEGATIVE_CACHE.add(area_key, "no locations in radius")
+            return []
         except httpx.HTTPStatusError as exc:
+            if exc.response.status_code in _PERMANENT_STATUSES:
+                NEGATIVE_CACHE.add(format_key, f"HTTP {exc.response.status_code}")
             LOGGER.warning(
                 "OpenAQ locations attempt failed (%s): %s", exc.response.status_code, exc
             )
         except Exception as exc:
             LOGGER.warning("OpenAQ locations attempt error: %s", exc)
+    if tried:
+        breaker.record_failure()
     return []
 
 
+def _archive_path(loc_id: int, date: str) -> str:
+    ts = pd.Timestamp(date)
+    return (
+        f"openaq-data-archive/records/csv.gz/locationid={loc_id}/year={ts.year}/"
+        f"month={ts.month:02d}/location-{loc_id}-{ts.year}{ts.month:02d}{ts.day:02d}.csv.gz"
+    )
+
+
+def _hourly_partial(times: pd.Series, values: pd.Series) -> pd.DataFrame:
+    """Per-hour ``sum``/``count`` of one parsed batch, so batches can be merged exactly."""
+    hours = pd.to_datetime(times, utc=True).dt.tz_convert(None).dt.floor("h")
+    frame = pd.DataFrame({"hour": hours.to_numpy(), "value": values.to_numpy(dtype=float)})
+    return frame.groupby("hour")["value"].agg(["sum", "count"])
+
+
+def _merge_hourly(partials: List[pd.DataFrame]) -> Optional[pd.Series]:
+    """Combine batch partials into the same series ``resample("h").mean().interpolate()`` gives."""
+    if not partials:
+        return None
+    totals = pd.concat(partials).groupby(level=0).sum()
+    hours = pd.date_range(totals.index.min(), totals.index.max(), freq="h", name="time")
+    totals = totals.reindex(hours)
+    mean = (totals["sum"] / totals["count"].where(totals["count"] > 0)).rename("value")
+    return mean.interpolate()
+
+
+def _parse_pm25_arrow(raw: bytes, block_size: int) -> List[pd.DataFrame]:
+    stream = pa.CompressedInputStream(pa.BufferReader(raw), "gzip")
+    reader = pa_csv.open_csv(
+        stream,
+        read_options=pa_csv.ReadOptions(block_size=block_size),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=list(_ARCHIVE_COLUMNS),
+            column_types={
+                "datetime": pa.timestamp("ns", tz="UTC"),
+                "parameter": pa.string(),
+                "value": pa.float64(),
+            },
+        ),
+    )
+    partials = []
+    for batch in reader:
+        rows = batch.filter(pa_compute.equal(batch.column("parameter"), "pm25"))
+        if not rows.num_rows:
+            continue
+        hours = pa_compute.floor_temporal(rows.column("datetime"), unit="hour")
+        grouped = (
+            pa.table({"hour": hours, "value": rows.column("value")})
+            .group_by("hour")
+            .aggregate([("value", "sum"), ("value", "count")])
+            .to_pandas()
+        )
+        index = pd.DatetimeIndex(grouped["hour"]).tz_convert(None).rename("hour")
+        partials.append(
+            pd.DataFrame(
+                {
+                    "sum": grouped["value_sum"].fillna(0.0).to_numpy(),
+                    "count": grouped["value_count"].to_numpy(),
+                },
+                index=index,
+            )
+        )
+    return partials
+
+
+def _parse_pm25_pandas(fh, chunk_rows: int) -> List[pd.DataFrame]:
+    partials = []
+    with pd.read_csv(
+        fh,
+        compression="gzip",
+        usecols=list(_ARCHIVE_COLUMNS),
+        dtype={"datetime": str, "parameter": str, "value": "float64"},
+        chunksize=chunk_rows,
+    ) as chunks:
+        for chunk in chunks:
+            rows = chunk[chunk["parameter"] == "pm25"]
+            if len(rows):
+                partials.append(_hourly_partial(rows["datetime"], rows["value"]))
+    return partials
+
+
+def parse_pm25_archive(fh) -> Optional[pd.Series]:
+    """Hourly mean PM2.5 from one gzipped OpenAQ archive CSV, or None if it has no pm25 rows.
+
+    Only ``datetime``, ``parameter`` and ``value`` are decoded. Rows are filtered and reduced to
+    per-hour sums while the file is decompressed, so the full frame is never materialised.
+    PyArrow's streaming CSV reader is used when installed, chunked pandas otherwise.
+    """
+    partials = None
+    if pa_csv is not None:
+        # The compressed object is small; only its decompressed rows are streamed.
+        raw = fh.read()
+        try:
+            partials = _parse_pm25_arrow(raw, OPENAQ_PARSE_BLOCK_BYTES)
+        except pa.ArrowInvalid as exc:
+            # Timestamps Arrow cannot parse: pandas' parser is more forgiving.
+            LOGGER.debug("Arrow could not parse OpenAQ archive, using pandas: %s", exc)
+            fh = io.BytesIO(raw)
+    if partials is None:
+        partials = _parse_pm25_pandas(fh, OPENAQ_PARSE_CHUNK_ROWS)
+    return _merge_hourly(partials)
+
+
+def _read_location_day(fs, path: str) -> Optional[pd.Series]:
+    """Hourly PM2.5 from one location-day archive file, or None if it has none."""
+    breaker = get_breaker("openaq-s3")
+    try:
+        with fs.open(path, "rb") as f:
+            ser = parse_pm25_archive(f)
+    except FileNotFoundError:
+        NEGATIVE_CACHE.add(("openaq-s3", path), "missing")
+        return None
+    except Exception as exc:
+        breaker.record_failure()
+        LOGGER.warning("Failed reading OpenAQ S3 file %s: %s", path, exc)
+        return None
+    breaker.record_success()
+    if ser is None:
+        NEGATIVE_CACHE.add(("openaq-s3", path), "no pm25 rows")
+    return ser
+
+
 def fetch_pm25_s3(lat: float, lon: float, date: str) -> pd.DataFrame:
     """Attempt to read hourly PM2.5 for the given day from the OpenAQ S3 archive.
     Falls back to empty DataFrame if not available.
+
+    Candidates are answered from the local Parquet mirror (``openaq_mirror``) when it has them.
+    The rest are requested from S3 at once; the nearest location that has data wins, so a dead
+    closest sensor costs no extra round trip. Concurrent calls for the same point and day share
+    one fetch (and its frame, which callers must treat as read-only).
     """
-    if s3fs is None:
-        LOGGER.warning("s3fs not available; cannot read OpenAQ S3 archive.")
-        return pd.DataFrame()
-    year = pd.Timestamp(date).year
-    month = pd.Timestamp(date).month
-    day = pd.Timestamp(date).day
-    ymd = f"{year}{month:02d}{day:02d}"
-    ids = _nearest_location_ids(lat, lon)
+    key = ("openaq-s3", round_latlon(lat, lon, 4), date)
+    return get_flight("openaq-s3").do(key, _fetch_pm25_s3, lat, lon, date)
+
+
+def _fetch_pm25_s3(lat: float, lon: float, date: str) -> pd.DataFrame:
+    ids = _nearest_location_ids(lat, lon, date=date)
     if not ids:
         LOGGER.info(
             "No OpenAQ location IDs found within search radius near lat=%.3f lon=%.3f.", lat, lon
         )
         return pd.DataFrame()
-    fs = s3fs.S3FileSystem(anon=True)
+    # Mirror first: a hit ends the search, so farther candidates need no S3 read at all.
+    mirrored = {}
     for loc_id in ids:
-        path = (
-            f"openaq-data-archive/records/csv.gz/locationid={loc_id}/year={year}/month={month:02d}/"
-            f"location-{loc_id}-{ymd}.csv.gz"
-        )
-        try:
-            with fs.open(path, "rb") as f:
-                df = pd.read_csv(f, compression="gzip")
-            df = df[df["parameter"] == "pm25"][["datetime", "value"]].copy()
-            if df.empty:
+        mirrored[loc_id] = openaq_mirror.lookup(loc_id, date)
+        if isinstance(mirrored[loc_id], pd.DataFrame):
+            break
+    paths = {
+        loc_id: path
+        for loc_id, path in ((loc_id, _archive_path(loc_id, date)) for loc_id in mirrored)
+        if mirrored[loc_id] is None and ("openaq-s3", path) not in NEGATIVE_CACHE
+    }
+    if paths and s3fs is None:
+        LOGGER.warning("s3fs not available; cannot read OpenAQ S3 archive.")
+        paths = {}
+    elif paths and not get_breaker("openaq-s3").allow():
+        LOGGER.info("OpenAQ S3 skipped near lat=%.3f lon=%.3f: circuit open.", lat, lon)
+        paths = {}
+    fs = get_s3fs("openaq") if paths else None
+    jobs = {
+        loc_id: _S3_EXECUTOR.submit(_read_location_day, fs, path) for loc_id, path in paths.items()
+    }
+    try:
+        for loc_id, hit in mirrored.items():
+            if isinstance(hit, pd.DataFrame):
+                out, source = hit, "openaq-mirror"
+            elif loc_id in jobs:
+                ser = jobs[loc_id].result()
+                if ser is None:
+                    continue
+                out, source = ser.reset_index().rename(columns={"value": "pm25"}), "openaq-s3"
+            else:
                 continue
-            df["time"] = pd.to_datetime(df["datetime"], utc=True).dt.tz_convert(None)
-            ser = df.set_index("time")["value"].astype(float).resample("h").mean().interpolate()
-            out = ser.reset_index().rename(columns={"value": "pm25"})
             try:
-                out.attrs["aq_source"] = "openaq-s3"
+                out.attrs["aq_source"] = source
             except Exception:
                 pass
             LOGGER.info(
-                "OpenAQ S3 fetched %d hourly rows for location_id=%s on %s.",
+                "OpenAQ %s fetched %d hourly rows for location_id=%s on %s.",
+                source,
                 len(out),
                 loc_id,
                 date,
             )
             return out
-        except FileNotFoundError:
-            continue
-        except Exception as exc:
-            LOGGER.warning("Failed reading OpenAQ S3 file %s: %s", path, exc)
-            continue
+    finally:
+        # Farther candidates are no longer needed once a nearer one has answered.
+        for job in jobs.values():
+            job.cancel()
     LOGGER.info("OpenAQ S3 had no PM2.5 files near lat=%.3f lon=%.3f on %s.", lat, lon, date)
     return pd.DataFrame()
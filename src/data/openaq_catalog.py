@@ -0,0 +1,303 @@
+"""Local catalog of OpenAQ locations with a grid spatial index.
+
+Sensor locations change rarely, so instead of asking ``/v3/locations`` for every school we keep
+``id, lat, lon, parameters, first/last measurement`` on disk and answer nearest / radius queries
+in-process. The catalog is refreshed in bulk (``scripts/refresh_openaq_catalog.py``) and
+``_nearest_location_ids`` only falls back to the network when it is stale or the query falls
+outside the refreshed area.
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config import OPENAQ_API_KEY, OPENAQ_CATALOG_MAX_AGE_S, OPENAQ_CATALOG_PATH
+from ..utils.clients import get_http_client
+
+LOGGER = logging.getLogger(__name__)
+
+LOCATIONS_URL = "https://api.openaq.org/v3/locations"
+PM25_PARAMETER_ID = 2
+EARTH_RADIUS_M = 6_371_008.8
+CELL_DEG = 0.25
+# A location whose last measurement is this close to the refresh time was still reporting then,
+# so it counts as active for later days (which the snapshot's datetimeLast cannot cover).
+REPORTING_SLACK = np.timedelta64(3, "D")
+
+_LOADED: Dict[str, Tuple[int, "LocationCatalog"]] = {}
+_LOADED_LOCK = threading.Lock()
+
+
+def haversine_m(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    p1 = np.radians(lat)
+    p2 = np.radians(lats)
+    dphi = p2 - p1
+    dlmb = np.radians(lons - lon)
+    a = np.sin(dphi / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class LocationCatalog:
+    """OpenAQ locations bucketed on a 0.25° lat/lon grid for fast k-nearest and radius queries."""
+
+    def __init__(
+        self,
+        locations: Sequence[Sequence],
+        fetched_at: Optional[str] = None,
+        bbox: Optional[Sequence[float]] = None,
+    ):
+        rows = list(locations)
+        self.ids = np.array([int(r[0]) for r in rows], dtype=np.int64)
+        self.lats = np.array([float(r[1]) for r in rows], dtype=float)
+        self.lons = np.array([float(r[2]) for r in rows], dtype=float)
+        self.parameters = [frozenset(str(r[3]).split(";")) if r[3] else frozenset() for r in rows]
+        self.first = pd.to_datetime([r[4] for r in rows], utc=True, errors="coerce")
+        self.last = pd.to_datetime([r[5] for r in rows], utc=True, errors="coerce")
+        self._first_ns = self.first.tz_convert(None).values
+        self._last_ns = self.last.tz_convert(None).values
+        self._param_masks: Dict[str, np.ndarray] = {}
+        self.fetched_at = fetched_at
+        self.bbox = list(bbox) if bbox else None
+        self._grid: Dict[Tuple[int, int], np.ndarray] = {}
+        if len(rows):
+            keys = np.stack(
+                [np.floor(self.lats / CELL_DEG), np.floor(self.lons / CELL_DEG)], axis=1
+            ).astype(np.int64)
+            order = np.lexsort((keys[:, 1], keys[:, 0]))
+            sorted_keys = keys[order]
+            breaks = np.flatnonzero(np.any(np.diff(sorted_keys, axis=0) != 0, axis=1)) + 1
+            for group in np.split(order, breaks):
+                self._grid[(int(keys[group[0], 0]), int(keys[group[0], 1]))] = group
+
+    def __len__(self) -> int:
+        return int(self.ids.size)
+
+    def age_s(self) -> float:
+        if not self.fetched_at:
+            return float("inf")
+        fetched = pd.Timestamp(self.fetched_at)
+        if fetched.tzinfo is None:
+            fetched = fetched.tz_localize("UTC")
+        return (pd.Timestamp.now(tz="UTC") - fetched).total_seconds()
+
+    def is_stale(self, max_age_s: float = OPENAQ_CATALOG_MAX_AGE_S) -> bool:
+        return self.age_s() > max_age_s
+
+    def covers(self, lat: float, lon: float) -> bool:
+        if self.bbox is None:
+            return True
+        min_lon, min_lat, max_lon, max_lat = self.bbox
+        return min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+
+    def _candidates(self, lat: float, lon: float, ring: int) -> np.ndarray:
+        cy, cx = int(np.floor(lat / CELL_DEG)), int(np.floor(lon / CELL_DEG))
+        found = [
+            self._grid[key]
+            for key in (
+                (cy + dy, cx + dx) for dy in range(-ring, ring + 1) for dx in range(-ring, ring + 1)
+            )
+            if key in self._grid
+        ]
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def _parameter_mask(self, parameter: str) -> np.ndarray:
+        mask = self._param_masks.get(parameter)
+        if mask is None:
+            mask = np.fromiter((parameter in p for p in self.parameters), bool, len(self))
+            self._param_masks[parameter] = mask
+        return mask
+
+    def _reporting_since(self) -> np.datetime64:
+        if not self.fetched_at:
+            return np.datetime64("NaT", "ns")  # never compares true
+        fetched = pd.Timestamp(self.fetched_at)
+        if fetched.tzinfo is not None:
+            fetched = fetched.tz_convert(None)
+        return fetched.to_datetime64().astype("datetime64[ns]") - REPORTING_SLACK
+
+    def _filter(
+        self, rows: np.ndarray, parameter: Optional[str], on_date: Optional[str]
+    ) -> np.ndarray:
+        if parameter:
+            rows = rows[self._parameter_mask(parameter)[rows]]
+        if on_date is not None and rows.size:
+            day = pd.Timestamp(on_date).to_datetime64().astype("datetime64[ns]")
+            first = self._first_ns[rows]
+            last = self._last_ns[rows]
+            active = (np.isnat(first) | (first <= day + np.timedelta64(1, "D"))) & (
+                np.isnat(last) | (last >= day) | (last >= self._reporting_since())
+            )
+            rows = rows[active]
+        return rows
+
+    def query(
+        self,
+        lat: float,
+        lon: float,
+        k: Optional[int] = None,
+        radius_m: Optional[float] = None,
+        parameter: Optional[str] = "pm25",
+        on_date: Optional[str] = None,
+    ) -> List[Tuple[int, float]]:
+        """``[(location_id, distance_m), ...]`` nearest first, limited by ``k`` and/or radius."""
+        if not len(self) or (k is None and radius_m is None):
+            return []
+        # Grow the search ring until it is guaranteed to contain every qualifying location.
+        cos_lat = max(np.cos(np.radians(min(abs(lat), 89.0))), 1e-3)
+        cell_m = CELL_DEG * (np.pi / 180.0) * EARTH_RADIUS_M * cos_lat
+        max_ring = int(180 / CELL_DEG)
+        if radius_m is not None:
+            max_ring = min(max_ring, int(np.ceil(radius_m / cell_m)) + 1)
+        ring = 1 if k is not None else max_ring
+        while True:
+            rows = self._filter(self._candidates(lat, lon, ring), parameter, on_date)
+            dist = haversine_m(lat, lon, self.lats[rows], self.lons[rows])
+            if radius_m is not None:
+                keep = dist <= radius_m
+                rows, dist = rows[keep], dist[keep]
+            order = np.argsort(dist, kind="stable")
+            if k is not None:
+                order = order[:k]
+            # Anything outside the ring is at least ``ring * cell_m`` away.
+            complete = ring >= max_ring or (
+                k is not None and len(order) >= k and dist[order[-1]] <= ring * cell_m
+            )
+            if complete:
+                return [(int(self.ids[rows[i]]), float(dist[i])) for i in order]
+            ring = min(max_ring, ring * 2)
+
+    def nearest_ids(
+        self,
+        lat: float,
+        lon: float,
+        k: int = 3,
+        radius_m: Optional[float] = 25000,
+        parameter: Optional[str] = "pm25",
+        on_date: Optional[str] = None,
+    ) -> List[int]:
+        return [loc for loc, _ in self.query(lat, lon, k, radius_m, parameter, on_date)]
+
+    def to_payload(self) -> dict:
+        def _iso(ts):
+            return None if pd.isna(ts) else ts.isoformat()
+
+        return {
+            "fetched_at": self.fetched_at,
+            "bbox": self.bbox,
+            "locations": [
+                [
+                    int(self.ids[i]),
+                    float(self.lats[i]),
+                    float(self.lons[i]),
+                    ";".join(sorted(self.parameters[i])),
+                    _iso(self.first[i]),
+                    _iso(self.last[i]),
+                ]
+                for i in range(len(self))
+            ],
+        }
+
+
+def save_catalog(catalog: LocationCatalog, path: Optional[str] = None) -> Path:
+    target = Path(path or OPENAQ_CATALOG_PATH)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(target.suffix + ".tmp")
+    tmp.write_text(json.dumps(catalog.to_payload(), separators=(",", ":")))
+    tmp.replace(target)
+    return target
+
+
+def load_catalog(path: Optional[str] = None) -> Optional[LocationCatalog]:
+    """Return the on-disk catalog (re-read when the file changes), or None if there is none."""
+    target = Path(path or OPENAQ_CATALOG_PATH) if (path or OPENAQ_CATALOG_PATH) else None
+    if target is None:
+        return None
+    try:
+        mtime = target.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _LOADED_LOCK:
+        cached = _LOADED.get(str(target))
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        payload = json.loads(target.read_text())
+        catalog = LocationCatalog(
+            payload.get("locations", []), payload.get("fetched_at"), payload.get("bbox")
+        )
+    except Exception as exc:
+        LOGGER.warning("Ignoring unreadable OpenAQ catalog %s: %s", target, exc)
+        return None
+    with _LOADED_LOCK:
+        _LOADED[str(target)] = (mtime, catalog)
+    return catalog
+
+
+def _parse_location(item: dict) -> Optional[list]:
+    coords = item.get("coordinates") or {}
+    if item.get("id") is None or coords.get("latitude") is None:
+        return None
+    params = sorted(
+        {
+            (s.get("parameter") or {}).get("name")
+            for s in item.get("sensors") or []
+            if (s.get("parameter") or {}).get("name")
+        }
+    )
+    first = (item.get("datetimeFirst") or {}).get("utc")
+    last = (item.get("datetimeLast") or {}).get("utc")
+    return [
+        int(item["id"]),
+        float(coords["latitude"]),
+        float(coords["longitude"]),
+        ";".join(params),
+        first,
+        last,
+    ]
+
+
+def refresh_catalog(
+    bbox: Optional[Sequence[float]] = None,
+    parameter_id: Optional[int] = PM25_PARAMETER_ID,
+    page_size: int = 1000,
+    max_pages: int = 1000,
+    path: Optional[str] = None,
+) -> LocationCatalog:
+    """Page through ``/v3/locations`` (optionally within ``bbox`` = min_lon,min_lat,max_lon,max_lat)
+    and atomically replace the local catalog."""
+    headers = {"X-API-Key": OPENAQ_API_KEY} if OPENAQ_API_KEY else None
+    client = get_http_client()
+    rows: Dict[int, list] = {}
+    for page in range(1, max_pages + 1):
+        params = {"limit": page_size, "page": page}
+        if parameter_id is not None:
+            params["parameters_id"] = parameter_id
+        if bbox is not None:
+            params["bbox"] = ",".join(f"{v:g}" for v in bbox)
+        r = client.get(LOCATIONS_URL, params=params, headers=headers, timeout=60)
+        if r.status_code == 429:
+            time.sleep(float(r.headers.get("retry-after", 5)))
+            r = client.get(LOCATIONS_URL, params=params, headers=headers, timeout=60)
+        r.raise_for_status()
+        items = r.json().get("results", [])
+        for item in items:
+            row = _parse_location(item)
+            if row is not None:
+                rows[row[0]] = row
+        if len(items) < page_size:
+            break
+    catalog = LocationCatalog(
+        list(rows.values()),
+        fetched_at=datetime.now(timezone.utc).isoformat(),
+        bbox=bbox,
+    )
+    target = save_catalog(catalog, path)
+    LOGGER.info("OpenAQ catalog refreshed: %d locations -> %s", len(catalog), target)
+    return catalog
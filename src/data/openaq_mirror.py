@@ -0,0 +1,252 @@
+"""Local Parquet mirror of the OpenAQ archive, reduced to hourly PM2.5.
+
+``sync_mirror`` downloads the ``records/csv.gz/locationid=/year=/month=`` partitions of the
+locations a district uses once, and writes one small Parquet file per location-month::
+
+    <root>/location_id=<id>/month=<YYYY-MM>/pm25.parquet   (date, time, pm25)
+    <root>/location_id=<id>/month=<YYYY-MM>/_sync.json     (days listed, completeness)
+
+Each archive day file is parsed exactly as ``fetch_pm25_s3`` would parse it, and its hourly
+series is stored under that file's ``date``, so a mirror hit returns the same frame as an S3 read.
+``fetch_pm25_s3`` consults the mirror before S3, and ``read_pm25_range`` answers date-range,
+multi-location queries with a local predicate-pushdown scan.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from ..config import OPENAQ_IO_WORKERS, OPENAQ_MIRROR_DIR
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.dataset as pa_ds  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except Exception:  # pragma: no cover - the mirror needs pyarrow; S3 reads still work without it
+    pa = pa_ds = pq = None
+
+LOGGER = logging.getLogger(__name__)
+
+ARCHIVE_PREFIX = "openaq-data-archive/records/csv.gz"
+# Days after which an archive day file (and a month's listing) is treated as final.
+COMPLETE_AFTER_DAYS = 3
+ABSENT = "absent"
+
+_DAY_FILE = re.compile(r"location-(\d+)-(\d{8})\.csv\.gz$")
+
+
+def enabled(root: Optional[str] = None) -> bool:
+    return pq is not None and bool(root or OPENAQ_MIRROR_DIR)
+
+
+def archive_month_prefix(loc_id: int, year: int, month: int) -> str:
+    return f"{ARCHIVE_PREFIX}/locationid={loc_id}/year={year}/month={month:02d}"
+
+
+def partition_dir(loc_id: int, month: str, root: Optional[str] = None) -> Path:
+    return Path(root or OPENAQ_MIRROR_DIR) / f"location_id={int(loc_id)}" / f"month={month}"
+
+
+def _month_key(date) -> str:
+    return pd.Timestamp(date).strftime("%Y-%m")
+
+
+def _read_manifest(folder: Path) -> Optional[dict]:
+    try:
+        return json.loads((folder / "_sync.json").read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _publish(target: Path, write) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, target)
+    except Exception:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def lookup(loc_id: int, date: str, root: Optional[str] = None):
+    """Mirror answer for one location-day.
+
+    Returns the hourly ``time``/``pm25`` frame on a hit, ``ABSENT`` when the synced month is
+    final and has no PM2.5 for that day, and None when the mirror cannot say (fall back to S3).
+    """
+    if not enabled(root):
+        return None
+    folder = partition_dir(loc_id, _month_key(date), root)
+    manifest = _read_manifest(folder)
+    if manifest is None:
+        return None
+    day = pd.Timestamp(date).strftime("%Y-%m-%d")
+    if day not in manifest.get("days", []):
+        return ABSENT if manifest.get("complete") else None
+    table = pq.read_table(
+        folder / "pm25.parquet", columns=["time", "pm25"], filters=[("date", "==", day)]
+    )
+    out = table.to_pandas().reset_index(drop=True)
+    return out if len(out) else None
+
+
+def read_pm25_range(
+    location_ids: Sequence[int], start: str, end: str, root: Optional[str] = None
+) -> pd.DataFrame:
+    """Hourly PM2.5 for every mirrored ``location_ids`` day in ``[start, end]`` (inclusive dates).
+
+    Only the location-month files that exist are scanned, and the date predicate is pushed down
+    to Parquet row-group statistics. Columns: ``location_id, date, time, pm25``.
+    """
+    columns = ["location_id", "date", "time", "pm25"]
+    if not enabled(root):
+        return pd.DataFrame(columns=columns)
+    months = pd.period_range(pd.Timestamp(start), pd.Timestamp(end), freq="M").strftime("%Y-%m")
+    files = [
+        str(path)
+        for loc_id in dict.fromkeys(int(v) for v in location_ids)
+        for month in months
+        for path in [partition_dir(loc_id, month, root) / "pm25.parquet"]
+        if path.exists()
+    ]
+    if not files:
+        return pd.DataFrame(columns=columns)
+    first = pd.Timestamp(start).strftime("%Y-%m-%d")
+    last = pd.Timestamp(end).strftime("%Y-%m-%d")
+    dataset = pa_ds.dataset(
+        files,
+        format="parquet",
+        partitioning="hive",
+        partition_base_dir=str(Path(root or OPENAQ_MIRROR_DIR)),
+    )
+    table = dataset.to_table(
+        columns=columns, filter=(pa_ds.field("date") >= first) & (pa_ds.field("date") <= last)
+    )
+    out = table.to_pandas()
+    out["location_id"] = out["location_id"].astype("int64")
+    return out.sort_values(["location_id", "date", "time"], ignore_index=True)
+
+
+def _month_is_final(month: str, now: pd.Timestamp) -> bool:
+    month_end = pd.Period(month, freq="M").end_time.tz_localize("UTC")
+    return now >= month_end + pd.Timedelta(days=COMPLETE_AFTER_DAYS)
+
+
+def sync_location_month(
+    fs, loc_id: int, month: str, root: Optional[str] = None, refresh: bool = False, executor=None
+) -> Dict[str, int]:
+    """Mirror one location-month; a final month already synced is skipped unless ``refresh``."""
+    from .openaq import parse_pm25_archive  # local: openaq imports this module
+
+    folder = partition_dir(loc_id, month, root)
+    manifest = _read_manifest(folder)
+    if manifest and manifest.get("complete") and not refresh:
+        return {"skipped": 1, "files": 0, "days": len(manifest.get("days", []))}
+    period = pd.Period(month, freq="M")
+    prefix = archive_month_prefix(loc_id, period.year, period.month)
+    try:
+        listing = sorted(p for p in fs.ls(prefix, detail=False) if _DAY_FILE.search(p))
+    except FileNotFoundError:
+        listing = []
+    now = pd.Timestamp.now(tz="UTC")
+    # Recent day files can still grow; leave them to live S3 reads until they settle.
+    settled = (now - pd.Timedelta(days=COMPLETE_AFTER_DAYS)).strftime("%Y%m%d")
+    listing = [p for p in listing if _DAY_FILE.search(p).group(2) <= settled]
+
+    def _parse(path: str) -> Tuple[str, Optional[pd.Series]]:
+        stamp = _DAY_FILE.search(path).group(2)
+        with fs.open(path, "rb") as fh:
+            return f"{stamp[:4]}-{stamp[4:6]}-{stamp[6:]}", parse_pm25_archive(fh)
+
+    results = list(executor.map(_parse, listing)) if executor else [_parse(p) for p in listing]
+    frames = []
+    for day, ser in results:
+        if ser is None:
+            continue
+        frame = ser.rename("pm25").rename_axis("time").reset_index()
+        frame.insert(0, "date", day)
+        frames.append(frame)
+    days = sorted({frame["date"].iloc[0] for frame in frames})
+    if frames:
+        table = pa.Table.from_pandas(
+            pd.concat(frames, ignore_index=True).sort_values(["date", "time"]),
+            schema=pa.schema(
+                [("date", pa.string()), ("time", pa.timestamp("ns")), ("pm25", pa.float64())]
+            ),
+            preserve_index=False,
+        )
+        _publish(folder / "pm25.parquet", lambda tmp: pq.write_table(table, tmp))
+    else:
+        try:
+            (folder / "pm25.parquet").unlink()
+        except FileNotFoundError:
+            pass
+    payload = {
+        "synced_at": datetime.now(timezone.utc).isoformat(),
+        "listed": len(listing),
+        "days": days,
+        "complete": _month_is_final(month, now),
+    }
+    _publish(folder / "_sync.json", lambda tmp: Path(tmp).write_text(json.dumps(payload)))
+    return {"skipped": 0, "files": len(listing), "days": len(days)}
+
+
+def sync_mirror(
+    location_ids: Iterable[int],
+    start: str,
+    end: str,
+    root: Optional[str] = None,
+    fs=None,
+    refresh: bool = False,
+) -> Dict[str, int]:
+    """Mirror every month in ``[start, end]`` for ``location_ids``; returns aggregate counts."""
+    if not enabled(root):
+        raise RuntimeError("pyarrow and HEATSHIELD_OPENAQ_MIRROR_DIR are required for the mirror.")
+    if fs is None:
+        from ..utils.clients import get_s3fs
+
+        fs = get_s3fs("openaq")
+    months = list(
+        pd.period_range(pd.Timestamp(start), pd.Timestamp(end), freq="M").strftime("%Y-%m")
+    )
+    totals = {"partitions": 0, "skipped": 0, "files": 0, "days": 0}
+    with ThreadPoolExecutor(
+        max_workers=max(1, OPENAQ_IO_WORKERS), thread_name_prefix="heatshield-openaq-sync"
+    ) as pool:
+        for loc_id in dict.fromkeys(int(v) for v in location_ids):
+            for month in months:
+                stats = sync_location_month(fs, loc_id, month, root, refresh, executor=pool)
+                totals["partitions"] += 1
+                for key in ("skipped", "files", "days"):
+                    totals[key] += stats[key]
+                LOGGER.info("OpenAQ mirror location=%s month=%s: %s", loc_id, month, stats)
+    return totals
+
+
+def locations_for_points(
+    points: Sequence[Tuple[float, float]], k: int = 3, radius_m: float = 25000
+) -> List[int]:
+    """Catalog locations ``fetch_pm25_s3`` would consider for ``points`` (what to mirror)."""
+    from .openaq_catalog import load_catalog
+
+    catalog = load_catalog()
+    if catalog is None:
+        raise RuntimeError("No OpenAQ catalog; run scripts/refresh_openaq_catalog.py first.")
+    ids: Dict[int, None] = {}
+    for lat, lon in points:
+        for loc_id in catalog.nearest_ids(lat, lon, k=k, radius_m=radius_m):
+            ids[loc_id] = None
+    return list(ids)
@@ -0,0 +1,362 @@
+"""Physical Liljegren et al. (2008) WBGT: globe and natural wet-bulb energy balances.
+
+``wbgt_liljegren_from_met`` is a Stull wet-bulb plus shortwave-proxy approximation. This module
+solves the actual model: globe temperature from the radiative/convective balance of a 5 cm
+black globe, natural wet-bulb from the balance of a ventilated wick, both with pressure, solar
+geometry and the direct/diffuse split. The reference code relaxes each element separately
+(``T = 0.9 T + 0.1 T_new`` until the step is under 0.02 K, up to 50 times). Here every element
+of a block takes Newton steps on the same residual in lockstep, with heat-transfer
+coefficients refreshed at each step (viscosity, diffusivity and the Reynolds/Schmidt powers
+are folded into a few logs and exps). Converged elements drop out once more than half of a
+block has settled, and iteration stops when every step is below ``tol`` or after ``max_iter``;
+three or four steps suffice in practice, starting the wick from the Stull wet bulb.
+
+``wbgt_liljegren_point`` keeps a scalar port of the reference relaxation loop for spot checks.
+"""
+
+import logging
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .wbgt_batch import DEFAULT_BLOCK, _result_dtype, _run_blocks
+
+LOGGER = logging.getLogger(__name__)
+
+SOLAR_CONST = 1367.0
+STEFANB = 5.6696e-8
+CP = 1003.5
+M_AIR = 28.97
+M_H2O = 18.015
+RATIO = CP * M_AIR / M_H2O
+R_GAS = 8314.34
+R_AIR = R_GAS / M_AIR
+PR = CP / (CP + 1.25 * R_AIR)
+EMIS_WICK = 0.95
+ALB_WICK = 0.4
+D_WICK = 0.007
+L_WICK = 0.0254
+EMIS_GLOBE = 0.95
+ALB_GLOBE = 0.05
+D_GLOBE = 0.0508
+EMIS_SFC = 0.999
+ALB_SFC = 0.45
+MIN_SPEED = 0.13
+CZA_MIN = 0.00873
+NORMSOLAR_MAX = 0.85
+CONVERGENCE = 0.02
+MAX_ITER = 50
+
+_PCRIT13 = (36.4 * 218.0) ** (1.0 / 3.0)
+_TCRIT512 = (132.0 * 647.3) ** (5.0 / 12.0)
+_TCRIT12 = (132.0 * 647.3) ** 0.5
+_MMIX = (1.0 / 28.97 + 1.0 / 18.015) ** 0.5
+_DIFF_CONST = 0.000364 * _PCRIT13 * _TCRIT512 * _MMIX * 1013.25 * 0.0001
+_PR13 = PR ** (1.0 / 3.0)
+_PR044 = PR ** (1.0 - 0.56)
+
+
+def _viscosity(t):
+    omega = (t / 97.0 - 2.9) / 0.4 * (-0.034) + 1.048
+    return 0.0000026693 * np.sqrt(28.97 * t) / (3.617**2 * omega)
+
+
+def _esat(t):
+    """Saturation vapour pressure over water (hPa), with the 1.004 enhancement factor."""
+    return 1.004 * 6.1121 * np.exp(17.502 * (t - 273.15) / (t - 32.18))
+
+
+def cos_zenith(lat, lon, time) -> np.ndarray:
+    """Cosine of the solar zenith angle (NOAA approximation) for UTC ``time`` values."""
+    ts = pd.DatetimeIndex(np.ravel(np.asarray(time, dtype="datetime64[ns]")))
+    shape = np.shape(time)
+    doy = ts.dayofyear.to_numpy().reshape(shape)
+    hours = (ts.hour + ts.minute / 60.0 + ts.second / 3600.0).to_numpy().reshape(shape)
+    gamma = 2.0 * np.pi / 365.0 * (doy - 1 + (hours - 12.0) / 24.0)
+    eqtime = 229.18 * (
+        0.000075
+        + 0.001868 * np.cos(gamma)
+        - 0.032077 * np.sin(gamma)
+        - 0.014615 * np.cos(2 * gamma)
+        - 0.040849 * np.sin(2 * gamma)
+    )
+    decl = (
+        0.006918
+        - 0.399912 * np.cos(gamma)
+        + 0.070257 * np.sin(gamma)
+        - 0.006758 * np.cos(2 * gamma)
+        + 0.000907 * np.sin(2 * gamma)
+        - 0.002697 * np.cos(3 * gamma)
+        + 0.00148 * np.sin(3 * gamma)
+    )
+    hour_angle = np.radians((hours * 60.0 + eqtime + 4.0 * np.asarray(lon)) / 4.0 - 180.0)
+    phi = np.radians(lat)
+    return np.sin(phi) * np.sin(decl) + np.cos(phi) * np.cos(decl) * np.cos(hour_angle)
+
+
+def _solar_split(swdown, cza):
+    """Cap shortwave at 85% of top-of-atmosphere and estimate the direct-beam fraction."""
+    lit = cza >= CZA_MIN
+    toa = SOLAR_CONST * cza
+    norm = np.minimum(swdown / np.where(lit, toa, np.inf), NORMSOLAR_MAX)
+    solar = np.where(lit, norm * toa, swdown)
+    with np.errstate(divide="ignore"):
+        # exp(-inf) = 0 where there is no sun.
+        fdir = np.minimum(np.exp(3.0 - 1.34 * norm - 1.65 / norm), 0.9)
+    return solar, fdir
+
+
+# Transport properties folded into closed forms of s = Tsurface + Ta (= 2 Tref):
+# viscosity = _VISC * sqrt(s) / omega with omega = _OMEGA0 - _OMEGA1 * s, and
+# Pr * density * diffusivity / viscosity = _SC_CONST * omega * s**0.834 at any pressure.
+_KC = CP + 1.25 * R_AIR
+_OMEGA0 = 1.048 + 0.034 * 2.9 / 0.4
+_OMEGA1 = 0.034 / (0.4 * 97.0) / 2.0
+_VISC = 0.0000026693 * math.sqrt(28.97 / 2.0) / 3.617**2
+_SC_CONST = PR * 100.0 / R_AIR * _DIFF_CONST / _VISC / (2.0 * _TCRIT12) ** 2.334 * 2.0
+_GLOBE_K1 = 2.0 * _KC * _VISC / (D_GLOBE * STEFANB * EMIS_GLOBE)
+_GLOBE_K2 = 0.6 * _PR13 * _KC / (D_GLOBE * STEFANB * EMIS_GLOBE) * math.sqrt(2.0 * _VISC * D_GLOBE)
+_WICK_H = 0.281 * _PR044 * _KC / D_WICK * (2.0 * D_WICK) ** 0.6 * _VISC**0.4
+_SIGMA_WICK = STEFANB * EMIS_WICK
+
+
+def _newton(x, step_fn, args, tol, max_iter) -> int:
+    """Lockstep Newton on ``x`` in place; returns the number of elements that did not converge.
+
+    Every element takes the same steps, but once fewer than half are still moving the active
+    ones are gathered so the remaining steps only touch those.
+    """
+    idx = None
+    xs = x
+    n_moving = 0
+    for _ in range(max_iter):
+        step = step_fn(xs, *args)
+        xs -= step
+        moving = np.abs(step) >= tol
+        n_moving = int(np.count_nonzero(moving))
+        if not n_moving:
+            break
+        if 2 * n_moving < xs.size:
+            if idx is not None:
+                x[idx] = xs
+            keep = np.flatnonzero(moving)
+            idx = keep if idx is None else idx[keep]
+            xs = xs[keep]
+            args = tuple(a[keep] for a in args)
+    if idx is not None:
+        x[idx] = xs
+    return n_moving
+
+
+def _globe_step(tg, ta, sg, c_globe):
+    """Newton step on Tg^4 + k (Tg - Ta) - C, with k = h_sphere(Tref) / (sigma * emis)."""
+    s = tg + ta
+    omega = _OMEGA0 - _OMEGA1 * s
+    q = np.sqrt(s)
+    k = _GLOBE_K1 * q / omega + _GLOBE_K2 * np.sqrt(sg / (q * omega))
+    tg3 = tg * tg * tg
+    return (tg3 * tg + k * (tg - ta) - c_globe) / (4.0 * tg3 + k)
+
+
+def _wick_step(twb, ta, e, p, p_minus_e, f_wick, inv_h0):
+    """Newton step on Twb - Ta + latent (es - e)/(P - es) - Fatm / h."""
+    s = twb + ta
+    omega = _OMEGA0 - _OMEGA1 * s
+    log_omega = np.log(omega)
+    log_s = np.log(s)
+    # evap / RATIO * (Pr / Sc)^0.56 and 1 / h, via logs to avoid fractional powers.
+    latent = (
+        (2.4073e6 - 71100.0 / 30.0 * (313.15 - 0.5 * s))
+        / RATIO
+        * np.exp(0.56 * log_omega + 0.46704 * log_s + 0.56 * math.log(_SC_CONST))
+    )
+    inv_h = inv_h0 * np.exp(0.4 * (log_omega + log_s))
+    d = twb - 32.18
+    es = (1.004 * 6.1121) * np.exp(17.502 * (twb - 273.15) / d)
+    p_minus_es = p - es
+    twb3 = twb * twb * twb
+    resid = twb - ta + latent * (es - e) / p_minus_es - (f_wick - _SIGMA_WICK * twb3 * twb) * inv_h
+    slope = (
+        1.0
+        + latent * (17.502 * 240.97) * es / (d * d) * p_minus_e / (p_minus_es * p_minus_es)
+        + (4.0 * _SIGMA_WICK) * twb3 * inv_h
+    )
+    return resid / slope
+
+
+def _solve_block(ta, rh, sw, speed, p, cza, tol, max_iter) -> Tuple[np.ndarray, int]:
+    """WBGT (K) for one block plus the number of elements that did not converge."""
+    e = rh * _esat(ta)
+    ta2 = ta * ta
+    sky = 0.5 * (0.575 * np.exp(0.143 * np.log(e)) + EMIS_SFC) * (ta2 * ta2)
+    solar, fdir = _solar_split(sw, cza)
+    cza_safe = np.maximum(cza, CZA_MIN)
+    # speed * density * T, the per-element part of the Reynolds numbers.
+    flow = np.maximum(speed, MIN_SPEED) * (p * (100.0 / R_AIR))
+
+    c_globe = sky + solar / (2.0 * STEFANB * EMIS_GLOBE) * (1.0 - ALB_GLOBE) * (
+        fdir * (1.0 / (2.0 * cza_safe) - 1.0) + 1.0 + ALB_SFC
+    )
+    tg = ta.copy()
+    unconverged = _newton(tg, _globe_step, (ta, flow, c_globe), tol, max_iter)
+
+    tan_zenith = np.sqrt(np.maximum(1.0 - cza_safe**2, 0.0)) / cza_safe
+    rad_wick = (
+        (1.0 - ALB_WICK)
+        * solar
+        * (
+            (1.0 - fdir) * (1.0 + 0.25 * D_WICK / L_WICK)
+            + fdir * (tan_zenith / np.pi + 0.25 * D_WICK / L_WICK)
+            + ALB_SFC
+        )
+    )
+    f_wick = _SIGMA_WICK * sky + rad_wick
+    inv_h0 = 1.0 / (_WICK_H * np.exp(0.6 * np.log(flow)))
+    # Stull (2011) wet bulb as the starting point: within ~1 K of the natural wet bulb in shade.
+    r = 100.0 * rh
+    tc = ta - 273.15
+    twb = 273.15 + (
+        tc * np.arctan(0.151977 * np.sqrt(r + 8.313659))
+        + np.arctan(tc + r)
+        - np.arctan(r - 1.676331)
+        + 0.00391838 * r * np.sqrt(r) * np.arctan(0.023101 * r)
+        - 4.686035
+    )
+    unconverged += _newton(twb, _wick_step, (ta, e, p, p - e, f_wick, inv_h0), tol, max_iter)
+    return 0.7 * twb + 0.2 * tg + 0.1 * ta, unconverged
+
+
+def wbgt_liljegren_physical(
+    temp_c,
+    rh,
+    swdown,
+    wind_ms,
+    p_hPa=1013.0,
+    cza=None,
+    lat=None,
+    lon=None,
+    time=None,
+    tol: float = CONVERGENCE,
+    max_iter: int = MAX_ITER,
+    dtype=None,
+    block: int = DEFAULT_BLOCK // 4,
+    workers: Optional[int] = 1,
+) -> np.ndarray:
+    """Outdoor WBGT (C) from the Liljegren globe / natural wet-bulb energy balances.
+
+    Inputs broadcast together (any shape). ``rh`` is 0-1, ``swdown`` total shortwave (W/m2),
+    ``wind_ms`` wind at ~2 m (ERA5 10 m wind overstates it; scale it first if that matters).
+    Solar geometry comes from ``cza`` (cosine of the zenith angle) or from ``lat``/``lon``/UTC
+    ``time`` via ``cos_zenith``; with neither, the sun is taken as overhead whenever
+    ``swdown > 0``. Elements still moving after ``max_iter`` steps keep their last Newton
+    iterate, and a warning reports how many there were.
+
+    float32 inputs (or ``dtype=np.float32``) are the fast mode: solved in float32 at about
+    1.7-1.8x the float64 throughput, within 0.01 C. Neither reaches 1e7 site-hours/s on one
+    core (roughly 9 M and 5 M on a fast one); spread large batches over ``workers``.
+    """
+    if cza is None:
+        if time is not None and lat is not None and lon is not None:
+            cza = cos_zenith(lat, lon, time)
+        else:
+            cza = np.where(np.asarray(swdown) > 0, 1.0, 0.0)
+    dtype = _result_dtype((temp_c, rh, swdown, wind_ms), dtype)
+    arrays = np.broadcast_arrays(
+        *(np.asarray(x, dtype=dtype) for x in (temp_c, rh, swdown, wind_ms, p_hPa, cza))
+    )
+    shape = arrays[0].shape
+    ta, r, sw, u, p, c = (np.ascontiguousarray(x).reshape(-1) for x in arrays)
+    out = np.empty(ta.size, dtype=dtype)
+    block = max(1, int(block))
+    unconverged = []
+
+    def task(lo: int, hi: int) -> None:
+        for start in range(lo, hi, block):
+            sl = slice(start, min(start + block, hi))
+            wbgt_k, missed = _solve_block(
+                ta[sl] + 273.15,
+                np.clip(r[sl], 1e-3, 1.0),
+                np.maximum(sw[sl], 0.0),
+                u[sl],
+                p[sl],
+                c[sl],
+                tol,
+                max_iter,
+            )
+            out[sl] = wbgt_k - 273.15
+            unconverged.append(missed)
+
+    if out.size:
+        _run_blocks(out.size, block, workers, task)
+    missed = sum(unconverged)
+    if missed:
+        LOGGER.warning(
+            "Liljegren WBGT: %d globe/wick solves for %d elements did not converge within "
+            "max_iter=%d (tol=%g K); they keep their last iterate.",
+            missed,
+            out.size,
+            max_iter,
+            tol,
+        )
+    return out.reshape(shape)
+
+
+def wbgt_liljegren_point(
+    temp_c: float, rh: float, swdown: float, wind_ms: float, p_hPa: float, cza: float
+) -> float:
+    """Scalar port of the reference relaxation loops (slow; for validation and spot checks)."""
+    ta = temp_c + 273.15
+    rh = min(max(rh, 1e-3), 1.0)
+    speed = max(wind_ms, MIN_SPEED)
+    e = rh * float(_esat(ta))
+    emis_atm = 0.575 * e**0.143
+    solar, fdir = (float(v) for v in _solar_split(np.array(max(swdown, 0.0)), np.array(cza)))
+    cza_safe = max(cza, CZA_MIN)
+    sky = 0.5 * (emis_atm * ta**4 + EMIS_SFC * ta**4)
+
+    def h_sphere(t):
+        visc = float(_viscosity(t))
+        re = speed * (p_hPa * 100.0 / (R_AIR * t)) * D_GLOBE / visc
+        return (2.0 + 0.6 * re**0.5 * PR ** (1 / 3)) * (CP + 1.25 * R_AIR) * visc / D_GLOBE
+
+    tg_prev = ta
+    for _ in range(MAX_ITER):
+        h = h_sphere(0.5 * (tg_prev + ta))
+        tg = (
+            sky
+            - h / (STEFANB * EMIS_GLOBE) * (tg_prev - ta)
+            + solar
+            / (2.0 * STEFANB * EMIS_GLOBE)
+            * (1.0 - ALB_GLOBE)
+            * (fdir * (1.0 / (2.0 * cza_safe) - 1.0) + 1.0 + ALB_SFC)
+        ) ** 0.25
+        if abs(tg - tg_prev) < CONVERGENCE:
+            break
+        tg_prev = 0.9 * tg_prev + 0.1 * tg
+
+    z = math.log(e / (6.1121 * 1.004))
+    twb_prev = 273.15 + 240.97 * z / (17.502 - z)
+    tan_zenith = math.sqrt(max(1.0 - cza_safe**2, 0.0)) / cza_safe
+    for _ in range(MAX_ITER):
+        tref = 0.5 * (twb_prev + ta)
+        visc = float(_viscosity(tref))
+        density = p_hPa * 100.0 / (R_AIR * tref)
+        diffusivity = _DIFF_CONST * (tref / _TCRIT12) ** 2.334 / p_hPa
+        sc = visc / (density * diffusivity)
+        re = speed * density * D_WICK / visc
+        h = 0.281 * re**0.6 * PR**0.44 * (CP + 1.25 * R_AIR) * visc / D_WICK
+        f_atm = STEFANB * EMIS_WICK * (sky - twb_prev**4) + (1.0 - ALB_WICK) * solar * (
+            (1.0 - fdir) * (1.0 + 0.25 * D_WICK / L_WICK)
+            + fdir * (tan_zenith / math.pi + 0.25 * D_WICK / L_WICK)
+            + ALB_SFC
+        )
+        ewick = float(_esat(twb_prev))
+        evap = (313.15 - tref) / 30.0 * (-71100.0) + 2.4073e6
+        twb = ta - evap / RATIO * (ewick - e) / (p_hPa - ewick) * (PR / sc) ** 0.56 + f_atm / h
+        if abs(twb - twb_prev) < CONVERGENCE:
+            break
+        twb_prev = 0.9 * twb_prev + 0.1 * twb
+
+    return 0.7 * (twb - 273.15) + 0.2 * (tg - 273.15) + 0.1 * temp_c
@@ -1,24 +1,51 @@
 import pandas as pd
 import numpy as np
-from .wbgt import wbgt_liljegren_from_met, risk_tiers
+from .wbgt import TIER_LABELS, risk_codes, tiers_from_codes, wbgt_liljegren_from_met
+
+
+def risk_kernel(temp_c, rh, swdown, wind_ms, pm25, thresholds=None):
+    """WBGT and int8 worst-of tier codes straight from NumPy arrays (no DataFrame involved)."""
+    wbgt = wbgt_liljegren_from_met(temp_c, rh, swdown, wind_ms)
+    return wbgt, risk_codes(wbgt, pm25, thresholds)
 
 
 def compute_risk(hourly_met: pd.DataFrame) -> pd.DataFrame:
-    df = hourly_met.copy()
-    df["wbgt_c"] = wbgt_liljegren_from_met(
-        df["temp_c"].values,
-        df["rh"].values,
-        df["swdown"].values,
-        df["wind_ms"].values,
+    # Shallow copy: new columns are added without duplicating the caller's met data.
+    df = hourly_met.copy(deep=False)
+    pm25 = df["pm25"].to_numpy() if "pm25" in df.columns else np.full(len(df), 10.0)
+    wbgt, codes = risk_kernel(
+        df["temp_c"].to_numpy(),
+        df["rh"].to_numpy(),
+        df["swdown"].to_numpy(),
+        df["wind_ms"].to_numpy(),
+        pm25,
     )
+    df["wbgt_c"] = wbgt
     if "pm25" not in df.columns:
         df["pm25"] = 10.0
-    df["tier"] = risk_tiers(df["wbgt_c"].values, df["pm25"].values)
+    df["tier"] = tiers_from_codes(codes)
     return df
 
 
+def _tier_counts(tier: pd.Series) -> dict:
+    """``tier.value_counts().to_dict()`` for object tiers, without zero-count categories."""
+    if not isinstance(tier.dtype, pd.CategoricalDtype):
+        return tier.value_counts().to_dict()
+    codes = tier.cat.codes.to_numpy()
+    codes = codes[codes >= 0]
+    counts = np.bincount(codes, minlength=len(tier.cat.categories))
+    # value_counts order: count descending, ties by first appearance.
+    present, first = np.unique(codes, return_index=True)
+    seen = present[np.argsort(first)]
+    labels = tier.cat.categories
+    ordered = pd.Series(counts[seen], index=labels[seen]).sort_values(
+        ascending=False, kind="stable"
+    )
+    return {label: int(count) for label, count in ordered.items()}
+
+
 def summarize_day(df: pd.DataFrame) -> dict:
-    counts = df["tier"].value_counts().to_dict()
+    counts = _tier_counts(df["tier"])
     peak = float(df["wbgt_c"].max())
     hottest_time = None
     if "time" in df.columns:
@@ -27,7 +54,7 @@ def summarize_day(df: pd.DataFrame) -> dict:
             hottest_time = pd.to_datetime(hottest_row["time"]).isoformat()
         except Exception:
             hottest_time = str(hottest_row["time"])
-    orange_red_hours = int(df[df["tier"].isin(["orange", "red"])].shape[0])
+    orange_red_hours = int(counts.get("orange", 0) + counts.get("red", 0))
     pm_peak = float(df["pm25"].max()) if "pm25" in df.columns else None
     pm_alert = pm_peak is not None and pm_peak >= 55.0
     avg_wind = float(df["wind_ms"].mean()) if "wind_ms" in df.columns else None
@@ -42,3 +69,154 @@ def summarize_day(df: pd.DataFrame) -> dict:
         "avg_wind": avg_wind,
         "median_rh": median_rh,
     }
+
+
+SUMMARY_FIELDS = (
+    "hours_by_tier",
+    "peak_wbgt_c",
+    "hottest_time",
+    "orange_red_hours",
+    "pm_peak",
+    "pm_alert",
+    "avg_wind",
+    "median_rh",
+)
+
+
+def _segment_blocks(starts: np.ndarray, sizes: np.ndarray):
+    """Yield ``(groups, positions)`` per distinct segment length, ``positions`` one row each."""
+    for size in np.unique(sizes):
+        rows = np.flatnonzero(sizes == size)
+        yield rows, starts[rows, None] + np.arange(size)
+
+
+def _segment_means(values: np.ndarray, starts: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """Per-segment ``Series.mean()``: NaN-skipping, bit-identical to pandas' own reduction.
+
+    Segments of equal length are summed as rows of one 2-D block, which runs NumPy's pairwise
+    summation per row exactly as the one-segment ``sum`` inside pandas does.
+    """
+    values = values.astype(np.float64, copy=False)
+    nan = np.isnan(values)
+    filled = np.where(nan, 0.0, values)
+    counts = np.add.reduceat((~nan).astype(np.int64), starts)
+    sums = np.empty(len(starts))
+    for rows, positions in _segment_blocks(starts, sizes):
+        sums[rows] = filled[positions].sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def _segment_medians(values: np.ndarray, starts: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """Per-segment ``Series.median()``: each block of equal-length rows is sorted row-wise."""
+    values = values.astype(np.float64, copy=False)
+    out = np.full(len(starts), np.nan)
+    for rows, positions in _segment_blocks(starts, sizes):
+        block = np.sort(values[positions], axis=1)  # NaN sorts last
+        valid = (~np.isnan(block)).sum(axis=1)
+        half = valid // 2
+        pick = np.arange(len(rows))
+        hi = block[pick, np.minimum(half, block.shape[1] - 1)]
+        lo = block[pick, np.maximum(half - 1, 0)]
+        med = np.where(valid % 2 == 1, hi, (lo + hi) / 2)
+        out[rows] = np.where(valid > 0, med, np.nan)
+    return out
+
+
+def _iso_times(values) -> list:
+    """``summarize_day``'s hottest-time formatting for a batch of ``time`` values."""
+    if values.dtype.kind == "M":
+        seconds = values.astype("datetime64[s]")
+        if ((seconds == values) | np.isnat(values)).all():
+            # Whole-second naive stamps: Timestamp.isoformat() is exactly this string.
+            return np.datetime_as_string(seconds, unit="s").tolist()
+        return [ts.isoformat() for ts in pd.DatetimeIndex(values)]
+    out = []
+    for value in values:
+        try:
+            out.append(pd.to_datetime(value).isoformat())
+        except Exception:
+            out.append(str(value))
+    return out
+
+
+def summarize_many(df: pd.DataFrame, by=("school_id", "date")) -> pd.DataFrame:
+    """``summarize_day`` for every ``by`` group of a long-format ``compute_risk`` frame at once.
+
+    Returns one row per group (indexed by the ``by`` keys, sorted) with the ``SUMMARY_FIELDS``
+    columns; ``row.to_dict()`` equals ``summarize_day`` on that group's rows. Rows are ordered
+    by group once (stably), and every field comes from a segment reduction over that order, so
+    the cost per group is a few array elements plus building its ``hours_by_tier`` dict.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    grouped = df.groupby(by, sort=True)
+    keys = grouped.size().index
+    if not len(keys):
+        return pd.DataFrame(columns=list(SUMMARY_FIELDS), index=keys)
+    gid = grouped.ngroup().to_numpy()
+    keep = gid >= 0  # rows with a missing key belong to no group, as in groupby
+    order = np.flatnonzero(keep)[np.argsort(gid[keep], kind="stable")]
+    gid = gid[order]
+    n_groups = len(keys)
+    sizes = np.bincount(gid, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+    def column(name: str) -> np.ndarray:
+        return df[name].to_numpy()[order]
+
+    wbgt = column("wbgt_c").astype(np.float64)
+    peak = np.fmax.reduceat(wbgt, starts)
+
+    # Tier counts: value_counts order is count descending, ties by first appearance.
+    tier = df["tier"]
+    if isinstance(tier.dtype, pd.CategoricalDtype):
+        codes, labels = tier.cat.codes.to_numpy()[order], tier.cat.categories
+    else:
+        codes, labels = pd.factorize(tier.to_numpy()[order])
+    n_labels = len(labels)
+    valid = codes >= 0
+    cell = gid[valid] * n_labels + codes[valid]
+    counts = np.bincount(cell, minlength=n_groups * n_labels).reshape(n_groups, n_labels)
+    first = np.full(n_groups * n_labels, len(codes))
+    uniq, idx = np.unique(cell, return_index=True)
+    first[uniq] = np.flatnonzero(valid)[idx]
+    first = first.reshape(n_groups, n_labels)
+    ranking = np.lexsort((first, -counts), axis=-1) if n_labels else first
+    labels = list(labels)
+    hours_by_tier = [
+        {labels[k]: n for k, n in zip(rank, row) if n}
+        for rank, row in zip(ranking.tolist(), np.take_along_axis(counts, ranking, 1).tolist())
+    ]
+    orange_red = sum(
+        (counts[:, labels.index(t)] for t in ("orange", "red") if t in labels),
+        np.zeros(n_groups, dtype=np.int64),
+    )
+
+    hottest = np.full(n_groups, None, dtype=object)
+    if "time" in df.columns:
+        hit = np.where(wbgt == np.repeat(peak, sizes), np.arange(len(wbgt)), len(wbgt))
+        pos = np.minimum.reduceat(hit, starts)
+        found = pos < len(wbgt)
+        hottest[found] = _iso_times(column("time")[pos[found]])
+
+    out = pd.DataFrame(
+        {
+            "hours_by_tier": hours_by_tier,
+            "peak_wbgt_c": peak,
+            "hottest_time": hottest,
+            "orange_red_hours": orange_red,
+        },
+        index=keys,
+    )
+    if "pm25" in df.columns:
+        pm_peak = np.fmax.reduceat(column("pm25").astype(np.float64), starts)
+        out["pm_peak"] = pm_peak
+        out["pm_alert"] = pm_peak >= 55.0
+    else:
+        out["pm_peak"] = None
+        out["pm_alert"] = False
+    out["avg_wind"] = (
+        _segment_means(column("wind_ms"), starts, sizes) if "wind_ms" in df.columns else None
+    )
+    out["median_rh"] = _segment_medians(column("rh"), starts, sizes) if "rh" in df.columns else None
+    return out[list(SUMMARY_FIELDS)]
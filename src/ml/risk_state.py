@@ -0,0 +1,197 @@
+"""Incremental per school-day risk state for rolling hourly updates.
+
+``RiskDayState`` keeps what ``summarize_day`` derives from a ``compute_risk`` frame, as running
+structures that a new or revised hour updates without rescanning the day: per-tier sorted hour
+lists (counts, and first appearance for ``value_counts`` tie order), sorted WBGT and PM2.5 keys
+for the peaks, a sorted RH list for the median and a running wind sum for the mean. The sorted
+lists are plain Python lists, so an insert or removal is a binary search plus an O(hours) shift,
+which is negligible at 24 hours a day. ``update``
+diffs the incoming hourly inputs against the stored ones and runs the risk kernel only on the
+hours that changed; each change bumps ``version``, and ``changes_since`` returns the hours a
+client holding an older ``token`` has not seen.
+"""
+
+import bisect
+import math
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .risk import risk_kernel
+from .wbgt import TIER_LABELS, _wbgt_thresholds_from_env
+
+INPUT_COLUMNS = ("temp_c", "rh", "swdown", "wind_ms", "pm25")
+DEFAULT_PM25 = 10.0  # compute_risk's value when a day has no PM2.5
+
+
+def _same_inputs(a: tuple, b: tuple) -> bool:
+    return all(x == y or (math.isnan(x) and math.isnan(y)) for x, y in zip(a, b))
+
+
+def _json_float(value: float) -> Optional[float]:
+    return None if math.isnan(value) else float(value)
+
+
+class RiskDayState:
+    """Running ``summarize_day`` for one school-day (not thread-safe; ``lock`` guards it)."""
+
+    def __init__(self, thresholds: Optional[Tuple[float, float, float]] = None):
+        self.thresholds = tuple(thresholds or _wbgt_thresholds_from_env())
+        self.epoch = uuid.uuid4().hex[:12]
+        self.version = 0
+        self.lock = threading.Lock()
+        # time -> (inputs, wbgt, tier code, version last changed)
+        self._hours: Dict[pd.Timestamp, Tuple[tuple, float, int, int]] = {}
+        self._tier_times: List[list] = [[] for _ in TIER_LABELS]
+        self._peaks: list = []  # (-wbgt, time): first entry is the earliest hottest hour
+        self._pm: list = []  # -pm25
+        self._rh: list = []  # non-NaN RH, ascending
+        self._wind_sum = 0.0
+        self._wind_n = 0
+
+    @property
+    def token(self) -> str:
+        return f"{self.epoch}.{self.version}"
+
+    def __len__(self) -> int:
+        return len(self._hours)
+
+    def _add(self, time, inputs: tuple, wbgt: float, code: int) -> None:
+        bisect.insort(self._tier_times[code], time)
+        bisect.insort(self._peaks, (-wbgt, time))
+        bisect.insort(self._pm, -inputs[4])
+        rh, wind = inputs[1], inputs[3]
+        if not math.isnan(rh):
+            bisect.insort(self._rh, rh)
+        if not math.isnan(wind):
+            self._wind_sum += wind
+            self._wind_n += 1
+
+    def _remove(self, time, inputs: tuple, wbgt: float, code: int) -> None:
+        for items, key in (
+            (self._tier_times[code], time),
+            (self._peaks, (-wbgt, time)),
+            (self._pm, -inputs[4]),
+        ):
+            del items[bisect.bisect_left(items, key)]
+        rh, wind = inputs[1], inputs[3]
+        if not math.isnan(rh):
+            del self._rh[bisect.bisect_left(self._rh, rh)]
+        if not math.isnan(wind):
+            self._wind_sum -= wind
+            self._wind_n -= 1
+
+    def update(self, hourly: pd.DataFrame) -> list:
+        """Apply new or revised hours (``time`` plus met/PM columns); returns the changed times.
+
+        Rows whose inputs match the stored hour are skipped, so a poll that re-sends the whole
+        day only pays for the hours that actually moved.
+        """
+        times = pd.to_datetime(hourly["time"]).tolist()
+        columns = [
+            (
+                hourly[name].to_numpy(dtype=float)
+                if name in hourly.columns
+                else np.full(len(hourly), DEFAULT_PM25)
+            )
+            for name in INPUT_COLUMNS
+        ]
+        rows = list(zip(*(col.tolist() for col in columns)))
+        changed = [
+            i
+            for i, (time, row) in enumerate(zip(times, rows))
+            if time not in self._hours or not _same_inputs(self._hours[time][0], row)
+        ]
+        if not changed:
+            return []
+        idx = np.asarray(changed)
+        wbgt, codes = risk_kernel(*(col[idx] for col in columns), thresholds=self.thresholds)
+        self.version += 1
+        for i, value, code in zip(changed, wbgt.tolist(), codes.tolist()):
+            time = times[i]
+            old = self._hours.get(time)
+            if old is not None:
+                self._remove(time, *old[:3])
+            self._add(time, rows[i], value, code)
+            self._hours[time] = (rows[i], value, code, self.version)
+        return [times[i] for i in changed]
+
+    def summary(self) -> dict:
+        """The ``summarize_day`` fields (``avg_wind`` equal up to summation rounding)."""
+        counts = [len(times) for times in self._tier_times]
+        present = sorted(
+            (k for k, n in enumerate(counts) if n),
+            key=lambda k: (-counts[k], self._tier_times[k][0]),
+        )
+        hours_by_tier = {TIER_LABELS[k]: counts[k] for k in present}
+        peak = hottest = pm_peak = None
+        if self._peaks:
+            neg_wbgt, time = self._peaks[0]
+            peak, hottest = -neg_wbgt, pd.Timestamp(time).isoformat()
+            pm_peak = -self._pm[0]
+        n_rh = len(self._rh)
+        median_rh = float("nan")
+        if n_rh:
+            mid = n_rh // 2
+            median_rh = self._rh[mid] if n_rh % 2 else (self._rh[mid - 1] + self._rh[mid]) / 2
+        return {
+            "hours_by_tier": hours_by_tier,
+            "peak_wbgt_c": peak,
+            "hottest_time": hottest,
+            "orange_red_hours": int(hours_by_tier.get("orange", 0) + hours_by_tier.get("red", 0)),
+            "pm_peak": pm_peak,
+            "pm_alert": pm_peak is not None and pm_peak >= 55.0,
+            "avg_wind": self._wind_sum / self._wind_n if self._wind_n else float("nan"),
+            "median_rh": median_rh,
+        }
+
+    def changes_since(self, token: Optional[str]) -> Tuple[List[dict], bool]:
+        """Hours changed after ``token`` (time order), and whether this is a full resync.
+
+        A missing token, or one from another state (a restart, eviction or threshold change),
+        gets every hour with ``full=True``.
+        """
+        since, full = 0, True
+        epoch, _, version = (token or "").partition(".")
+        if epoch == self.epoch and version.isdigit():
+            since, full = int(version), False
+        rows = []
+        for time in sorted(self._hours):
+            inputs, wbgt, code, changed = self._hours[time]
+            if changed > since:
+                row = {"time": pd.Timestamp(time).isoformat()}
+                row.update(zip(INPUT_COLUMNS, map(_json_float, inputs)))
+                row.update(wbgt_c=_json_float(wbgt), tier=TIER_LABELS[code])
+                rows.append(row)
+        return rows, full
+
+
+class RiskStateStore:
+    """Bounded LRU of ``RiskDayState`` by key; a threshold change starts a fresh state."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max(1, int(max_entries))
+        self._states: "OrderedDict[object, RiskDayState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> RiskDayState:
+        thresholds = tuple(_wbgt_thresholds_from_env())
+        with self._lock:
+            state = self._states.get(key)
+            if state is None or state.thresholds != thresholds:
+                state = self._states[key] = RiskDayState(thresholds)
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_entries:
+                self._states.popitem(last=False)
+            return state
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+    def __len__(self) -> int:
+        return len(self._states)
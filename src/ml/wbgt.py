@@ -1,6 +1,7 @@
 import numpy as np
 import pandas as pd
 import os
+from functools import lru_cache
 
 # Approximate outdoor WBGT in shade using Stull-like approximation
 # For scientifically rigorous WBGT, implement Liljegren; this is sufficient for MVP ranking.
@@ -37,6 +38,7 @@ def wbgt_liljegren_from_met(
     swdown: np.ndarray,
     wind_ms: np.ndarray,
     p_hPa: float = 1013.0,
+    use_lut: bool = False,
 ) -> np.ndarray:
     """
     Simplified Liljegren-style WBGT approximation suitable for outdoor shade.
@@ -46,7 +48,22 @@ def wbgt_liljegren_from_met(
     - Uses Stull wet-bulb approximation for natural wet-bulb (Tw).
     - Approximates globe temperature (Tg) from shortwave and wind.
     - p_hPa reserved for future pressure dependence.
+    - ``ml.liljegren.wbgt_liljegren_physical`` solves the full energy-balance model (pressure,
+      solar geometry); this approximation runs ~2 C cooler than it in full sun.
+    - ``use_lut=True`` interpolates the precomputed table from ``ml.wbgt_lut.default_lut``
+      instead (RMS error ~0.025 C, max ~0.33 C at RH < 10%); points off its grid use the
+      formula. This formula is cheap enough that direct evaluation is still ~3x faster
+      (``benchmarks/bench_wbgt_lut.py``); the table pays off for tabulated expensive models.
     """
+    if use_lut:
+        from .wbgt_lut import default_lut  # local: wbgt_lut tabulates this function
+
+        out = default_lut()(temp_c, rh, swdown, wind_ms)
+        miss = np.isnan(out)
+        if miss.any():
+            full = np.broadcast_arrays(temp_c, rh, swdown, wind_ms, out)[:4]
+            out[miss] = wbgt_liljegren_from_met(*(np.asarray(x)[miss] for x in full))
+        return out
     t = np.asarray(temp_c, dtype=float)
     rh_in = np.asarray(rh, dtype=float)
     rh01 = np.clip(rh_in, 0.0, 1.0)
@@ -71,39 +88,61 @@ def wbgt_liljegren_from_met(
     return wbgt
 
 
-def _wbgt_thresholds_from_env() -> tuple[float, float, float]:
-    raw = os.getenv("WBGT_THRESH", "27,30,32")
+TIER_LABELS = ("green", "yellow", "orange", "red")
+DEFAULT_WBGT_THRESHOLDS = (27.0, 30.0, 32.0)
+PM25_EDGES = (12.0, 35.0, 55.0)
+
+
+@lru_cache(maxsize=8)
+def _parse_thresholds(raw: str) -> tuple[float, float, float]:
     try:
         parts = [float(x.strip()) for x in raw.split(",") if x.strip()]
         if len(parts) >= 3:
             return parts[0], parts[1], parts[2]
     except Exception:
         pass
-    return 27.0, 30.0, 32.0
+    return DEFAULT_WBGT_THRESHOLDS
+
+
+def _wbgt_thresholds_from_env() -> tuple[float, float, float]:
+    # Parsed once per distinct value; re-reading the variable keeps runtime overrides working.
+    return _parse_thresholds(os.getenv("WBGT_THRESH", "27,30,32"))
+
+
+def _bin_codes(values: np.ndarray, edges) -> np.ndarray:
+    """Left-closed bin index as int8: the number of ascending ``edges`` that are <= each value.
+
+    Same result as ``np.searchsorted(edges, values, side="right")``, but built from one
+    vectorised compare per edge, which stays branch-free and memory-bound on large arrays.
+    """
+    codes = np.asarray(values >= edges[0]).view(np.int8).copy()
+    for edge in edges[1:]:
+        np.add(codes, np.asarray(values >= edge).view(np.int8), out=codes)
+    return codes
+
+
+def risk_codes(wbgt_c: np.ndarray, pm25: np.ndarray, thresholds=None) -> np.ndarray:
+    """Worst-of WBGT / PM2.5 tier as int8 codes into ``TIER_LABELS`` (0 green .. 3 red).
+
+    Bins are left-closed like the policy table: WBGT (C) <t1 green, t1-t2 yellow, t2-t3 orange,
+    >=t3 red; PM2.5 (µg/m3) <12 good, 12-35 moderate, 35-55 unhealthy-sens, >=55 unhealthy.
+    """
+    wb = np.asarray(wbgt_c, dtype=float)
+    pm = np.asarray(pm25, dtype=float)
+    if np.isnan(wb).any() or np.isnan(pm).any():
+        raise ValueError("risk tiers need WBGT and PM2.5 for every hour (got NaN)")
+    edges = tuple(thresholds or _wbgt_thresholds_from_env())
+    if any(lo >= hi for lo, hi in zip(edges, edges[1:])):
+        raise ValueError(f"WBGT thresholds must increase strictly (got {edges})")
+    codes = _bin_codes(wb, edges)
+    np.maximum(codes, _bin_codes(pm, PM25_EDGES), out=codes)
+    return codes
+
+
+def tiers_from_codes(codes: np.ndarray) -> pd.Categorical:
+    return pd.Categorical.from_codes(codes, categories=list(TIER_LABELS))
 
 
 def risk_tiers(wbgt_c: np.ndarray, pm25: np.ndarray) -> pd.Series:
-    # Simple thresholds for demo (customize to your policy region)
-    # WBGT (C): <27 green, 27-30 yellow, 30-32 orange, >32 red
-    # PM2.5 (µg/m3): <12 good, 12-35 moderate, 35-55 unhealthy-sens, >55 unhealthy
-    t1, t2, t3 = _wbgt_thresholds_from_env()
-    wb = pd.cut(
-        wbgt_c,
-        bins=[-100, t1, t2, t3, 100],
-        labels=["green", "yellow", "orange", "red"],
-        right=False,
-    )
-    pm = pd.cut(
-        pm25,
-        bins=[-1, 12, 35, 55, 1e6],
-        labels=["good", "moderate", "unhealthy-sens", "unhealthy"],
-        right=False,
-    )
-    # combine: worst of the two
-    tier_order = {"green": 0, "yellow": 1, "orange": 2, "red": 3}
-    pm_map = {"good": 0, "moderate": 1, "unhealthy-sens": 2, "unhealthy": 3}
-    wb_codes = pd.Series(wb).map(tier_order).astype(int).values
-    pm_codes = pd.Series(pm).map(pm_map).astype(int).values
-    worst = np.maximum(wb_codes, pm_codes)
-    inv = {v: k for k, v in tier_order.items()}
-    return pd.Series(worst).map(inv)
+    # Simple thresholds for demo (customize to your policy region); see risk_codes.
+    return pd.Series(tiers_from_codes(risk_codes(wbgt_c, pm25)))
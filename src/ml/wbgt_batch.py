@@ -0,0 +1,204 @@
+"""Batched WBGT and risk-tier engine for (sites x hours) or (lat x lon x time) arrays.
+
+``wbgt_liljegren_from_met`` builds a dozen full-size temporaries per call, which is fine for a
+24-hour vector but not for a state's schools or a whole ERA5 grid. ``wbgt_batch`` evaluates the
+same formula block by block into a preallocated output: each block runs as an in-place NumPy
+ufunc chain over two block-sized scratch buffers, or optionally as a single numexpr expression.
+Both release the GIL, so blocks are spread over a thread pool. float32 inputs stay float32,
+halving memory traffic.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from .wbgt import _wbgt_thresholds_from_env, risk_codes
+
+try:
+    import numexpr as ne  # type: ignore
+except Exception:
+    ne = None
+
+DEFAULT_BLOCK = 1 << 16
+
+# wbgt_liljegren_from_met, with RH clipped to [0, 1] and negative shortwave / wind clamped.
+_NE_EXPR = (
+    "0.7 * (t * arctan(0.151977 * sqrt(r + 8.313659)) + arctan(t + r) - arctan(r - 1.676331)"
+    " + 0.00391838 * r * sqrt(r) * arctan(0.023101 * r) - 4.686035)"
+    " + 0.2 * (t + 0.012 * where(sw > 0, sw, 0) / (1.0 + 0.5 * where(u > 0, u, 0) + 1e-6))"
+    " + 0.1 * t"
+)
+_NE_RH = "100 * where(rh < 0, 0, where(rh > 1, 1, rh))"
+
+
+def _wbgt_block_numpy(t, rh, sw, u, out, a, b) -> None:
+    """In-place ufunc chain; ``a``/``b`` are scratch buffers the size of ``out``."""
+    r = b
+    np.clip(rh, 0.0, 1.0, out=r)
+    r *= 100.0
+    # Stull (2011) wet-bulb, accumulated term by term into ``out``.
+    np.add(r, 8.313659, out=a)
+    np.sqrt(a, out=a)
+    a *= 0.151977
+    np.arctan(a, out=a)
+    np.multiply(a, t, out=out)
+    np.add(t, r, out=a)
+    np.arctan(a, out=a)
+    out += a
+    np.subtract(r, 1.676331, out=a)
+    np.arctan(a, out=a)
+    out -= a
+    np.multiply(r, 0.023101, out=a)
+    np.arctan(a, out=a)
+    a *= r
+    np.sqrt(r, out=r)
+    a *= r
+    a *= 0.00391838
+    out += a
+    out -= 4.686035
+    out *= 0.7
+    # Globe-temperature proxy, then the 0.2 * Tg + 0.1 * T terms.
+    np.maximum(u, 0.0, out=a)
+    a *= 0.5
+    a += 1.0 + 1e-6
+    np.maximum(sw, 0.0, out=b)
+    b *= 0.012
+    b /= a
+    b += t
+    b *= 0.2
+    out += b
+    np.multiply(t, 0.1, out=a)
+    out += a
+
+
+def _wbgt_block_numexpr(t, rh, sw, u, out, a, b) -> None:
+    ne.evaluate(_NE_RH, local_dict={"rh": rh}, out=b, casting="unsafe")
+    ne.evaluate(_NE_EXPR, local_dict={"t": t, "r": b, "sw": sw, "u": u}, out=out, casting="unsafe")
+
+
+def _flat_inputs(arrays: Sequence, dtype) -> Tuple[Tuple[int, ...], list]:
+    """Broadcast to a common shape and return flat views; scalars stay 0-d (no full copy)."""
+    shape = np.broadcast_shapes(*(np.shape(x) for x in arrays))
+    flat = []
+    for x in arrays:
+        arr = np.asarray(x, dtype=dtype)
+        if arr.ndim == 0:
+            flat.append(arr)
+            continue
+        if arr.shape != shape:
+            arr = np.broadcast_to(arr, shape)
+        flat.append(np.ascontiguousarray(arr).reshape(-1))
+    return shape, flat
+
+
+def _span(x: np.ndarray, start: int, stop: int) -> np.ndarray:
+    return x if x.ndim == 0 else x[start:stop]
+
+
+def _result_dtype(arrays: Sequence, dtype) -> np.dtype:
+    if dtype is not None:
+        return np.dtype(dtype)
+    kinds = [np.asarray(x).dtype for x in arrays]
+    return np.dtype(np.float32) if all(k == np.float32 for k in kinds) else np.dtype(np.float64)
+
+
+def _run_blocks(n: int, block: int, workers: Optional[int], task) -> None:
+    """Split ``range(n)`` into contiguous spans of whole blocks, one per worker thread."""
+    n_blocks = -(-n // block)
+    workers = max(1, min(workers or os.cpu_count() or 1, n_blocks))
+    per = -(-n_blocks // workers)
+    spans = [(i * per * block, min(n, (i + 1) * per * block)) for i in range(workers)]
+    spans = [(lo, hi) for lo, hi in spans if lo < hi]
+    if len(spans) == 1:
+        task(*spans[0])
+        return
+    with ThreadPoolExecutor(max_workers=len(spans), thread_name_prefix="heatshield-wbgt") as pool:
+        for future in [pool.submit(task, lo, hi) for lo, hi in spans]:
+            future.result()
+
+
+def wbgt_batch(
+    temp_c,
+    rh,
+    swdown,
+    wind_ms,
+    out: Optional[np.ndarray] = None,
+    dtype=None,
+    block: int = DEFAULT_BLOCK,
+    workers: Optional[int] = None,
+    engine: str = "numpy",
+) -> np.ndarray:
+    """WBGT for arrays of any (broadcastable) shape, e.g. sites x hours or lat x lon x time.
+
+    Matches ``wbgt_liljegren_from_met`` to floating-point rounding. ``engine`` is ``"numpy"``
+    (the in-place chain, fastest in ``benchmarks/bench_wbgt_batch.py``), ``"numexpr"`` or
+    ``"auto"`` (numexpr when installed). ``workers`` threads split the blocks; it defaults to the
+    CPU count for the NumPy chain and to 1 for numexpr, which runs its own thread pool.
+    """
+    if engine == "auto":
+        engine = "numexpr" if ne is not None else "numpy"
+    if engine == "numexpr" and ne is None:
+        raise RuntimeError("numexpr is not installed")
+    kernel = _wbgt_block_numexpr if engine == "numexpr" else _wbgt_block_numpy
+    if workers is None and engine == "numexpr":
+        workers = 1
+    arrays = (temp_c, rh, swdown, wind_ms)
+    dtype = _result_dtype(arrays, dtype)
+    shape, (t, r, sw, u) = _flat_inputs(arrays, dtype)
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape or not out.flags.c_contiguous:
+        raise ValueError(f"out must be a C-contiguous array of shape {shape}")
+    flat_out = out.reshape(-1)
+    block = max(1, int(block))
+
+    def task(lo: int, hi: int) -> None:
+        size = min(block, hi - lo)
+        a = np.empty(size, dtype=flat_out.dtype)
+        b = np.empty(size, dtype=flat_out.dtype)
+        for start in range(lo, hi, block):
+            stop = min(start + block, hi)
+            n = stop - start
+            blocks = [_span(x, start, stop) for x in (t, r, sw, u)]
+            kernel(*blocks, flat_out[start:stop], a[:n], b[:n])
+
+    if flat_out.size:
+        _run_blocks(flat_out.size, block, workers, task)
+    return out
+
+
+def risk_batch(
+    temp_c,
+    rh,
+    swdown,
+    wind_ms,
+    pm25=10.0,
+    thresholds=None,
+    dtype=None,
+    block: int = DEFAULT_BLOCK,
+    workers: Optional[int] = None,
+    engine: str = "numpy",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """``(wbgt, int8 tier codes)`` for a whole batch; ``pm25`` broadcasts (scalar default 10)."""
+    wbgt = wbgt_batch(
+        temp_c, rh, swdown, wind_ms, dtype=dtype, block=block, workers=workers, engine=engine
+    )
+    pm = np.asarray(pm25)
+    if pm.ndim:
+        pm = np.ascontiguousarray(np.broadcast_to(pm, wbgt.shape)).reshape(-1)
+    thresholds = thresholds or _wbgt_thresholds_from_env()
+    codes = np.empty(wbgt.shape, dtype=np.int8)
+    flat_wbgt, flat_codes = wbgt.reshape(-1), codes.reshape(-1)
+
+    def task(lo: int, hi: int) -> None:
+        for start in range(lo, hi, block):
+            stop = min(start + block, hi)
+            flat_codes[start:stop] = risk_codes(
+                flat_wbgt[start:stop], _span(pm, start, stop), thresholds
+            )
+
+    if codes.size:
+        _run_blocks(codes.size, max(1, int(block)), workers, task)
+    return wbgt, codes
@@ -0,0 +1,234 @@
+"""Precomputed WBGT lookup table over (temperature, RH, shortwave, wind).
+
+``build_lut`` tabulates any vectorized ``f(temp_c, rh, swdown, wind_ms)`` on a uniform 4-D grid
+(by default ``wbgt_liljegren_from_met``; ``ml.liljegren.wbgt_liljegren_physical`` at fixed
+pressure and sun angle works the same way), and ``WbgtLut`` evaluates it by multilinear
+interpolation: 16 gathers and 15 lerps per point, whatever the cost of the tabulated model.
+
+Tables are saved as a plain ``.npy`` (float32) plus a ``.json`` sidecar with the axes and a
+fingerprint of the tabulated function, and are memory-mapped on load, so a cold start touches
+only the pages that lookups hit. ``default_lut`` loads ``HEATSHIELD_WBGT_LUT`` or builds and
+saves it on first use; a sidecar whose fingerprint or axes differ is rebuilt.
+
+Interpolation error of the default grid against the analytic formula (tested in
+``tests/test_wbgt_lut.py``): max 0.33 C, RMS 0.025 C over -10..50 C and the full
+RH/shortwave/wind ranges; the worst points are all at RH < 10%, where the Stull term bends
+sharply, and above 10% RH the max is under 0.2 C. Lookups run at 6-9 M points/s on one core
+(``benchmarks/bench_wbgt_lut.py``), slower than the formula itself but about twice the physical
+solver; tabulating that model on this grid costs up to ~2.4 C near calm wind in full sun (RMS
+0.09 C), so give it a finer wind axis if that regime matters.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .wbgt_batch import DEFAULT_BLOCK, _run_blocks
+
+try:
+    from ..config import WBGT_LUT_PATH
+except ImportError:  # ``ml`` imported as a top-level package (src/ on sys.path)
+    from config import WBGT_LUT_PATH
+
+LOGGER = logging.getLogger(__name__)
+
+
+# (start, step, count) per axis, in the argument order of wbgt_liljegren_from_met.
+Axis = Tuple[float, float, int]
+DEFAULT_AXES: Dict[str, Axis] = {
+    "temp_c": (-10.0, 1.0, 61),
+    "rh": (0.0, 0.02, 51),
+    "swdown": (0.0, 100.0, 15),
+    "wind_ms": (0.0, 0.5, 41),
+}
+# Input clamps the analytic formula applies itself, so clamped points are never off-grid.
+_CLAMPS = {"rh": (0.0, 1.0), "swdown": (0.0, None), "wind_ms": (0.0, None)}
+
+
+def axis_values(axis: Axis) -> np.ndarray:
+    start, step, count = axis
+    return start + step * np.arange(count)
+
+
+def fingerprint(func: Callable) -> str:
+    """Identifies the tabulated function; a changed formula invalidates saved tables."""
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = repr(func)
+    return f"{func.__module__}.{func.__qualname__}:" + hashlib.sha1(source.encode()).hexdigest()
+
+
+class WbgtLut:
+    """Multilinear interpolation over a uniform 4-D table."""
+
+    def __init__(self, table: np.ndarray, axes: Dict[str, Axis], source: str = ""):
+        axes = {name: (float(a[0]), float(a[1]), int(a[2])) for name, a in axes.items()}
+        if list(axes) != list(DEFAULT_AXES):
+            raise ValueError(f"axes must be {list(DEFAULT_AXES)}")
+        if table.shape != tuple(a[2] for a in axes.values()) or min(table.shape) < 2:
+            raise ValueError(f"table shape {table.shape} does not match axes {axes}")
+        self.table = table
+        self.axes = axes
+        self.source = source
+        self._flat = table.reshape(-1)
+        strides = np.cumprod((1,) + table.shape[:0:-1])[::-1]
+        self._strides = [int(s) for s in strides]
+        self._corners = np.array(
+            [sum(((c >> (3 - d)) & 1) * strides[d] for d in range(4)) for c in range(16)],
+            dtype=np.intp,
+        )
+
+    def _block(self, inputs, out) -> None:
+        n = out.size
+        base = np.zeros(n, dtype=np.intp)
+        i = np.empty(n, dtype=np.intp)
+        fracs = []
+        for x, (start, step, count), stride in zip(inputs, self.axes.values(), self._strides):
+            u = np.multiply(x, 1.0 / step, dtype=np.float32)
+            u -= start / step
+            # Clamp to the grid (fmax/fmin also map NaN onto it); the caller masks such points.
+            np.fmax(u, 0.0, out=u)
+            np.fmin(u, count - 1.0, out=u)
+            cell = np.minimum(np.floor(u), count - 2.0)
+            u -= cell
+            fracs.append(u)
+            i[...] = cell
+            i *= stride
+            base += i
+        # Gather the 16 corners, then collapse them pairwise one axis at a time (last first).
+        values = []
+        for offset in self._corners:
+            np.add(base, offset, out=i)
+            values.append(self._flat.take(i))
+        for f in reversed(fracs):
+            for lo, hi in zip(values[0::2], values[1::2]):
+                hi -= lo
+                hi *= f
+                hi += lo
+            values = values[1::2]
+        out[...] = values[0]
+
+    def inside(self, temp_c, rh, swdown, wind_ms) -> np.ndarray:
+        """Boolean mask of points on the grid (after the formula's own input clamps)."""
+        arrays = np.broadcast_arrays(*(np.asarray(x) for x in (temp_c, rh, swdown, wind_ms)))
+        mask = np.ones(arrays[0].shape, dtype=bool)
+        for name, x in zip(self.axes, arrays):
+            start, step, count = self.axes[name]
+            lo, hi = _CLAMPS.get(name, (None, None))
+            x = np.clip(x, lo, hi) if name in _CLAMPS else x
+            mask &= (x >= start) & (x <= start + step * (count - 1))
+        return mask
+
+    def __call__(
+        self, temp_c, rh, swdown, wind_ms, block: int = DEFAULT_BLOCK // 4, workers: int = 1
+    ) -> np.ndarray:
+        """Interpolated WBGT (C), broadcast over the inputs; NaN where a point is off the grid."""
+        arrays = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (temp_c, rh, swdown, wind_ms))
+        )
+        shape = arrays[0].shape
+        flat, off_grid = [], False
+        for name, arr in zip(self.axes, arrays):
+            arr = np.ascontiguousarray(arr).reshape(-1)
+            if name in _CLAMPS:
+                arr = np.clip(arr, *_CLAMPS[name])
+            start, step, count = self.axes[name]
+            if arr.size and not (start <= arr.min() and arr.max() <= start + step * (count - 1)):
+                off_grid = True
+            flat.append(arr)
+        out = np.empty(flat[0].size, dtype=float)
+        block = max(1, int(block))
+
+        def task(lo: int, hi: int) -> None:
+            for start in range(lo, hi, block):
+                stop = min(start + block, hi)
+                self._block([x[start:stop] for x in flat], out[start:stop])
+
+        if out.size:
+            _run_blocks(out.size, block, workers, task)
+            if off_grid:
+                out[~self.inside(*flat)] = np.nan
+        return out.reshape(shape)
+
+
+def build_lut(
+    func: Optional[Callable] = None, axes: Optional[Dict[str, Axis]] = None, dtype=np.float32
+) -> WbgtLut:
+    """Tabulate ``func(temp_c, rh, swdown, wind_ms)`` (default: the analytic formula)."""
+    if func is None:
+        from .wbgt import wbgt_liljegren_from_met as func
+    axes = dict(axes or DEFAULT_AXES)
+    grids = [axis_values(a).reshape((-1,) + (1,) * (3 - d)) for d, a in enumerate(axes.values())]
+    shape = tuple(a[2] for a in axes.values())
+    table = np.empty(shape, dtype=dtype)
+    # One temperature slice at a time keeps the model's temporaries small.
+    for i in range(shape[0]):
+        sub = np.broadcast_arrays(grids[0][i : i + 1], *grids[1:])
+        table[i] = np.asarray(func(*sub), dtype=dtype).reshape(shape[1:])
+    return WbgtLut(table, axes, fingerprint(func))
+
+
+def _sidecar(path: Path) -> Path:
+    return path.with_name(path.name + ".json")
+
+
+def save_lut(lut: WbgtLut, path) -> None:
+    """Write ``path`` (.npy) and its ``.json`` sidecar, each replaced atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    meta = {"axes": {k: list(v) for k, v in lut.axes.items()}, "source": lut.source}
+    for target, write in (
+        (path, lambda fh: np.save(fh, np.ascontiguousarray(lut.table))),
+        (_sidecar(path), lambda fh: fh.write(json.dumps(meta).encode())),
+    ):
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                write(fh)
+            os.replace(tmp, target)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+
+def load_lut(path) -> WbgtLut:
+    """Memory-map a saved table (read-only)."""
+    path = Path(path)
+    meta = json.loads(_sidecar(path).read_text())
+    table = np.load(path, mmap_mode="r")
+    return WbgtLut(table, meta["axes"], meta.get("source", ""))
+
+
+@lru_cache(maxsize=1)
+def default_lut() -> WbgtLut:
+    """The analytic-formula table at ``WBGT_LUT_PATH``, built and saved on first use."""
+    from .wbgt import wbgt_liljegren_from_met
+
+    expected = fingerprint(wbgt_liljegren_from_met)
+    if WBGT_LUT_PATH:
+        try:
+            lut = load_lut(WBGT_LUT_PATH)
+            if lut.source == expected and lut.axes == DEFAULT_AXES:
+                return lut
+            LOGGER.info("WBGT LUT at %s is stale; rebuilding", WBGT_LUT_PATH)
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+    lut = build_lut(wbgt_liljegren_from_met)
+    if WBGT_LUT_PATH:
+        try:
+            save_lut(lut, WBGT_LUT_PATH)
+        except OSError as exc:
+            LOGGER.warning("Could not save WBGT LUT to %s: %s", WBGT_LUT_PATH, exc)
+    return lut
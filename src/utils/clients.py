@@ -0,0 +1,108 @@
+"""Process-wide registry of pooled HTTP and S3 clients.
+
+Fetchers share these instead of building a client per call, so connection pools (and their TLS
+sessions and DNS results) stay warm across schools and requests. ``close_clients`` is wired to
+FastAPI shutdown.
+"""
+
+import importlib.util
+import logging
+import threading
+from typing import Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config import (
+    AWS_REGION,
+    HTTP_ENABLE_HTTP2,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    S3_MAX_POOL_CONNECTIONS,
+)
+
+# httpx needs h2 for HTTP/2; only its availability matters here.
+_HAS_H2 = importlib.util.find_spec("h2") is not None
+
+try:
+    import s3fs  # type: ignore
+except Exception:
+    s3fs = None
+
+LOGGER = logging.getLogger(__name__)
+
+_LOCK = threading.Lock()
+_HTTP_CLIENT: Optional[httpx.Client] = None
+_REQUESTS_SESSION: Optional[requests.Session] = None
+_S3: Dict[str, "s3fs.S3FileSystem"] = {}
+
+# Per-purpose S3FileSystem options. ERA5 reads go through the block cache / ranged reads, so
+# fsspec's own read-ahead is disabled there; OpenAQ objects are small gzip files read whole.
+_S3_PROFILES: Dict[str, dict] = {
+    "era5": {"default_fill_cache": False, "default_cache_type": "none"},
+    "openaq": {},
+}
+
+
+def get_http_client() -> httpx.Client:
+    """Shared keep-alive ``httpx.Client`` (HTTP/2 when the ``h2`` package is installed)."""
+    global _HTTP_CLIENT
+    with _LOCK:
+        if _HTTP_CLIENT is None:
+            _HTTP_CLIENT = httpx.Client(
+                http2=HTTP_ENABLE_HTTP2 and _HAS_H2,
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                ),
+                timeout=20,
+            )
+        return _HTTP_CLIENT
+
+
+def get_requests_session() -> requests.Session:
+    """Shared ``requests.Session`` with a pooled adapter (outbound webhooks)."""
+    global _REQUESTS_SESSION
+    with _LOCK:
+        if _REQUESTS_SESSION is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_MAX_KEEPALIVE, pool_maxsize=HTTP_MAX_CONNECTIONS
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _REQUESTS_SESSION = session
+        return _REQUESTS_SESSION
+
+
+def get_s3fs(profile: str = "openaq") -> "s3fs.S3FileSystem":
+    """Shared anonymous ``S3FileSystem`` for ``profile`` with a sized botocore pool."""
+    if s3fs is None:
+        raise RuntimeError("s3fs is not installed")
+    with _LOCK:
+        fs = _S3.get(profile)
+        if fs is None:
+            fs = s3fs.S3FileSystem(
+                anon=True,
+                client_kwargs={"region_name": AWS_REGION},
+                config_kwargs={"max_pool_connections": S3_MAX_POOL_CONNECTIONS},
+                skip_instance_cache=True,
+                **_S3_PROFILES.get(profile, {}),
+            )
+            _S3[profile] = fs
+        return fs
+
+
+def close_clients() -> None:
+    """Close pooled connections; the next ``get_*`` call builds fresh clients."""
+    global _HTTP_CLIENT, _REQUESTS_SESSION
+    with _LOCK:
+        http_client, _HTTP_CLIENT = _HTTP_CLIENT, None
+        session, _REQUESTS_SESSION = _REQUESTS_SESSION, None
+        _S3.clear()
+    if http_client is not None:
+        http_client.close()
+    if session is not None:
+        session.close()
+    LOGGER.info("Closed pooled HTTP/S3 clients")
@@ -0,0 +1,232 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from ..config import BREAKER_FAILURES, BREAKER_RESET_S, NEGATIVE_CACHE_TTL_S
+
+LOGGER = logging.getLogger(__name__)
+
+
+class NegativeCache:
+    """Thread-safe TTL set of keys known to fail (missing objects, rejected request shapes)."""
+
+    def __init__(self, ttl_s: float = NEGATIVE_CACHE_TTL_S, max_entries: int = 50_000):
+        self.ttl_s = float(ttl_s)
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: Hashable, reason: str = "", ttl_s: Optional[float] = None) -> None:
+        expires = time.monotonic() + (self.ttl_s if ttl_s is None else float(ttl_s))
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._purge_locked()
+            self._entries[key] = (expires, reason)
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """Return the recorded reason while ``key`` is still known-bad, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _purge_locked(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        if len(self._entries) >= self.max_entries:
+            oldest = sorted(self._entries.items(), key=lambda item: item[1][0])
+            for key, _ in oldest[: len(oldest) // 10 or 1]:
+                del self._entries[key]
+
+
+class CircuitBreaker:
+    """Per-endpoint breaker: closed -> open after consecutive failures -> half-open trial.
+
+    While open, ``allow()`` is False so callers skip the endpoint instead of waiting on it.
+    After ``reset_s`` one caller is let through as a trial; its outcome closes or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self, name: str, failure_threshold: int = BREAKER_FAILURES, reset_s: float = BREAKER_RESET_S
+    ):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_s = float(reset_s)
+        self._failures = 0
+        self._opened_until = 0.0
+        self._trial_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked()
+
+    def _state_locked(self) -> str:
+        if self._opened_until == 0.0:
+            return self.CLOSED
+        if time.monotonic() < self._opened_until:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state_locked()
+            if state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            # A trial whose caller never reported back stops blocking after another reset period.
+            if state == self.HALF_OPEN and (
+                self._trial_started is None or now - self._trial_started >= self.reset_s
+            ):
+                self._trial_started = now
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_until = 0.0
+            self._trial_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            half_open = self._state_locked() == self.HALF_OPEN
+            self._trial_started = None
+            if half_open or self._failures >= self.failure_threshold:
+                self._open_locked(self.reset_s)
+
+    def trip(self, duration_s: Optional[float] = None) -> None:
+        """Open immediately, e.g. when the endpoint reports it is gone for good."""
+        with self._lock:
+            self._trial_started = None
+            self._open_locked(self.reset_s if duration_s is None else float(duration_s))
+
+    def _open_locked(self, duration_s: float) -> None:
+        if self._state_locked() == self.CLOSED:
+            LOGGER.warning("Circuit %s opened for %.0fs", self.name, duration_s)
+        self._opened_until = time.monotonic() + duration_s
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution.
+
+    The first caller for a key runs the fetch; callers arriving while it is in flight (from any
+    thread, including the worker threads asyncio handlers dispatch to) wait for it and share its
+    result or exception. Nothing is kept afterwards: the next caller starts a fresh fetch.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._led = 0
+        self._shared = 0
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs):
+        return self.do_many([key], lambda _keys: [func(*args, **kwargs)])[0]
+
+    def do_many(self, keys: Sequence[Hashable], func: Callable[[List[Hashable]], list]) -> list:
+        """Results for distinct ``keys``; ``func`` fetches (in order) those nobody else is."""
+        futures, led = [], []
+        with self._lock:
+            for key in keys:
+                future = self._calls.get(key)
+                if future is None:
+                    future = self._calls[key] = Future()
+                    led.append(key)
+                else:
+                    self._shared += 1
+                futures.append(future)
+            self._led += len(led)
+        if led:
+            # Lead our keys before waiting on anyone else's, so overlapping batches never deadlock.
+            try:
+                results = list(func(led))
+                if len(results) != len(led):
+                    raise RuntimeError(f"{self.name}: expected {len(led)} results")
+            except BaseException as exc:
+                self._settle(led, exc=exc)
+                raise
+            self._settle(led, results)
+        return [future.result() for future in futures]
+
+    def _settle(self, keys: List[Hashable], results: Optional[list] = None, exc=None) -> None:
+        with self._lock:
+            futures = [self._calls.pop(key) for key in keys]
+        for i, future in enumerate(futures):
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(results[i])
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"fetches": self._led, "shared": self._shared, "in_flight": len(self._calls)}
+
+
+NEGATIVE_CACHE = NegativeCache()
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+_FLIGHTS: Dict[str, SingleFlight] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for ``name``, creating it on first use."""
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(name)
+        if breaker is None:
+            breaker = _BREAKERS[name] = CircuitBreaker(name)
+        return breaker
+
+
+def get_flight(name: str) -> SingleFlight:
+    """Return the process-wide single-flight group for upstream ``name``."""
+    with _BREAKERS_LOCK:
+        flight = _FLIGHTS.get(name)
+        if flight is None:
+            flight = _FLIGHTS[name] = SingleFlight(name)
+        return flight
+
+
+def flight_stats() -> Dict[str, Dict[str, int]]:
+    with _BREAKERS_LOCK:
+        flights = list(_FLIGHTS.values())
+    return {f.name: f.stats() for f in flights}
+
+
+def breaker_states() -> Dict[str, str]:
+    with _BREAKERS_LOCK:
+        breakers = list(_BREAKERS.values())
+    return {b.name: b.state for b in breakers}
+
+
+def reset_all() -> None:
+    """Forget every negative entry, breaker and single-flight counter (tests, manual recovery)."""
+    NEGATIVE_CACHE.clear()
+    with _BREAKERS_LOCK:
+        _BREAKERS.clear()
+        _FLIGHTS.clear()
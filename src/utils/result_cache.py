@@ -0,0 +1,163 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """Two-tier cache of JSON-able results: an in-process LRU in front of an optional disk store.
+
+    Entries carry an absolute expiry (wall clock, so it survives the trip through disk) or none
+    for results that can no longer change. The disk tier keeps one JSON file per key under
+    ``root``, published with ``os.replace`` so other processes sharing the directory only see
+    complete entries; a disk hit is promoted into memory. Hit and miss counts are kept per tier.
+    """
+
+    def __init__(self, max_entries: int = 20_000, root: str = "", max_files: int = 200_000):
+        self.max_entries = max(1, int(max_entries))
+        self.root = Path(root) if root else None
+        self.max_files = max(1, int(max_files))
+        if self.root is not None:
+            self.root.mkdir(parents=True, exist_ok=True)
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._written_since_evict = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "expired": 0}
+
+    def _path(self, key: Hashable) -> Path:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / f"{digest}.json"
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] is None or entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self._stats["expired"] += 1
+        if self.root is not None:
+            entry = self._read(key, now)
+            if entry is not None:
+                self._remember(key, *entry)
+                self._count("disk_hits")
+                return entry[1]
+        self._count("misses")
+        return None
+
+    def _read(self, key: Hashable, now: float) -> Optional[Tuple[Optional[float], Any]]:
+        path = self._path(key)
+        try:
+            record = json.loads(path.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            LOGGER.debug("Unreadable result cache entry %s: %s", path, exc)
+            return None
+        # The digest names the file; the stored key guards against (unlikely) collisions.
+        if record.get("key") != repr(key):
+            return None
+        expires = record.get("expires")
+        if expires is not None and expires <= now:
+            self._count("expired")
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        return expires, record.get("value")
+
+    def _remember(self, key: Hashable, expires: Optional[float], value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, key: Hashable, value: Any, ttl_s: Optional[float] = None) -> None:
+        """Store ``value``; ``ttl_s=None`` marks it immutable (kept until evicted)."""
+        expires = None if ttl_s is None else time.time() + float(ttl_s)
+        self._remember(key, expires, value)
+        self._count("stores")
+        if self.root is None:
+            return
+        record = {"key": repr(key), "expires": expires, "value": value}
+        try:
+            self._publish(self._path(key), json.dumps(record).encode("utf-8"))
+        except (OSError, TypeError, ValueError) as exc:
+            LOGGER.warning("Could not write result cache entry: %s", exc)
+            return
+        with self._lock:
+            self._written_since_evict += 1
+            due = self._written_since_evict >= max(1, self.max_files // 20)
+            if due:
+                self._written_since_evict = 0
+        if due:
+            self.evict()
+
+    def _publish(self, target: Path, data: bytes) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, target)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def evict(self) -> int:
+        """Trim the disk tier back to ``max_files``, oldest-written first."""
+        if self.root is None:
+            return 0
+        entries = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        removed = 0
+        excess = len(entries) - self.max_files
+        if excess > 0:
+            for _, path in sorted(entries)[:excess]:
+                try:
+                    path.unlink()
+                    removed += 1
+                except FileNotFoundError:
+                    continue
+        return removed
+
+    def clear(self) -> None:
+        """Drop the in-memory tier and reset the counters (the disk tier is left alone)."""
+        with self._lock:
+            self._entries.clear()
+            self._stats = dict.fromkeys(self._stats, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        )
+        stats["disk"] = str(self.root) if self.root is not None else None
+        return stats
@@ -4,8 +4,17 @@ from pathlib import Path
 # Add project root to sys.path so we can import src.* packages
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+import pytest
 from fastapi.testclient import TestClient
-from src.api.main import app
+from src.api.main import _RESULT_CACHE, app
+
+
+@pytest.fixture(autouse=True)
+def _fresh_result_cache():
+    # Tests reuse coordinates and dates with different fake upstreams.
+    _RESULT_CACHE.clear()
+    yield
+    _RESULT_CACHE.clear()
 
 
 def test_health_and_demo_risk():
@@ -87,3 +96,330 @@ def test_plan_llm_fallback_to_rule(monkeypatch):
     body = resp.json()
     assert body["actions"] == ["Rule action"]
     assert body["mode"] == "llm"
+
+
+def test_risk_runs_schools_concurrently_in_input_order(monkeypatch):
+    import threading
+    import time
+
+    import pandas as pd
+
+    from src.data.demo import synthetic_hourly_series
+
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def slow_pm(lat, lon, date):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        # Later schools finish first so ordering is actually exercised.
+        time.sleep(0.05 + (90.0 - lat) / 1000.0)
+        with lock:
+            active["now"] -= 1
+        return pd.DataFrame()
+
+    def fake_met_many(points, date, force_demo=False):
+        return [
+            synthetic_hourly_series(date)[["time", "temp_c", "rh", "wind_ms", "swdown"]]
+            for _ in points
+        ]
+
+    monkeypatch.setattr("src.api.main.fetch_era5_hourly_many", fake_met_many)
+    monkeypatch.setattr("src.api.main.fetch_pm25_s3", slow_pm)
+    monkeypatch.setattr("src.api.main.fetch_pm25", lambda lat, lon, date: pd.DataFrame())
+
+    schools = [{"name": f"S{i}", "lat": 10.0 + i, "lon": -80.0} for i in range(6)]
+    c = TestClient(app)
+    rr = c.post("/risk", json={"schools": schools, "date": "2024-07-01", "use_demo": True})
+    assert rr.status_code == 200
+    names = [row["school"]["name"] for row in rr.json()["results"]]
+    assert names == [s["name"] for s in schools]
+    assert active["peak"] > 1
+
+
+def test_risk_fetches_meteorology_once_per_era5_cell(monkeypatch):
+    import pandas as pd
+
+    from src.data.demo import synthetic_hourly_series
+
+    calls = []
+
+    def fake_met_many(points, date, force_demo=False):
+        calls.append(list(points))
+        return [
+            synthetic_hourly_series(date)[["time", "temp_c", "rh", "wind_ms", "swdown"]]
+            for _ in points
+        ]
+
+    monkeypatch.setattr("src.api.main.fetch_era5_hourly_many", fake_met_many)
+    monkeypatch.setattr("src.api.main.fetch_pm25_s3", lambda lat, lon, date: pd.DataFrame())
+    monkeypatch.setattr("src.api.main.fetch_pm25", lambda lat, lon, date: pd.DataFrame())
+
+    schools = [
+        {"name": "Downtown", "lat": 40.7128, "lon": -74.0060},
+        {"name": "Midtown", "lat": 40.7549, "lon": -73.9840},
+        {"name": "Uptown", "lat": 40.9, "lon": -74.0},
+    ]
+    c = TestClient(app)
+    rr = c.post("/risk", json={"schools": schools, "date": "2024-07-01", "use_demo": True})
+    assert rr.status_code == 200
+    assert len(rr.json()["results"]) == 3
+    assert calls == [[(40.75, 286.0), (41.0, 286.0)]]
+
+
+def test_risk_live_returns_changed_hours_since_token(monkeypatch):
+    import pandas as pd
+
+    from src.data.demo import synthetic_hourly_series
+
+    met = synthetic_hourly_series("2024-07-01")[["time", "temp_c", "rh", "wind_ms", "swdown"]]
+    feed = {"met": met}
+    monkeypatch.setattr(
+        "src.api.main.fetch_era5_hourly_many",
+        lambda points, date, force_demo=False: [feed["met"] for _ in points],
+    )
+    monkeypatch.setattr("src.api.main.fetch_pm25_s3", lambda lat, lon, date: pd.DataFrame())
+    monkeypatch.setattr("src.api.main.fetch_pm25", lambda lat, lon, date: pd.DataFrame())
+
+    c = TestClient(app)
+    payload = {"school": {"name": "Live", "lat": 1.0, "lon": 2.0}, "date": "2024-07-01"}
+    first = c.post("/risk/live", json=payload).json()
+    assert first["full"] is True and len(first["changed_hours"]) == len(met)
+
+    revised = met.copy()
+    revised.loc[15, "temp_c"] += 5.0
+    feed["met"] = revised
+    second = c.post("/risk/live", json={**payload, "since": first["version"]}).json()
+    assert second["full"] is False and second["version"] != first["version"]
+    assert [row["time"] for row in second["changed_hours"]] == [
+        pd.Timestamp(revised["time"][15]).isoformat()
+    ]
+    from src.ml.risk import compute_risk, summarize_day
+
+    expected = summarize_day(compute_risk(revised))
+    assert second["summary"]["peak_wbgt_c"] == expected["peak_wbgt_c"]
+    assert second["summary"]["hours_by_tier"] == expected["hours_by_tier"]
+
+
+def test_risk_stream_emits_schools_as_they_finish(monkeypatch):
+    import json
+    import time
+
+    import pandas as pd
+
+    from src.data.demo import synthetic_hourly_series
+
+    def slow_pm(lat, lon, date):
+        if lat == 12.0:
+            raise RuntimeError("sensor offline")
+        time.sleep((15.0 - lat) / 50.0)  # later schools finish first
+        return pd.DataFrame()
+
+    def fake_met_many(points, date, force_demo=False):
+        return [
+            synthetic_hourly_series(date)[["time", "temp_c", "rh", "wind_ms", "swdown"]]
+            for _ in points
+        ]
+
+    monkeypatch.setattr("src.api.main.fetch_era5_hourly_many", fake_met_many)
+    monkeypatch.setattr("src.api.main.fetch_pm25_s3", slow_pm)
+    monkeypatch.setattr("src.api.main.fetch_pm25", lambda lat, lon, date: pd.DataFrame())
+
+    schools = [{"name": f"S{i}", "lat": 10.0 + i, "lon": -80.0} for i in range(4)]
+    c = TestClient(app)
+    rr = c.post("/risk/stream", json={"schools": schools, "date": "2024-07-01", "use_demo": True})
+    assert rr.status_code == 200
+    assert rr.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in rr.text.splitlines()]
+    rows, final = records[:-1], records[-1]
+    assert [r["index"] for r in rows] == [2, 3, 1, 0]
+    assert "sensor offline" in rows[0]["error"] and rows[0]["school"]["name"] == "S2"
+    assert all("summary" in r for r in rows[1:])
+    assert final["done"] is True and final["total"] == 4 and final["failed"] == 1
+    assert final["units"]["wbgt_c"] == "°C"
+    assert 0 <= final["timings"]["first_result_s"] <= final["timings"]["total_s"]
+
+
+def test_risk_jobs_submit_poll_and_cancel(monkeypatch):
+    import time
+
+    import pandas as pd
+
+    from src.api import main
+    from src.api.jobs import RiskJobRunner, RiskJobStore
+    from src.data.demo import synthetic_hourly_series
+
+    def fake_met_many(points, date, force_demo=False):
+        return [
+            synthetic_hourly_series(date)[["time", "temp_c", "rh", "wind_ms", "swdown"]]
+            for _ in points
+        ]
+
+    def pm(lat, lon, date):
+        if lat == 13.0:
+            raise RuntimeError("sensor offline")
+        return pd.DataFrame()
+
+    monkeypatch.setattr("src.api.main.fetch_era5_hourly_many", fake_met_many)
+    monkeypatch.setattr("src.api.main.fetch_pm25_s3", pm)
+    monkeypatch.setattr("src.api.main.fetch_pm25", lambda lat, lon, date: pd.DataFrame())
+    runner = RiskJobRunner(RiskJobStore(), main._score_job_batch, batch_size=3)
+    monkeypatch.setattr(main, "_JOB_RUNNER", runner)
+
+    schools = [{"name": f"S{i}", "lat": 10.0 + i, "lon": -80.0} for i in range(7)]
+    c = TestClient(app)
+    rr = c.post("/risk/jobs", json={"schools": schools, "date": "2024-07-01", "use_demo": True})
+    assert rr.status_code == 202
+    job_id = rr.json()["job"]["id"]
+    for _ in range(500):
+        body = c.get(f"/risk/jobs/{job_id}", params={"limit": 4}).json()
+        if body["job"]["status"] == "done":
+            break
+        time.sleep(0.01)
+    assert body["job"]["done"] == 6 and body["job"]["failed"] == 1
+    assert [r["index"] for r in body["results"]] == [0, 1, 2, 3]
+    assert "sensor offline" in body["results"][3]["error"]
+    assert body["results"][0]["school"]["name"] == "S0" and "summary" in body["results"][0]
+    rest = c.get(f"/risk/jobs/{job_id}", params={"after": body["next_after"]}).json()
+    assert [r["index"] for r in rest["results"]] == [4, 5, 6]
+
+    assert c.post(f"/risk/jobs/{job_id}/cancel").json()["job"]["status"] == "done"
+    assert c.get("/risk/jobs/nope").status_code == 404
+    assert c.get(f"/risk/jobs/{job_id}", params={"limit": 0}).status_code == 422
+    runner.stop()
+
+
+def test_startup_resumes_existing_jobs_db_and_shutdown_resets_runner(tmp_path, monkeypatch):
+    import time
+
+    from src.api import main
+    from src.api.jobs import RiskJobStore
+
+    jobs_db = str(tmp_path / "risk_jobs.sqlite3")
+    store = RiskJobStore(jobs_db)
+    schools = [{"name": "S0", "lat": 40.7, "lon": -74.0}]
+    job_id = store.create("2024-07-01", True, schools)
+    store.close()
+    monkeypatch.setattr(main, "RISK_JOBS_DB", jobs_db)
+
+    for _ in range(2):  # a second lifespan in the same process gets a live runner
+        with TestClient(app) as c:
+            for _ in range(500):
+                if c.get(f"/risk/jobs/{job_id}").json()["job"]["status"] == "done":
+                    break
+                time.sleep(0.01)
+            assert c.get(f"/risk/jobs/{job_id}").json()["job"]["status"] == "done"
+            payload = {"schools": schools, "date": "2024-07-01", "use_demo": True}
+            rr = c.post("/risk/jobs", json=payload)
+            job_id = rr.json()["job"]["id"]
+        assert main._JOB_RUNNER is None
+
+
+def test_risk_results_are_cached_per_school_day(monkeypatch):
+    import pandas as pd
+
+    from src.api import main
+    from src.data.demo import synthetic_hourly_series
+
+    calls = {"met": 0, "pm": 0}
+
+    def fake_met_many(points, date, force_demo=False):
+        calls["met"] += 1
+        return [
+            synthetic_hourly_series(date)[["time", "temp_c", "rh", "wind_ms", "swdown"]]
+            for _ in points
+        ]
+
+    def fake_pm(lat, lon, date):
+        calls["pm"] += 1
+        return pd.DataFrame({"time": pd.date_range(date, periods=24, freq="h"), "pm25": 20.0})
+
+    monkeypatch.setattr("src.api.main.fetch_era5_hourly_many", fake_met_many)
+    monkeypatch.setattr("src.api.main.fetch_pm25_s3", fake_pm)
+    monkeypatch.setattr("src.api.main.fetch_pm25", lambda lat, lon, date: pd.DataFrame())
+    monkeypatch.delenv("WBGT_THRESH", raising=False)
+
+    schools = [{"name": "A", "lat": 40.71, "lon": -74.0}, {"name": "B", "lat": 40.72, "lon": -74.0}]
+    payload = {"schools": schools, "date": "2024-07-01", "use_demo": True}
+    c = TestClient(app)
+    first = c.post("/risk", json=payload).json()
+    renamed = [{**schools[0], "name": "A2"}, schools[1]]
+    second = c.post("/risk", json={**payload, "schools": renamed}).json()
+    assert calls == {"met": 1, "pm": 2}
+    assert second["results"][0]["school"]["name"] == "A2"
+    assert [r["summary"] for r in second["results"]] == [r["summary"] for r in first["results"]]
+    stats = c.get("/risk/cache").json()
+    assert (stats["memory_hits"], stats["misses"], stats["stores"]) == (2, 2, 2)
+
+    # A different threshold profile is a different result.
+    monkeypatch.setenv("WBGT_THRESH", "20,25,28")
+    c.post("/risk", json=payload)
+    assert calls == {"met": 2, "pm": 4}
+
+    # Settled days are kept for good; recent days and days without PM2.5 expire.
+    sources = {"met_source": "asdi-era5", "aq_source": "openaq-s3"}
+    assert main._result_ttl("2024-07-01", sources, False) is None
+    assert main._result_ttl(main.utc_today_str(), sources, False) == main.RISK_CACHE_TTL_S
+    assert main._result_ttl("2024-07-01", {**sources, "aq_source": "none"}, False) is not None
+    assert main._result_ttl("2024-07-01", {**sources, "met_source": "demo"}, False) is not None
+
+
+def test_risk_range_matches_daily_risk_with_one_met_fetch(monkeypatch):
+    import pandas as pd
+
+    from src.data import era5
+    from src.data.demo import synthetic_hourly_series
+
+    met_calls = []
+
+    def fake_range_many(points, start, end, force_demo=False):
+        met_calls.append((list(points), start, end))
+        return era5.fetch_era5_hourly_range_many(points, start, end, force_demo=True)
+
+    def fake_met_many(points, date, force_demo=False):
+        return [
+            synthetic_hourly_series(date)[["time", "temp_c", "rh", "wind_ms", "swdown"]]
+            for _ in points
+        ]
+
+    def fake_pm(lat, lon, date):
+        if date == "2024-07-02" and lat > 41:
+            return pd.DataFrame()  # no sensor data that day: default PM2.5
+        hours = pd.date_range(date, periods=24, freq="h")
+        return pd.DataFrame({"time": hours[::3], "pm25": [5.0 + lat, 60.0, 20.0, 8.0] * 2})
+
+    monkeypatch.setattr("src.api.main.fetch_era5_hourly_range_many", fake_range_many)
+    monkeypatch.setattr("src.api.main.fetch_era5_hourly_many", fake_met_many)
+    monkeypatch.setattr("src.api.main.fetch_pm25_s3", fake_pm)
+    monkeypatch.setattr("src.api.main.fetch_pm25", lambda lat, lon, date: pd.DataFrame())
+
+    schools = [
+        {"name": "Downtown", "lat": 40.7128, "lon": -74.0060},
+        {"name": "Midtown", "lat": 40.7549, "lon": -73.9840},
+        {"name": "Uptown", "lat": 41.2, "lon": -74.0},
+    ]
+    c = TestClient(app)
+    payload = {"schools": schools, "start": "2024-06-30", "end": "2024-07-02", "use_demo": True}
+    body = c.post("/risk/range", json=payload).json()
+    assert len(met_calls) == 1 and met_calls[0][1:] == ("2024-06-30", "2024-07-02")
+    assert len(met_calls[0][0]) == 2  # two distinct ERA5 cells
+    assert [r["school"]["name"] for r in body["results"]] == ["Downtown", "Midtown", "Uptown"]
+
+    _RESULT_CACHE.clear()
+    for day_pos, day in enumerate(["2024-06-30", "2024-07-01", "2024-07-02"]):
+        daily = c.post("/risk", json={"schools": schools, "date": day, "use_demo": True}).json()
+        for ranged, single in zip(body["results"], daily["results"]):
+            entry = ranged["days"][day_pos]
+            assert entry["date"] == day
+            assert entry["summary"] == single["summary"]
+            assert entry["sources"] == single["sources"]
+
+    # Cached school-days need no upstream work at all.
+    again = c.post("/risk/range", json=payload).json()
+    assert len(met_calls) == 1 and again["results"] == body["results"]
+
+    bad = {**payload, "start": "2024-07-03"}
+    assert c.post("/risk/range", json=bad).status_code == 400
+    assert c.post("/risk/range", json={**payload, "end": "2025-07-03"}).status_code == 400
+    assert c.post("/risk/range", json={**payload, "end": "July"}).status_code == 400
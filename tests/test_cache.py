@@ -0,0 +1,77 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+fsspec = pytest.importorskip("fsspec")
+
+from fsspec.implementations.local import LocalFileSystem
+
+from src.data.cache import BlockCache
+
+
+def _remote(tmp_path, name, size):
+    path = tmp_path / "remote" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = os.urandom(size)
+    path.write_bytes(data)
+    return str(path), data
+
+
+def test_cached_file_reads_match_remote_and_second_read_is_local(tmp_path, monkeypatch):
+    fs = LocalFileSystem()
+    path, data = _remote(tmp_path, "a.nc", 10_000)
+    cache = BlockCache(str(tmp_path / "cache"), max_bytes=1_000_000, block_size=1024)
+
+    with cache.open(fs, path) as fh:
+        fh.seek(1000)
+        assert fh.read(100) == data[1000:1100]
+        fh.seek(-50, os.SEEK_END)
+        assert fh.read() == data[-50:]
+        fh.seek(0)
+        assert fh.read() == data
+
+    def boom(*args, **kwargs):
+        raise AssertionError("remote read on a warm cache")
+
+    monkeypatch.setattr(fs, "cat_file", boom)
+    monkeypatch.setattr(fs, "size", boom)
+    with cache.open(fs, path) as fh:
+        fh.seek(2048)
+        assert fh.read(4096) == data[2048:6144]
+
+
+def test_changing_block_size_over_the_same_cache_dir(tmp_path):
+    fs = LocalFileSystem()
+    path, data = _remote(tmp_path, "a.nc", 10_000)
+    root = str(tmp_path / "cache")
+    for block_size in (1024, 3000, 1024):
+        with BlockCache(root, max_bytes=1_000_000, block_size=block_size).open(fs, path) as fh:
+            fh.seek(2500)
+            assert fh.read(4000) == data[2500:6500]
+
+
+def test_missing_remote_object_raises_file_not_found(tmp_path):
+    cache = BlockCache(str(tmp_path / "cache"), max_bytes=1_000_000, block_size=1024)
+    with pytest.raises(FileNotFoundError):
+        cache.open(LocalFileSystem(), str(tmp_path / "remote" / "missing.nc"))
+
+
+def test_eviction_keeps_usage_under_budget_and_drops_oldest(tmp_path):
+    fs = LocalFileSystem()
+    cache = BlockCache(str(tmp_path / "cache"), max_bytes=4096, block_size=1024)
+    old, old_data = _remote(tmp_path, "old.nc", 4096)
+    new, new_data = _remote(tmp_path, "new.nc", 4096)
+    with cache.open(fs, old) as fh:
+        assert fh.read() == old_data
+    for path_str, _, _ in cache._entries():
+        os.utime(path_str, (1, 1))
+    with cache.open(fs, new) as fh:
+        assert fh.read() == new_data
+    cache.evict()
+    assert cache.usage() <= 4096
+    remaining = {Path(p).name.split(".")[0] for p, _, _ in cache._entries()}
+    assert remaining == {cache._key_dir(new)[1]}
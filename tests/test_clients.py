@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+
+from src.api.main import app
+from src.utils import clients
+
+
+def test_http_client_and_session_are_shared_until_closed():
+    first = clients.get_http_client()
+    assert clients.get_http_client() is first
+    session = clients.get_requests_session()
+    assert clients.get_requests_session() is session
+    clients.close_clients()
+    assert first.is_closed
+    assert clients.get_http_client() is not first
+
+
+def test_app_shutdown_closes_pooled_clients(tmp_path, monkeypatch):
+    from src.api import main
+
+    jobs_db = tmp_path / "risk_jobs.sqlite3"
+    monkeypatch.setattr(main, "RISK_JOBS_DB", str(jobs_db))
+    with TestClient(app) as c:
+        assert c.get("/health").status_code == 200
+        http_client = clients.get_http_client()
+    assert http_client.is_closed
+    # No jobs database to resume: startup neither creates one nor starts a runner.
+    assert not jobs_db.exists() and main._JOB_RUNNER is None
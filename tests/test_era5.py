@@ -0,0 +1,332 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.data.era5 import era5_grid_cell
+
+
+def test_grid_cell_snaps_to_quarter_degree_on_0_360():
+    assert era5_grid_cell(34.0522, -118.2437) == (34.0, 241.75)
+    assert era5_grid_cell(34.13, -118.13) == (34.25, 241.75)
+    assert era5_grid_cell(-0.1, 359.9) == (0.0, 0.0)
+    assert era5_grid_cell(90.0, 0.0) == (90.0, 0.0)
+
+
+def test_nearby_schools_share_a_cell():
+    downtown = era5_grid_cell(40.7128, -74.0060)
+    midtown = era5_grid_cell(40.7549, -73.9840)
+    assert downtown == midtown
+    assert era5_grid_cell(40.9, -74.0) != downtown
+
+
+def _write_era5_month(root, year=2024, month=7):
+    """Write tiny stand-ins for the ASDI ERA5 files the reader expects under ``root``."""
+    import numpy as np
+    import pandas as pd
+    import xarray as xr
+
+    from src.data import era5
+
+    lats = np.arange(41.0, 39.99, -0.25)
+    lons = np.arange(285.5, 286.51, 0.25)
+    times = pd.date_range(f"{year}-{month:02d}-01", periods=48, freq="h")
+    grid = np.add.outer(np.arange(len(lats)) * 10.0, np.arange(len(lons)))
+    hours = np.arange(len(times))[:, None, None]
+    for offset, (code, var_name) in enumerate(era5.ANALYSIS_FIELDS.values()):
+        values = 280.0 + offset + grid[None, :, :] + 0.01 * hours
+        ds = xr.Dataset(
+            {var_name: (("time", "latitude", "longitude"), values.astype("float32"))},
+            coords={"time": times, "latitude": lats, "longitude": lons},
+        )
+        encoding = {"zlib": True, "shuffle": True, "chunksizes": (24, 2, 2)}
+        if var_name == "VAR_2D":  # exercise packed int16 storage
+            encoding.update(dtype="int16", scale_factor=0.01, add_offset=280.0, _FillValue=-32767)
+        path = root / era5._analysis_path(code, year, month)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        ds.to_netcdf(path, engine="h5netcdf", encoding={var_name: encoding})
+
+    inits = pd.to_datetime(
+        [f"{year}-{month:02d}-01T06", f"{year}-{month:02d}-01T18", f"{year}-{month:02d}-02T06"]
+    )
+    fc_hours = np.arange(1, 13)
+    flux = (
+        np.arange(len(inits))[:, None, None, None] * 100.0
+        + fc_hours[None, :, None, None]
+        + grid[None, None, :, :] / 100.0
+    )
+    ds = xr.Dataset(
+        {
+            era5.MEAN_FLUX_VAR: (
+                ("forecast_initial_time", "forecast_hour", "latitude", "longitude"),
+                flux.astype("float32"),
+            )
+        },
+        coords={
+            "forecast_initial_time": inits,
+            "forecast_hour": fc_hours,
+            "latitude": lats,
+            "longitude": lons,
+        },
+    )
+    path = root / era5._mean_flux_paths(year, month)[0]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ds.to_netcdf(
+        path,
+        engine="h5netcdf",
+        encoding={era5.MEAN_FLUX_VAR: {"zlib": True, "chunksizes": (2, 12, 3, 3)}},
+    )
+
+
+def _local_era5(monkeypatch, tmp_path, cache_dir="", index_dir=""):
+    import pytest
+
+    pytest.importorskip("xarray")
+    pytest.importorskip("h5netcdf")
+    pytest.importorskip("s3fs")
+    from fsspec.implementations.local import LocalFileSystem
+
+    from src.data import era5, era5_index
+    from src.utils.resilience import reset_all
+
+    reset_all()
+    tmp_path.mkdir(parents=True, exist_ok=True)
+    _write_era5_month(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    opened = []
+    fs = LocalFileSystem()
+    real_open = fs.open
+
+    def counting_open(path, *args, **kwargs):
+        opened.append(path)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(fs, "open", counting_open)
+    monkeypatch.setattr(era5, "_get_filesystem", lambda: fs)
+    monkeypatch.setattr(era5, "ERA5_CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(era5, "_BLOCK_CACHE", None)
+    monkeypatch.setattr(era5_index, "ERA5_INDEX_DIR", str(index_dir))
+    return opened
+
+
+def test_fetch_many_opens_each_file_once_and_matches_single_point(monkeypatch, tmp_path):
+    import numpy as np
+
+    from src.data import era5
+
+    opened = _local_era5(monkeypatch, tmp_path)
+    points = [(40.71, -74.0), (40.26, -73.6), (40.74, -73.98)]
+    frames = era5.fetch_era5_hourly_many(points, "2024-07-01")
+
+    existing = [p for p in opened if (tmp_path / p).exists()]
+    assert len(existing) == len(set(existing)) == len(era5.ANALYSIS_FIELDS) + 1
+    assert len(frames) == 3
+    for frame in frames:
+        assert frame.attrs["met_source"] == "asdi-era5"
+        assert list(frame.columns) == ["time", "temp_c", "rh", "wind_ms", "swdown"]
+        assert len(frame) == 24
+    # Points 0 and 2 share a cell; point 1 is a different one.
+    np.testing.assert_allclose(frames[0]["temp_c"], frames[2]["temp_c"])
+    assert not np.allclose(frames[0]["temp_c"], frames[1]["temp_c"])
+
+    single = era5.fetch_era5_hourly(*points[1], "2024-07-01")
+    for col in ["temp_c", "rh", "wind_ms", "swdown"]:
+        np.testing.assert_allclose(single[col], frames[1][col])
+
+
+def test_block_cache_serves_repeat_fetches_from_disk(monkeypatch, tmp_path):
+    import numpy as np
+
+    from src.data import era5
+
+    opened = _local_era5(monkeypatch, tmp_path / "remote", cache_dir=tmp_path / "cache")
+    first = era5.fetch_era5_hourly(40.71, -74.0, "2024-07-01")
+    assert opened
+    opened.clear()
+    second = era5.fetch_era5_hourly(40.71, -74.0, "2024-07-01")
+    assert opened == []
+    np.testing.assert_allclose(first["temp_c"], second["temp_c"])
+    np.testing.assert_allclose(first["swdown"], second["swdown"])
+
+
+def test_chunk_index_reads_only_needed_chunks_and_matches_file_reads(monkeypatch, tmp_path):
+    import numpy as np
+    import pandas as pd
+
+    from src.data import era5, era5_index
+
+    index_dir = tmp_path / "index"
+    _local_era5(monkeypatch, tmp_path / "remote", index_dir=index_dir)
+    points = [(40.71, -74.0), (40.26, -73.6)]
+    expected = era5.fetch_era5_hourly_many(points, "2024-07-01")
+
+    fs = era5._get_filesystem()
+    for path, var_name in era5.era5_month_objects(2024, 7):
+        if fs.exists(path):
+            era5_index.save_index(era5_index.build_index(fs, path, var_name))
+
+    ranges = []
+    real_cat_ranges = fs.cat_ranges
+
+    def counting_cat_ranges(paths, starts, ends, **kwargs):
+        ranges.extend(e - s for s, e in zip(starts, ends))
+        return real_cat_ranges(paths, starts, ends, **kwargs)
+
+    def no_open(*args, **kwargs):
+        raise AssertionError("indexed read should not open the file")
+
+    monkeypatch.setattr(fs, "cat_ranges", counting_cat_ranges)
+    monkeypatch.setattr(era5, "_open_era5", no_open)
+    indexed = era5.fetch_era5_hourly_many(points, "2024-07-01")
+
+    # 4 analysis vars x 2 points x 1 time chunk, plus 2 flux time-chunks x 2 points.
+    assert len(ranges) == 4 * 2 + 2 * 2
+    for want, got in zip(expected, indexed):
+        pd.testing.assert_frame_equal(want, got, check_dtype=False, atol=1e-4)
+
+
+def test_chunk_index_skips_unwritten_month(monkeypatch, tmp_path):
+    from src.data import era5_index
+
+    _local_era5(monkeypatch, tmp_path / "remote", index_dir=tmp_path / "index")
+    assert era5_index.load_index("nsf-ncar-era5/missing.nc", "VAR_2T") is None
+
+
+def test_analysis_and_flux_files_are_read_concurrently(monkeypatch, tmp_path):
+    import time
+
+    from src.data import era5
+
+    _local_era5(monkeypatch, tmp_path / "remote")
+    real_analysis = era5._read_analysis_points
+    real_flux = era5._read_flux_points
+
+    def slow_analysis(*args, **kwargs):
+        time.sleep(0.2)
+        return real_analysis(*args, **kwargs)
+
+    def slow_flux(*args, **kwargs):
+        time.sleep(0.2)
+        return real_flux(*args, **kwargs)
+
+    monkeypatch.setattr(era5, "_read_analysis_points", slow_analysis)
+    monkeypatch.setattr(era5, "_read_flux_points", slow_flux)
+    t0 = time.perf_counter()
+    frame = era5.fetch_era5_hourly(40.71, -74.0, "2024-07-01")
+    elapsed = time.perf_counter() - t0
+    assert frame.attrs["met_source"] == "asdi-era5"
+    # 4 analysis + 4 flux reads at 0.2 s each would take 1.6 s back to back.
+    assert elapsed < 1.0
+
+
+def test_slow_flux_file_times_out_without_failing_the_fetch(monkeypatch, tmp_path):
+    import time
+
+    from src.data import era5
+
+    _local_era5(monkeypatch, tmp_path / "remote")
+    real_flux = era5._read_flux_points
+    slow_path = era5._mean_flux_paths(2024, 6)[1]
+
+    def flux(fs, path, lats, lons):
+        if path == slow_path:
+            time.sleep(1.0)
+        return real_flux(fs, path, lats, lons)
+
+    monkeypatch.setattr(era5, "_read_flux_points", flux)
+    monkeypatch.setattr(era5, "ERA5_FILE_TIMEOUT", 0.3)
+    frame = era5.fetch_era5_hourly(40.71, -74.0, "2024-07-01")
+    assert frame.attrs["met_source"] == "asdi-era5"
+    assert frame["swdown"].notna().all()
+
+
+def test_file_timeout_starts_when_each_read_starts(monkeypatch):
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from concurrent.futures import TimeoutError as FutureTimeout
+
+    import pytest
+
+    from src.data import era5
+
+    def read(fs, path, delay):
+        time.sleep(delay)
+        return path
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(era5, "_IO_EXECUTOR", pool)
+    monkeypatch.setattr(era5, "ERA5_FILE_TIMEOUT", 0.3)
+    # Four 0.15 s reads queue behind one thread: 0.6 s in total, but each is within budget.
+    reads = [era5._FileRead(read, None, f"file-{i}", 0.15) for i in range(4)]
+    assert [r.result() for r in reads] == [f"file-{i}" for i in range(4)]
+    with pytest.raises(FutureTimeout):
+        era5._FileRead(read, None, "slow", 1.0).result()
+    pool.shutdown(wait=False)
+
+
+def test_expand_flux_orders_rows_init_major_with_valid_times():
+    import numpy as np
+    import pandas as pd
+
+    from src.data.era5 import _expand_flux
+
+    inits = pd.to_datetime(["2024-07-01T06", "2024-07-01T18"]).values
+    hours = np.array([1, 2, 3])
+    values = np.arange(2 * 3 * 2, dtype=float).reshape(2, 3, 2)
+    frame = _expand_flux(inits, hours, values)
+    assert list(frame.index) == list(
+        pd.to_datetime(
+            [
+                "2024-07-01T07",
+                "2024-07-01T08",
+                "2024-07-01T09",
+                "2024-07-01T19",
+                "2024-07-01T20",
+                "2024-07-01T21",
+            ]
+        )
+    )
+    np.testing.assert_array_equal(frame[0], [0, 2, 4, 6, 8, 10])
+    np.testing.assert_array_equal(frame[1], [1, 3, 5, 7, 9, 11])
+
+
+def test_range_fetch_reads_each_month_file_once_and_matches_daily_fetches(monkeypatch, tmp_path):
+    import pandas as pd
+
+    from src.data import era5
+
+    opened = _local_era5(monkeypatch, tmp_path / "remote")
+    ranged = era5.fetch_era5_hourly_range(40.71, -74.0, "2024-07-01", "2024-07-02")
+    existing = [p for p in opened if (tmp_path / "remote" / p).exists()]
+    assert len(existing) == len(set(existing)) == len(era5.ANALYSIS_FIELDS) + 1
+    assert len(ranged) == 48
+
+    daily = pd.concat(
+        [
+            era5.fetch_era5_hourly(40.71, -74.0, "2024-07-01"),
+            era5.fetch_era5_hourly(40.71, -74.0, "2024-07-02"),
+        ],
+        ignore_index=True,
+    )
+    pd.testing.assert_frame_equal(ranged, daily, check_dtype=False)
+
+
+def test_demo_range_covers_every_hour_of_every_day():
+    from src.data.era5 import fetch_era5_hourly_range
+
+    frame = fetch_era5_hourly_range(34.05, -118.24, "2024-07-01", "2024-07-03", force_demo=True)
+    assert len(frame) == 72
+    assert frame["time"].is_monotonic_increasing
+    assert frame.attrs["met_source"] == "demo"
+
+
+def test_missing_flux_files_are_remembered_between_fetches(monkeypatch, tmp_path):
+    from src.data import era5
+
+    opened = _local_era5(monkeypatch, tmp_path / "remote")
+    era5.fetch_era5_hourly(40.71, -74.0, "2024-07-01")
+    assert any(not (tmp_path / "remote" / p).exists() for p in opened)
+    opened.clear()
+    frame = era5.fetch_era5_hourly(40.71, -74.0, "2024-07-01")
+    assert frame.attrs["met_source"] == "asdi-era5"
+    assert all((tmp_path / "remote" / p).exists() for p in opened)
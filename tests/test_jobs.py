@@ -0,0 +1,155 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.api.jobs import RiskJobRunner, RiskJobStore
+
+
+def _schools(n):
+    return [{"name": f"S{i}", "lat": float(i), "lon": 0.0} for i in range(n)]
+
+
+def _fake_batch(gate=None, fail=(), stall_after=0):
+    batches, scored = [], []
+
+    def score(date, use_demo, batch, pool, stop):
+        batches.append([idx for idx, _ in batch])
+        for idx, school in reversed(batch):
+            if gate is not None and len(scored) >= stall_after:
+                gate.wait(5)
+            scored.append(idx)
+            if idx in fail:
+                yield idx, None, "RuntimeError: boom"
+            else:
+                yield idx, {"school": school, "summary": {"peak_wbgt_c": idx}}, None
+
+    return score, batches
+
+
+def _wait(store, job_id, statuses=("done", "cancelled", "failed"), timeout=5.0):
+    deadline = time.time() + timeout
+    while store.get(job_id)["status"] not in statuses:
+        assert time.time() < deadline, store.get(job_id)
+        time.sleep(0.01)
+    return store.get(job_id)
+
+
+def test_job_runs_in_batches_and_pages_results():
+    score, batches = _fake_batch(fail={3})
+    store = RiskJobStore()
+    runner = RiskJobRunner(store, score, batch_size=4)
+    job_id = runner.submit("2024-07-01", True, _schools(10))
+    job = _wait(store, job_id)
+    assert (job["status"], job["total"], job["done"], job["failed"]) == ("done", 10, 9, 1)
+    assert batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+    page = store.results(job_id, after=-1, limit=4)
+    assert [r["index"] for r in page] == [0, 1, 2, 3]
+    assert page[3] == {"index": 3, "school": _schools(10)[3], "error": "RuntimeError: boom"}
+    assert [r["index"] for r in store.results(job_id, after=page[-1]["index"])] == list(
+        range(4, 10)
+    )
+    runner.stop()
+
+
+def test_cancel_stops_a_running_job():
+    gate = threading.Event()
+    score, _ = _fake_batch(gate)
+    store = RiskJobStore()
+    runner = RiskJobRunner(store, score, batch_size=2)
+    job_id = runner.submit("2024-07-01", True, _schools(6))
+    _wait(store, job_id, ("running",))
+    assert store.set_status(job_id, "cancelled")
+    gate.set()
+    job = _wait(store, job_id)
+    time.sleep(0.05)
+    assert job["status"] == "cancelled" and store.get(job_id)["done"] <= 1
+    assert not store.set_status(job_id, "cancelled")
+    runner.stop()
+
+
+def test_unfinished_job_resumes_after_restart(tmp_path):
+    db = str(tmp_path / "jobs.sqlite3")
+    gate = threading.Event()
+    score, _ = _fake_batch(gate, stall_after=2)
+    store = RiskJobStore(db)
+    first = RiskJobRunner(store, score, batch_size=2)
+    job_id = first.submit("2024-07-01", False, _schools(5))
+    while store.get(job_id)["done"] < 2:
+        time.sleep(0.001)
+    # Shut down while the third school is in flight: it is recorded, then the job is released.
+    stopper = threading.Thread(target=first.stop)
+    stopper.start()
+    time.sleep(0.05)
+    gate.set()
+    stopper.join(5)
+    store.close()
+
+    store = RiskJobStore(db)
+    stalled = store.get(job_id)
+    assert stalled["status"] == "running" and stalled["done"] == 3
+    score, batches = _fake_batch()
+    second = RiskJobRunner(store, score, batch_size=10)
+    assert second.resume() == 1
+    job = _wait(store, job_id)
+    assert job["status"] == "done" and job["done"] == 5
+    assert batches == [[2, 4]]  # the first runner scored 0, 1 and 3 (batches run last-first)
+    assert [r["index"] for r in store.results(job_id)] == list(range(5))
+    second.stop()
+
+
+def test_lease_keeps_live_runners_from_stealing_jobs():
+    store = RiskJobStore()
+    job_id = store.create("2024-07-01", True, _schools(1))
+    assert store.claim(job_id, "a", lease_s=60)
+    assert not store.claim(job_id, "b", lease_s=60)
+    assert store.claimable("b", lease_s=60) == []
+    assert store.claim(job_id, "b", lease_s=-1)  # a's heartbeat is older than a lapsed lease
+
+
+def test_queued_job_is_leased_only_once_it_starts():
+    gate = threading.Event()
+    score_a, batches_a = _fake_batch(gate)
+    store = RiskJobStore()
+    a = RiskJobRunner(store, score_a, max_jobs=1, lease_s=0.3)
+    first = a.submit("2024-07-01", True, _schools(2))
+    _wait(store, first, ("running",))
+    second = a.submit("2024-07-01", True, _schools(3))  # queued behind ``first``
+    time.sleep(0.6)  # longer than the lease: only the heartbeat keeps ``first`` owned
+
+    score_b, batches_b = _fake_batch()
+    b = RiskJobRunner(store, score_b, lease_s=0.3)
+    assert not b.start(first)
+    assert b.start(second)
+    assert _wait(store, second)["done"] == 3
+    gate.set()
+    assert _wait(store, first)["done"] == 2
+    a.stop()
+    b.stop()
+    # ``a`` reached ``second`` only after ``b`` had run it, so every school was scored once.
+    assert batches_a == [[0, 1]] and batches_b == [[0, 1, 2]]
+
+
+def test_stop_returns_while_fetches_are_queued(monkeypatch):
+    from src.api import main
+
+    def slow_pm(school, date):
+        time.sleep(0.3)
+        return main.pd.DataFrame(), "none"
+
+    monkeypatch.setattr(main, "_fetch_school_pm", slow_pm)
+    store = RiskJobStore()
+    runner = RiskJobRunner(store, main._score_job_batch, max_jobs=2, workers=1, batch_size=4)
+    jobs = [runner.submit("2024-07-01", True, _schools(4)) for _ in range(2)]
+    for job_id in jobs:
+        _wait(store, job_id, ("running",))
+    stopper = threading.Thread(target=runner.stop)
+    stopper.start()
+    stopper.join(5)
+    assert not stopper.is_alive()
+    # Fetches cancelled by the shutdown leave their schools pending, not failed.
+    assert all(store.get(job_id)["failed"] == 0 for job_id in jobs)
+    assert all(store.get(job_id)["status"] == "running" for job_id in jobs)
@@ -0,0 +1,129 @@
+import gzip
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd
+import pytest
+
+from src.data import openaq, openaq_mirror
+from src.utils.resilience import NEGATIVE_CACHE, reset_all
+
+
+def _archive_bytes(value: float) -> bytes:
+    rows = ["location_id,datetime,parameter,value"]
+    for hour in range(24):
+        rows.append(f"1,2024-07-01T{hour:02d}:00:00Z,pm25,{value}")
+        rows.append(f"1,2024-07-01T{hour:02d}:00:00Z,o3,1.0")
+    return gzip.compress("\n".join(rows).encode())
+
+
+class _FakeS3:
+    """Serves location files from memory with a per-location delay."""
+
+    def __init__(self, files, delays):
+        self.files = files
+        self.delays = delays
+        self.opened = []
+
+    def open(self, path, mode="rb"):
+        loc_id = int(path.split("locationid=")[1].split("/")[0])
+        self.opened.append(loc_id)
+        time.sleep(self.delays.get(loc_id, 0.0))
+        if loc_id not in self.files:
+            raise FileNotFoundError(path)
+        return io.BytesIO(self.files[loc_id])
+
+
+@pytest.fixture()
+def fake_s3(monkeypatch):
+    reset_all()
+
+    def install(files, delays, ids):
+        fs = _FakeS3(files, delays)
+        monkeypatch.setattr(openaq, "get_s3fs", lambda profile="openaq": fs)
+        monkeypatch.setattr(openaq_mirror, "OPENAQ_MIRROR_DIR", "")
+        monkeypatch.setattr(openaq, "_nearest_location_ids", lambda lat, lon, date=None: ids)
+        return fs
+
+    yield install
+    reset_all()
+
+
+def test_candidates_are_read_concurrently_and_nearest_success_wins(fake_s3):
+    # Nearest (1) is missing, 2 and 3 have data; 3 answers first but 2 is nearer.
+    fs = fake_s3(
+        {2: _archive_bytes(20.0), 3: _archive_bytes(30.0)}, {1: 0.2, 2: 0.2, 3: 0.0}, [1, 2, 3]
+    )
+    start = time.perf_counter()
+    out = openaq.fetch_pm25_s3(40.0, -74.0, "2024-07-01")
+    elapsed = time.perf_counter() - start
+
+    assert sorted(fs.opened) == [1, 2, 3]
+    assert len(out) == 24
+    assert (out["pm25"] == 20.0).all()
+    assert out.attrs["aq_source"] == "openaq-s3"
+    assert elapsed < 0.35  # one round trip, not 0.2 + 0.2 sequentially
+    assert ("openaq-s3", openaq._archive_path(1, "2024-07-01")) in NEGATIVE_CACHE
+
+
+def test_known_missing_candidates_are_not_requested_again(fake_s3):
+    fs = fake_s3({}, {}, [1, 2])
+    assert openaq.fetch_pm25_s3(40.0, -74.0, "2024-07-01").empty
+    assert sorted(fs.opened) == [1, 2]
+    fs.opened.clear()
+    assert openaq.fetch_pm25_s3(40.0, -74.0, "2024-07-01").empty
+    assert fs.opened == []
+
+
+def _legacy_parse(raw: bytes) -> pd.Series:
+    df = pd.read_csv(io.BytesIO(raw), compression="gzip")
+    df = df[df["parameter"] == "pm25"][["datetime", "value"]].copy()
+    df["time"] = pd.to_datetime(df["datetime"], utc=True).dt.tz_convert(None)
+    return df.set_index("time")["value"].astype(float).resample("h").mean().interpolate()
+
+
+def _messy_archive() -> bytes:
+    header = "location_id,sensors_id,location,datetime,lat,lon,parameter,units,value"
+    rows = [header]
+    for hour in range(24):
+        if hour in (5, 6, 7):  # gap the resample must fill
+            continue
+        stamp = f"2024-07-01T{hour:02d}:00:00-04:00"
+        for sensor, offset in ((11, 0.0), (12, 3.0)):
+            value = "" if (hour == 9 and sensor == 12) else f"{hour + offset:.1f}"
+            rows.append(f'1,{sensor},"Site, A",{stamp},40.7,-74.0,pm25,µg/m³,{value}')
+        rows.append(f'1,13,"Site, A",{stamp},40.7,-74.0,o3,ppm,0.03')
+    return gzip.compress("\n".join(rows).encode())
+
+
+@pytest.mark.parametrize("engine", ["arrow", "pandas"])
+def test_streaming_parser_matches_full_frame_resample(monkeypatch, engine):
+    if engine == "arrow":
+        pytest.importorskip("pyarrow")
+        monkeypatch.setattr(openaq, "OPENAQ_PARSE_BLOCK_BYTES", 512)
+    else:
+        monkeypatch.setattr(openaq, "pa_csv", None)
+        monkeypatch.setattr(openaq, "OPENAQ_PARSE_CHUNK_ROWS", 7)
+    raw = _messy_archive()
+    got = openaq.parse_pm25_archive(io.BytesIO(raw))
+    pd.testing.assert_series_equal(got, _legacy_parse(raw), check_names=False, check_freq=False)
+
+
+def test_streaming_parser_returns_none_without_pm25(monkeypatch):
+    raw = gzip.compress(b"datetime,parameter,value\n2024-07-01T00:00:00Z,o3,0.1\n")
+    assert openaq.parse_pm25_archive(io.BytesIO(raw)) is None
+    monkeypatch.setattr(openaq, "pa_csv", None)
+    assert openaq.parse_pm25_archive(io.BytesIO(raw)) is None
+
+
+def test_arrow_falls_back_to_pandas_on_unparseable_timestamps():
+    pytest.importorskip("pyarrow")
+    raw = gzip.compress(
+        b"datetime,parameter,value\n07/01/2024 01:00,pm25,4\n07/01/2024 03:00,pm25,8\n"
+    )
+    got = openaq.parse_pm25_archive(io.BytesIO(raw))
+    assert got.tolist() == [4.0, 6.0, 8.0]
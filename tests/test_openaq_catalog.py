@@ -0,0 +1,104 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from src.data import openaq, openaq_catalog
+from src.data.openaq_catalog import LocationCatalog, haversine_m, load_catalog, save_catalog
+
+
+def _random_catalog(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(33.0, 35.0, n)
+    lons = rng.uniform(-119.0, -117.0, n)
+    params = rng.choice(["pm25", "pm25;pm10", "o3"], n)
+    rows = [
+        [1000 + i, lats[i], lons[i], params[i], "2020-01-01T00:00:00Z", "2025-01-01T00:00:00Z"]
+        for i in range(n)
+    ]
+    return LocationCatalog(rows, fetched_at=pd.Timestamp.now(tz="UTC").isoformat())
+
+
+def _brute_force(cat, lat, lon, k=None, radius_m=None):
+    mask = np.array(["pm25" in p for p in cat.parameters])
+    ids, lats, lons = cat.ids[mask], cat.lats[mask], cat.lons[mask]
+    dist = haversine_m(lat, lon, lats, lons)
+    order = np.argsort(dist, kind="stable")
+    if radius_m is not None:
+        order = order[dist[order] <= radius_m]
+    if k is not None:
+        order = order[:k]
+    return [int(ids[i]) for i in order]
+
+
+def test_knn_and_radius_queries_match_brute_force():
+    cat = _random_catalog()
+    for lat, lon in [(34.05, -118.24), (33.01, -118.99), (34.5, -117.5)]:
+        got = [i for i, _ in cat.query(lat, lon, k=5, radius_m=None)]
+        assert got == _brute_force(cat, lat, lon, k=5)
+        got = [i for i, _ in cat.query(lat, lon, radius_m=10_000)]
+        assert got == _brute_force(cat, lat, lon, radius_m=10_000)
+
+
+def test_on_date_filters_inactive_locations():
+    rows = [
+        [1, 34.0, -118.0, "pm25", "2019-01-01T00:00:00Z", "2020-01-01T00:00:00Z"],
+        [2, 34.01, -118.0, "pm25", "2019-01-01T00:00:00Z", "2025-01-01T00:00:00Z"],
+    ]
+    cat = LocationCatalog(rows, fetched_at=pd.Timestamp.now(tz="UTC").isoformat())
+    assert cat.nearest_ids(34.0, -118.0) == [1, 2]
+    assert cat.nearest_ids(34.0, -118.0, on_date="2024-07-01") == [2]
+
+    # Locations still reporting at refresh time stay active for days after the snapshot.
+    rows.append([3, 34.02, -118.0, "pm25", "2019-01-01T00:00:00Z", "2026-10-10T05:00:00Z"])
+    cat = LocationCatalog(rows, fetched_at="2026-10-10T06:00:00+00:00")
+    for day in ("2026-10-10", "2026-10-11", "2026-10-17"):
+        assert cat.nearest_ids(34.0, -118.0, on_date=day) == [3]
+    assert cat.nearest_ids(34.0, -118.0, on_date="2024-07-01") == [2, 3]
+
+
+def test_nearest_location_ids_uses_fresh_catalog_without_network(tmp_path, monkeypatch):
+    path = tmp_path / "catalog.json"
+    save_catalog(_random_catalog(), str(path))
+    monkeypatch.setattr(openaq_catalog, "OPENAQ_CATALOG_PATH", str(path))
+
+    def no_network():
+        raise AssertionError("catalog hit should not touch the network")
+
+    monkeypatch.setattr(openaq, "get_http_client", no_network)
+    cat = load_catalog()
+    assert len(cat) == 2000
+    ids = openaq._nearest_location_ids(34.05, -118.24, date="2024-07-01")
+    assert ids == _brute_force(cat, 34.05, -118.24, k=3, radius_m=25000)
+
+
+def test_stale_catalog_falls_back_to_network(tmp_path, monkeypatch):
+    path = tmp_path / "catalog.json"
+    cat = _random_catalog()
+    cat.fetched_at = "2000-01-01T00:00:00+00:00"
+    save_catalog(cat, str(path))
+    monkeypatch.setattr(openaq_catalog, "OPENAQ_CATALOG_PATH", str(path))
+    from src.utils.resilience import reset_all
+
+    reset_all()
+    calls = []
+
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"results": [{"id": 7}]}
+
+    class FakeClient:
+        def get(self, url, **kwargs):
+            calls.append(url)
+            return FakeResponse()
+
+    monkeypatch.setattr(openaq, "get_http_client", lambda: FakeClient())
+    assert openaq._nearest_location_ids(34.05, -118.24) == [7]
+    assert len(calls) == 1
+    reset_all()
@@ -0,0 +1,100 @@
+import gzip
+import io
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.data import openaq, openaq_mirror
+from src.utils.resilience import reset_all
+
+
+def _day_file(day: str, value: float, parameter: str = "pm25") -> bytes:
+    rows = ["location_id,datetime,parameter,value"]
+    for hour in range(0, 24, 2):  # gaps for resample + interpolate
+        rows.append(f"1,{day}T{hour:02d}:00:00-04:00,{parameter},{value + hour}")
+    return gzip.compress("\n".join(rows).encode())
+
+
+class _FakeArchive:
+    def __init__(self, files):
+        self.files = files
+        self.opened = []
+
+    def ls(self, prefix, detail=False):
+        found = [p for p in self.files if p.startswith(prefix + "/")]
+        if not found:
+            raise FileNotFoundError(prefix)
+        return found
+
+    def open(self, path, mode="rb"):
+        self.opened.append(path)
+        if path not in self.files:
+            raise FileNotFoundError(path)
+        return io.BytesIO(self.files[path])
+
+
+@pytest.fixture()
+def archive(monkeypatch, tmp_path):
+    reset_all()
+    files = {
+        openaq._archive_path(1, "2024-07-01"): _day_file("2024-07-01", 10.0),
+        openaq._archive_path(1, "2024-07-02"): _day_file("2024-07-02", 20.0),
+        openaq._archive_path(1, "2024-07-03"): _day_file("2024-07-03", 1.0, parameter="o3"),
+        openaq._archive_path(2, "2024-07-03"): _day_file("2024-07-03", 30.0),
+        openaq._archive_path(2, "2024-08-01"): _day_file("2024-08-01", 40.0),
+    }
+    fs = _FakeArchive(files)
+    monkeypatch.setattr(openaq_mirror, "OPENAQ_MIRROR_DIR", str(tmp_path / "mirror"))
+    monkeypatch.setattr(openaq, "get_s3fs", lambda profile="openaq": fs)
+    monkeypatch.setattr(openaq, "_nearest_location_ids", lambda lat, lon, date=None: [1, 2])
+    yield fs
+    reset_all()
+
+
+def test_mirror_hit_matches_s3_read_without_any_s3_request(archive, monkeypatch):
+    root = openaq_mirror.OPENAQ_MIRROR_DIR
+    monkeypatch.setattr(openaq_mirror, "OPENAQ_MIRROR_DIR", "")
+    from_s3 = openaq.fetch_pm25_s3(40.7, -74.0, "2024-07-02")
+    monkeypatch.setattr(openaq_mirror, "OPENAQ_MIRROR_DIR", root)
+
+    stats = openaq_mirror.sync_mirror([1, 2], "2024-07", "2024-08", fs=archive)
+    assert stats == {"partitions": 4, "skipped": 0, "files": 5, "days": 4}
+    archive.opened.clear()
+    mirrored = openaq.fetch_pm25_s3(40.7, -74.0, "2024-07-02")
+
+    assert archive.opened == []
+    assert mirrored.attrs["aq_source"] == "openaq-mirror"
+    assert from_s3.attrs["aq_source"] == "openaq-s3"
+    pd.testing.assert_frame_equal(mirrored, from_s3)
+
+
+def test_final_month_without_pm25_skips_to_next_candidate(archive):
+    openaq_mirror.sync_mirror([1, 2], "2024-07", "2024-07", fs=archive)
+    assert openaq_mirror.lookup(1, "2024-07-03") == openaq_mirror.ABSENT
+    archive.opened.clear()
+
+    out = openaq.fetch_pm25_s3(40.7, -74.0, "2024-07-03")
+    assert archive.opened == []
+    assert out["pm25"].iloc[0] == 30.0
+
+    # Final months are not listed again.
+    again = openaq_mirror.sync_mirror([1, 2], "2024-07", "2024-07", fs=archive)
+    assert again["skipped"] == 2 and archive.opened == []
+
+
+def test_range_scan_across_locations(archive):
+    openaq_mirror.sync_mirror([1, 2], "2024-07", "2024-08", fs=archive)
+    out = openaq_mirror.read_pm25_range([2, 1], "2024-07-02", "2024-08-01")
+    assert list(out.columns) == ["location_id", "date", "time", "pm25"]
+    assert out.groupby(["location_id", "date"]).size().to_dict() == {
+        (1, "2024-07-02"): 23,
+        (2, "2024-07-03"): 23,
+        (2, "2024-08-01"): 23,
+    }
+    assert openaq_mirror.read_pm25_range([3], "2024-07-01", "2024-07-31").empty
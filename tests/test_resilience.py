@@ -0,0 +1,176 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import httpx
+import pytest
+
+from src.data import openaq
+from src.utils.resilience import (
+    CircuitBreaker,
+    NegativeCache,
+    SingleFlight,
+    flight_stats,
+    get_breaker,
+    reset_all,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state(monkeypatch):
+    monkeypatch.setattr(openaq, "load_catalog", lambda: None)
+    reset_all()
+    yield
+    reset_all()
+
+
+def _status_error(url, status):
+    request = httpx.Request("GET", url)
+    response = httpx.Response(status, request=request)
+    return httpx.HTTPStatusError(f"{status}", request=request, response=response)
+
+
+class _FakeClient:
+    def __init__(self, get):
+        self.get = get
+
+
+def test_negative_cache_expires_after_ttl():
+    cache = NegativeCache(ttl_s=0.05)
+    cache.add("missing.nc", "missing")
+    assert cache.get("missing.nc") == "missing"
+    time.sleep(0.06)
+    assert "missing.nc" not in cache
+
+
+def test_breaker_opens_after_threshold_and_half_opens_for_one_trial():
+    breaker = CircuitBreaker("t", failure_threshold=2, reset_s=0.05)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()  # the trial
+    assert not breaker.allow()  # everyone else waits for it
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_rejected_location_formats_are_not_retried(monkeypatch):
+    calls = []
+
+    def fake_get(url, params=None, headers=None, timeout=None):
+        calls.append(params["coordinates"])
+        raise _status_error(url, 422)
+
+    monkeypatch.setattr(openaq, "get_http_client", lambda: _FakeClient(fake_get))
+    assert openaq._nearest_location_ids(34.05, -118.24) == []
+    assert len(calls) == 2
+    assert openaq._nearest_location_ids(40.71, -74.0) == []
+    assert len(calls) == 2
+
+
+def test_gone_measurements_endpoint_is_skipped(monkeypatch):
+    calls = []
+
+    def fake_get(url, params=None, headers=None, timeout=None):
+        calls.append(url)
+        raise _status_error(url, 410)
+
+    monkeypatch.setattr(openaq, "get_http_client", lambda: _FakeClient(fake_get))
+    assert openaq.fetch_pm25(34.05, -118.24, "2024-07-01").empty
+    assert openaq.fetch_pm25(40.71, -74.0, "2024-07-01").empty
+    assert len(calls) == 1
+    assert get_breaker("openaq-v2-measurements").state == CircuitBreaker.OPEN
+
+
+def test_single_flight_shares_one_call_and_its_exception_across_threads():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    flight = SingleFlight("test")
+    release = threading.Event()
+    calls = []
+
+    def fetch(value):
+        calls.append(value)
+        release.wait(5)
+        if value == "bad":
+            raise FileNotFoundError(value)
+        return {"value": value}
+
+    with ThreadPoolExecutor(8) as pool:
+        good = [pool.submit(flight.do, "k", fetch, "good") for _ in range(5)]
+        bad = [pool.submit(flight.do, "b", fetch, "bad") for _ in range(3)]
+        while flight.stats()["shared"] < 6:
+            time.sleep(0.001)
+        release.set()
+        results = [f.result() for f in good]
+        errors = [f.exception() for f in bad]
+    assert sorted(calls) == ["bad", "good"]
+    assert all(r is results[0] for r in results)
+    assert all(isinstance(e, FileNotFoundError) for e in errors)
+    assert flight.stats() == {"fetches": 2, "shared": 6, "in_flight": 0}
+    # Nothing is cached: the next call fetches again.
+    assert flight.do("k", lambda: "fresh") == "fresh"
+
+
+def test_single_flight_batches_only_fetch_keys_not_already_in_flight():
+    import threading
+
+    flight = SingleFlight("batch")
+    started, release = threading.Event(), threading.Event()
+    batches = []
+
+    def fetch(keys):
+        batches.append(list(keys))
+        started.set()
+        release.wait(5)
+        return [k * 10 for k in keys]
+
+    first = threading.Thread(target=flight.do_many, args=([1, 2], fetch))
+    first.start()
+    started.wait(5)
+    out = {}
+    second = threading.Thread(target=lambda: out.update(r=flight.do_many([2, 3], fetch)))
+    second.start()
+    while flight.stats()["shared"] < 1:
+        time.sleep(0.001)
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert out["r"] == [20, 30] and batches == [[1, 2], [3]]
+
+
+def test_concurrent_pm_fetches_for_one_school_day_coalesce(monkeypatch):
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    calls = []
+
+    def slow_fetch(lat, lon, date):
+        calls.append((lat, lon, date))
+        time.sleep(0.1)
+        return openaq.pd.DataFrame({"pm25": [12.0]})
+
+    monkeypatch.setattr(openaq, "_fetch_pm25_s3", slow_fetch)
+
+    async def herd(pool):
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, openaq.fetch_pm25_s3, 40.0, -74.0, "2024-07-01")
+                for _ in range(6)
+            ),
+            loop.run_in_executor(pool, openaq.fetch_pm25_s3, 41.0, -74.0, "2024-07-01"),
+        )
+
+    with ThreadPoolExecutor(8) as pool:
+        frames = asyncio.run(herd(pool))
+    assert len(calls) == 2 and all(f is frames[0] for f in frames[:6])
+    assert flight_stats()["openaq-s3"] == {"fetches": 2, "shared": 5, "in_flight": 0}
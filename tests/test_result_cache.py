@@ -0,0 +1,44 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.utils.result_cache import ResultCache
+
+
+def test_memory_tier_is_lru_with_expiry(monkeypatch):
+    cache = ResultCache(max_entries=2)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2}, ttl_s=60)
+    assert cache.get("a") == {"v": 1}
+    cache.put("c", {"v": 3})  # evicts "b", the least recently used
+    assert cache.get("b") is None and cache.get("c") == {"v": 3}
+
+    now = time.time()
+    cache.put("d", {"v": 4}, ttl_s=10)
+    monkeypatch.setattr("src.utils.result_cache.time.time", lambda: now + 11)
+    assert cache.get("d") is None and cache.get("c") == {"v": 3}
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["expired"]) == (3, 2, 1)
+    assert stats["disk"] is None
+
+
+def test_disk_tier_is_shared_and_promoted(tmp_path):
+    writer = ResultCache(root=str(tmp_path))
+    key = ("risk", (40.75, 286.0), 40.7128, -74.006, "2024-07-01", False, (27.0, 30.0, 32.0))
+    writer.put(key, {"summary": {"peak_wbgt_c": 31.5, "avg_wind": float("nan")}})
+    writer.put("recent", {"v": 1}, ttl_s=-1)  # already expired
+
+    reader = ResultCache(root=str(tmp_path))
+    got = reader.get(key)
+    assert got["summary"]["peak_wbgt_c"] == 31.5
+    assert reader.get(key) is got  # promoted into memory
+    assert reader.get("recent") is None
+    stats = reader.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
+
+    assert len(list(tmp_path.glob("*/*.json"))) == 1  # the expired entry was dropped on read
+    writer.put("later", {"v": 2})
+    small = ResultCache(root=str(tmp_path), max_files=1)
+    assert small.evict() == 1 and len(list(tmp_path.glob("*/*.json"))) == 1
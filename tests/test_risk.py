@@ -1,13 +1,15 @@
+import math
 import os
 import numpy as np
 import pandas as pd
+import pytest
 import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
-from ml.wbgt import risk_tiers
-from ml.risk import compute_risk, summarize_day
+from ml.wbgt import _wbgt_thresholds_from_env, risk_codes, risk_tiers
+from ml.risk import SUMMARY_FIELDS, compute_risk, summarize_day, summarize_many
 
 
 def test_risk_tier_edges_default_thresholds(monkeypatch):
@@ -29,6 +31,15 @@ def test_risk_tier_env_thresholds(monkeypatch):
     assert tiers == expected
 
 
+def test_non_increasing_thresholds_are_rejected(monkeypatch):
+    vals, pm = np.array([29.0]), np.array([10.0])
+    monkeypatch.setenv("WBGT_THRESH", "32,30,27")
+    with pytest.raises(ValueError, match="increase"):
+        risk_tiers(vals, pm)
+    with pytest.raises(ValueError, match="increase"):
+        risk_codes(vals, pm, thresholds=(27.0, 30.0, 30.0))
+
+
 def test_compute_risk_defaults_pm25_and_summary():
     times = pd.date_range("2024-07-01", periods=5, freq="h")
     hourly = pd.DataFrame(
@@ -49,3 +60,116 @@ def test_compute_risk_defaults_pm25_and_summary():
     assert "hours_by_tier" in summary
     total_hours = sum(summary["hours_by_tier"].values())
     assert total_hours == len(times)
+
+
+def test_risk_codes_match_searchsorted_bins(monkeypatch):
+    monkeypatch.delenv("WBGT_THRESH", raising=False)
+    rng = np.random.default_rng(0)
+    wbgt = np.concatenate([rng.uniform(15, 40, 5000), [27.0, 30.0, 32.0, -150.0, 150.0]])
+    pm = np.concatenate([rng.uniform(0, 90, 5000), [12.0, 35.0, 55.0, 0.0, 2e6]])
+    expected = np.maximum(
+        np.searchsorted([27.0, 30.0, 32.0], wbgt, side="right"),
+        np.searchsorted([12.0, 35.0, 55.0], pm, side="right"),
+    )
+    codes = risk_codes(wbgt, pm)
+    assert codes.dtype == np.int8
+    np.testing.assert_array_equal(codes, expected)
+
+
+def test_risk_codes_reject_missing_inputs():
+    with pytest.raises(ValueError):
+        risk_codes(np.array([28.0, np.nan]), np.array([10.0, 10.0]))
+
+
+def test_thresholds_follow_env_changes(monkeypatch):
+    monkeypatch.setenv("WBGT_THRESH", "28,31,33")
+    assert _wbgt_thresholds_from_env() == (28.0, 31.0, 33.0)
+    monkeypatch.setenv("WBGT_THRESH", "bad")
+    assert _wbgt_thresholds_from_env() == (27.0, 30.0, 32.0)
+
+
+def test_compute_risk_leaves_input_untouched_and_tiers_are_categorical():
+    hourly = pd.DataFrame(
+        {
+            "temp_c": [30.0, 36.0, 36.0],
+            "rh": [0.5, 0.8, 0.8],
+            "swdown": [0.0, 900.0, 900.0],
+            "wind_ms": [2.0, 0.5, 0.5],
+        }
+    )
+    before = hourly.copy()
+    df = compute_risk(hourly)
+    pd.testing.assert_frame_equal(hourly, before)
+    assert isinstance(df["tier"].dtype, pd.CategoricalDtype)
+    summary = summarize_day(df)
+    # Categories with no hours are not reported.
+    assert summary["hours_by_tier"] == {"red": 2, "green": 1}
+    assert summary["orange_red_hours"] == 2
+
+
+def test_tier_counts_keep_value_counts_tie_order():
+    from ml.risk import _tier_counts
+    from ml.wbgt import TIER_LABELS
+
+    rng = np.random.default_rng(3)
+    for n in (4, 24, 500):
+        for _ in range(20):
+            tier = pd.Series(rng.choice(TIER_LABELS, size=n))
+            expected = tier.value_counts().to_dict()
+            got = _tier_counts(tier.astype(pd.CategoricalDtype(TIER_LABELS)))
+            assert list(got.items()) == list(expected.items())
+
+
+def _district(n_schools=12, n_days=3, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2024-07-01", periods=24 * n_days, freq="h")
+    n = n_schools * len(times)
+    df = pd.DataFrame(
+        {
+            "school_id": np.repeat([f"s{i:02d}" for i in range(n_schools)], len(times)),
+            "time": np.tile(times, n_schools),
+            "temp_c": rng.uniform(20, 38, n).round(1),
+            "rh": rng.uniform(0.2, 0.9, n).round(2),
+            "swdown": rng.uniform(0, 900, n),
+            "wind_ms": rng.uniform(0, 6, n),
+            "pm25": rng.uniform(0, 70, n).round(0),
+        }
+    )
+    df["date"] = df["time"].dt.strftime("%Y-%m-%d")
+    df = compute_risk(df.sample(frac=1.0, random_state=seed).reset_index(drop=True))
+    # Ties in tier counts and WBGT peaks, missing wind/RH hours, a short day.
+    df.loc[rng.random(n) < 0.05, "wind_ms"] = np.nan
+    df.loc[rng.random(n) < 0.05, "rh"] = np.nan
+    df.loc[df.index[:40], "wbgt_c"] = 30.0
+    return df.drop(index=df.index[(df["school_id"] == "s03") & (df["time"].dt.hour < 5)])
+
+
+def _same(a, b):
+    if type(a) is not type(b):
+        return False
+    return a == b or (isinstance(a, float) and math.isnan(a) and math.isnan(b))
+
+
+@pytest.mark.parametrize("tier_as_object", [False, True])
+def test_summarize_many_matches_summarize_day_exactly(tier_as_object):
+    df = _district()
+    if tier_as_object:
+        df["tier"] = df["tier"].astype(object)
+    many = summarize_many(df, by=["school_id", "date"])
+    assert list(many.columns) == list(SUMMARY_FIELDS)
+    assert len(many) == 36
+    for key, rows in df.groupby(["school_id", "date"]):
+        expected = summarize_day(rows)
+        got = many.loc[key].to_dict()
+        assert got.keys() == expected.keys()
+        for field, value in expected.items():
+            assert _same(got[field], value), (key, field, got[field], value)
+        assert list(got["hours_by_tier"]) == list(expected["hours_by_tier"])
+
+
+def test_summarize_many_single_key_and_missing_columns():
+    df = _district(n_schools=3, n_days=1).drop(columns=["time", "pm25", "wind_ms"])
+    many = summarize_many(df, by="school_id")
+    for school, rows in df.groupby("school_id"):
+        assert many.loc[school].to_dict() == summarize_day(rows)
+    assert summarize_many(df.iloc[:0], by="school_id").empty
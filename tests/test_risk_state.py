@@ -0,0 +1,103 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml import risk_state
+from ml.risk import compute_risk, summarize_day
+from ml.risk_state import RiskDayState, RiskStateStore
+
+
+def _day(seed=0):
+    rng = np.random.default_rng(seed)
+    n = 24
+    return pd.DataFrame(
+        {
+            "time": pd.date_range("2024-07-01", periods=n, freq="h"),
+            "temp_c": rng.uniform(22, 38, n),
+            "rh": rng.uniform(0.2, 0.9, n),
+            "swdown": rng.uniform(0, 900, n),
+            "wind_ms": rng.uniform(0, 6, n),
+            "pm25": rng.uniform(0, 70, n),
+        }
+    )
+
+
+def _assert_matches(state, frame):
+    expected = summarize_day(compute_risk(frame.sort_values("time")))
+    got = state.summary()
+    assert got.pop("avg_wind") == pytest.approx(expected.pop("avg_wind"), rel=1e-12)
+    assert got == expected
+    assert list(got["hours_by_tier"].items()) == list(expected["hours_by_tier"].items())
+
+
+def test_chunked_and_revised_updates_match_full_summary():
+    day = _day()
+    state = RiskDayState()
+    for lo in range(0, 24, 5):
+        state.update(day.iloc[lo : lo + 5])
+        _assert_matches(state, day.iloc[: lo + 5])
+
+    revised = day.copy()
+    revised.loc[[3, 14, 20], "temp_c"] += [9.0, -12.0, 4.0]
+    revised.loc[14, "pm25"] = 80.0
+    revised.loc[7, "rh"] = 0.95
+    assert sorted(state.update(revised)) == list(revised["time"].iloc[[3, 7, 14, 20]])
+    _assert_matches(state, revised)
+
+    # Ties for the peak resolve to the earliest hour, as idxmax does.
+    tied = revised.copy()
+    tied.loc[[2, 9], ["temp_c", "rh", "swdown", "wind_ms"]] = [45.0, 0.5, 800.0, 1.0]
+    state.update(tied.iloc[::-1])
+    _assert_matches(state, tied)
+    assert state.summary()["hottest_time"] == tied["time"][2].isoformat()
+
+
+def test_only_changed_hours_are_rescored(monkeypatch):
+    day = _day(1)
+    state = RiskDayState()
+    state.update(day)
+    calls = []
+    kernel = risk_state.risk_kernel
+    monkeypatch.setattr(
+        risk_state, "risk_kernel", lambda *a, **kw: calls.append(len(a[0])) or kernel(*a, **kw)
+    )
+    assert state.update(day) == [] and calls == []
+    day.loc[5, "wind_ms"] += 1.0
+    assert state.update(day) == [day["time"][5]]
+    assert calls == [1]
+
+
+def test_version_tokens_return_changes_since():
+    day = _day(2)
+    state = RiskDayState()
+    state.update(day.iloc[:12])
+    first = state.token
+    rows, full = state.changes_since(None)
+    assert full and len(rows) == 12
+
+    state.update(day)  # hours 0-11 unchanged, 12-23 new
+    rows, full = state.changes_since(first)
+    assert not full and [r["time"] for r in rows] == [t.isoformat() for t in day["time"][12:]]
+    assert set(rows[0]) == {"time", "temp_c", "rh", "swdown", "wind_ms", "pm25", "wbgt_c", "tier"}
+
+    assert state.changes_since(state.token) == ([], False)
+    for stale in ("other.1", f"{state.epoch}.x", ""):
+        assert state.changes_since(stale)[1] is True
+
+
+def test_store_evicts_lru_and_resets_on_threshold_change(monkeypatch):
+    monkeypatch.delenv("WBGT_THRESH", raising=False)
+    store = RiskStateStore(max_entries=2)
+    a = store.get("a")
+    store.get("b")
+    assert store.get("a") is a
+    store.get("c")  # evicts "b"
+    assert len(store) == 2 and store.get("a") is a
+    monkeypatch.setenv("WBGT_THRESH", "28,31,33")
+    fresh = store.get("a")
+    assert fresh is not a and fresh.thresholds == (28.0, 31.0, 33.0)
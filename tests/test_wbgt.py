@@ -1,13 +1,21 @@
 import os
 import numpy as np
 import pandas as pd
+import pytest
 
 import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 
-from ml.wbgt import wbgt_liljegren_from_met
+from ml.liljegren import (
+    _solve_block,
+    cos_zenith,
+    wbgt_liljegren_physical,
+    wbgt_liljegren_point,
+)
+from ml.wbgt import risk_codes, wbgt_liljegren_from_met
+from ml.wbgt_batch import risk_batch, wbgt_batch
 
 
 def test_wbgt_monotonic_temperature():
@@ -57,3 +65,106 @@ def test_wbgt_hot_humid_high_solar_exceeds_threshold():
     wbgt = wbgt_liljegren_from_met(t, rh, sw, wind)
     assert float(wbgt.mean()) > 30.0
     assert float(wbgt.max()) > 32.0
+
+
+def _met(shape, seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.uniform(10, 42, shape),
+        rng.uniform(-0.1, 1.1, shape),
+        rng.uniform(-5, 1000, shape),
+        rng.uniform(-1, 8, shape),
+    )
+
+
+def test_batch_engine_matches_formula_for_grids_and_threads():
+    for shape in [(37, 24), (5, 7, 48)]:
+        met = _met(shape)
+        ref = wbgt_liljegren_from_met(*met)
+        got = wbgt_batch(*met, block=100, workers=3)
+        assert got.shape == shape
+        np.testing.assert_allclose(got, ref, rtol=0, atol=1e-12)
+
+
+def test_batch_engine_keeps_float32_and_broadcasts_scalars():
+    t, rh, sw, _ = (x.astype(np.float32) for x in _met((20, 24)))
+    got = wbgt_batch(t, rh, sw, np.float32(2.0))
+    assert got.dtype == np.float32
+    ref = wbgt_liljegren_from_met(t, rh, sw, np.full(t.shape, 2.0))
+    np.testing.assert_allclose(got, ref, atol=1e-3)
+
+
+def test_batch_engine_numexpr_matches_numpy_chain():
+    pytest.importorskip("numexpr")
+    met = _met((11, 30))
+    np.testing.assert_allclose(
+        wbgt_batch(*met, engine="numexpr"), wbgt_batch(*met, engine="numpy"), atol=1e-12
+    )
+
+
+def test_risk_batch_codes_match_per_site_kernel():
+    met = _met((8, 24), seed=3)
+    pm = np.random.default_rng(4).uniform(0, 80, (8, 24))
+    wbgt, codes = risk_batch(*met, pm25=pm, block=50, workers=2)
+    assert codes.dtype == np.int8
+    for site in range(8):
+        np.testing.assert_array_equal(codes[site], risk_codes(wbgt[site], pm[site]))
+
+
+def _physical_inputs(n, seed=5):
+    rng = np.random.default_rng(seed)
+    sw = rng.uniform(0, 1100, n) * (rng.random(n) > 0.3)
+    return (
+        rng.uniform(-5, 45, n),
+        rng.uniform(0.05, 1.0, n),
+        sw,
+        rng.uniform(0, 12, n),
+        rng.uniform(700, 1050, n),
+        np.where(sw > 0, rng.uniform(0.05, 1.0, n), rng.uniform(-1.0, 0.3, n)),
+    )
+
+
+def test_physical_solver_matches_scalar_reference():
+    t, rh, sw, u, p, cza = _physical_inputs(400)
+    got = wbgt_liljegren_physical(t, rh, sw, u, p, cza=cza, block=64, workers=2)
+    ref = np.array([wbgt_liljegren_point(*v) for v in zip(t, rh, sw, u, p, cza)])
+    np.testing.assert_allclose(got, ref, atol=0.05)
+    got32 = wbgt_liljegren_physical(*(x.astype(np.float32) for x in (t, rh, sw, u)), p, cza=cza)
+    assert got32.dtype == np.float32
+    np.testing.assert_allclose(got32, got, atol=0.01)
+
+
+def test_physical_solver_trends_and_shapes():
+    t = np.full((3, 24), 30.0)
+    base = dict(rh=0.5, swdown=np.linspace(0, 900, 24), wind_ms=2.0, cza=0.8)
+    w0 = wbgt_liljegren_physical(t, **base)
+    assert w0.shape == (3, 24)
+    assert (np.diff(w0[0]) > 0).all()  # more sun, hotter globe
+    assert (wbgt_liljegren_physical(t + 2.0, **base) > w0).all()
+    assert (wbgt_liljegren_physical(t, **{**base, "rh": 0.8}) > w0).all()
+    assert (wbgt_liljegren_physical(t, **{**base, "wind_ms": 6.0})[:, 1:] < w0[:, 1:]).all()
+
+
+def test_physical_solver_reports_capped_iterations():
+    t, rh, sw, u, p, cza = (x + 273.15 if i == 0 else x for i, x in enumerate(_physical_inputs(50)))
+    _, unconverged = _solve_block(t, rh, sw, np.maximum(u, 0.13), p, cza, 0.02, 1)
+    assert unconverged > 0
+    _, unconverged = _solve_block(t, rh, sw, np.maximum(u, 0.13), p, cza, 0.02, 50)
+    assert unconverged == 0
+
+
+def test_cos_zenith_near_solstice_noon():
+    # New York, 2024-06-21 16:57 UTC: sun ~17.5 degrees from the zenith.
+    cza = cos_zenith(40.71, -74.01, np.datetime64("2024-06-21T16:57"))
+    assert cza == pytest.approx(np.cos(np.radians(17.5)), abs=0.01)
+    assert cos_zenith(40.71, -74.01, np.datetime64("2024-06-21T05:00")) < 0
+
+
+def test_physical_solver_warns_when_iterations_are_capped(caplog):
+    t, rh, sw, u, p, cza = _physical_inputs(50)
+    with caplog.at_level("WARNING", logger="ml.liljegren"):
+        wbgt_liljegren_physical(t, rh, sw, u, p, cza=cza)
+    assert not caplog.records
+    with caplog.at_level("WARNING", logger="ml.liljegren"):
+        wbgt_liljegren_physical(t, rh, sw, u, p, cza=cza, max_iter=1)
+    assert "did not converge within max_iter=1" in caplog.text
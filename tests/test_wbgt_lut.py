@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import pytest
+
+from ml import wbgt_lut
+from ml.liljegren import wbgt_liljegren_physical
+from ml.wbgt import wbgt_liljegren_from_met
+
+
+@pytest.fixture(scope="module")
+def lut():
+    return wbgt_lut.build_lut()
+
+
+def _uniform(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        rng.uniform(-10, 50, n),
+        rng.uniform(0, 1, n),
+        rng.uniform(0, 1400, n),
+        rng.uniform(0, 20, n),
+    ]
+
+
+def test_interpolation_error_against_formula(lut):
+    pts = _uniform(200_000)
+    err = lut(*pts, block=4096) - wbgt_liljegren_from_met(*pts)
+    assert np.abs(err).max() < 0.35
+    assert np.sqrt(np.mean(err**2)) < 0.03
+    assert np.abs(err[pts[1] >= 0.1]).max() < 0.2
+    # Exact at grid nodes, up to float32 storage.
+    nodes = [wbgt_lut.axis_values(a)[[0, 7, -1]] for a in lut.axes.values()]
+    grid = np.meshgrid(*nodes, indexing="ij")
+    np.testing.assert_allclose(lut(*grid), wbgt_liljegren_from_met(*grid), atol=1e-4)
+
+
+def test_off_grid_points_are_nan_and_use_lut_falls_back(lut, monkeypatch):
+    monkeypatch.setattr(wbgt_lut, "WBGT_LUT_PATH", "")
+    monkeypatch.setattr(wbgt_lut, "default_lut", lambda: lut)
+    t = np.array([[60.0, 25.0], [25.0, np.nan]])
+    rh, sw, u = 0.5, np.array([500.0, -20.0]), np.array([[2.0], [35.0]])
+    got = lut(t, rh, sw, u)
+    assert np.isnan(got[0, 0]) and np.isnan(got[1, 0]) and np.isnan(got[1, 1])
+    assert not np.isnan(got[0, 1])  # negative shortwave clamps onto the grid, like the formula
+    fast = wbgt_liljegren_from_met(t, rh, sw, u, use_lut=True)
+    exact = wbgt_liljegren_from_met(t, rh, sw, u)
+    np.testing.assert_array_equal(fast[[0, 1], [0, 0]], exact[[0, 1], [0, 0]])
+    assert abs(fast[0, 1] - exact[0, 1]) < 0.1 and np.isnan(fast[1, 1])
+
+
+def test_saved_table_is_memory_mapped_and_rebuilt_when_stale(tmp_path, monkeypatch):
+    path = tmp_path / "lut.npy"
+    monkeypatch.setattr(wbgt_lut, "WBGT_LUT_PATH", str(path))
+    wbgt_lut.default_lut.cache_clear()
+    try:
+        built = wbgt_lut.default_lut()
+        wbgt_lut.default_lut.cache_clear()
+        loaded = wbgt_lut.default_lut()
+        assert isinstance(loaded.table, np.memmap) and not loaded.table.flags.writeable
+        np.testing.assert_array_equal(loaded.table, built.table)
+
+        stale = wbgt_lut.WbgtLut(np.zeros_like(built.table), built.axes, "old:formula")
+        wbgt_lut.save_lut(stale, path)
+        wbgt_lut.default_lut.cache_clear()
+        np.testing.assert_array_equal(wbgt_lut.default_lut().table, built.table)
+    finally:
+        wbgt_lut.default_lut.cache_clear()
+
+
+def test_builder_tabulates_any_model():
+    axes = {"temp_c": (20.0, 2.0, 11), "rh": (0.2, 0.1, 7), "swdown": (0.0, 200.0, 6),
+            "wind_ms": (0.5, 0.5, 8)}  # fmt: skip
+
+    def physical(t, rh, sw, u):
+        return wbgt_liljegren_physical(t, rh, sw, u, 1013.0, cza=0.8)
+
+    table = wbgt_lut.build_lut(physical, axes)
+    pts = [np.array([29.0]), np.array([0.55]), np.array([500.0]), np.array([2.25])]
+    assert table(*pts)[0] == pytest.approx(physical(*pts)[0], abs=0.2)
+    with pytest.raises(ValueError):
+        wbgt_lut.WbgtLut(table.table[:-1], axes)